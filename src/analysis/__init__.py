@@ -0,0 +1,7 @@
+from .analyses import Analyses
+from .difficulty import DifficultyAnalysis
+from .timing import TimingAnalysis
+from .offsets import OffsetAnalysis
+from .deviation import DeviationAnalysis
+from .score import ScoreAnalysis
+from .hits import HitAnalysis
@@ -0,0 +1,109 @@
+"""
+Registry of analyses the graphs display.
+
+An analysis is a function that takes score data and difficulty data (row aligned, see DiffNpy.expand)
+and returns a tuple of plot-ready arrays. It has no Qt dependencies, so the same function is used by
+the graph displaying it and by batch jobs that write results to disk.
+
+Registering an analysis:
+
+    @staticmethod
+    @Analyses.register('aim_difficulty', [ 'x', 'y', 'is_miss' ])
+    def aim_factors(score_data, diff_data):
+        ...
+
+``outputs`` names the returned arrays, in order. Analyses that only need score data are registered
+with ``score_only=True`` and are called with score data alone. Keyword arguments of an analysis are
+its settings, and are left at their defaults unless given. The exception is ``segments``, which is the
+PlaySegments index of the data for analyses that work per play. It is built by the analysis if not given.
+"""
+import inspect
+
+import numpy as np
+
+from misc.Logger import Logger
+
+
+
+class Analyses():
+
+    logger = Logger.get_logger(__name__)
+
+    __analyses = {}
+
+    @staticmethod
+    def register(name, outputs, score_only=False):
+        def decorator(func):
+            Analyses.__analyses[name] = {
+                'func'       : func,
+                'outputs'    : outputs,
+                'score_only' : score_only,
+                'segmented'  : 'segments' in inspect.signature(func).parameters,
+                'params'     : [
+                    param.name for param in inspect.signature(func).parameters.values()
+                    if (param.default is not inspect.Parameter.empty) and (param.name != 'segments')
+                ],
+            }
+            return func
+
+        return decorator
+
+
+    @staticmethod
+    def get_names():
+        """
+        Names of all registered analyses in order of registration
+        """
+        return list(Analyses.__analyses.keys())
+
+
+    @staticmethod
+    def get_info(name):
+        return Analyses.__analyses[name]
+
+
+    @staticmethod
+    def run(name, score_data, diff_data, segments=None, **params):
+        """
+        Runs the analysis ``name``. Settings in ``params`` the analysis does not have are ignored.
+        ``segments`` is passed on to analyses that work per play, so it's built once for all of them.
+
+        Returns a dict of output name -> array.
+        """
+        info   = Analyses.__analyses[name]
+        params = { key : value for key, value in params.items() if key in info['params'] }
+
+        if info['segmented'] and (segments is not None):
+            params['segments'] = segments
+
+        if info['score_only']:
+            result = info['func'](score_data, **params)
+        else:
+            result = info['func'](score_data, diff_data, **params)
+
+        return dict(zip(info['outputs'], result))
+
+
+    @staticmethod
+    def check_timing(score_data):
+        """
+        Logs a warning about consecutive score points that share the same map timing. Analyses that
+        divide by the time between score points get infinite values for those.
+        """
+        t_map = score_data['T_MAP'].values
+        detected_zeros = t_map[2:] == t_map[1:-1]
+        if np.count_nonzero(detected_zeros) == 0:
+            return
+
+        def pairs(column):
+            values = score_data[column].values
+            return f'{values[1:-1][detected_zeros]} {values[2:][detected_zeros]}'
+
+        Analyses.logger.warning(
+            'Detected zeros in timing data:\n'
+            f'    pos_x: {pairs("X_MAP")}\n'
+            f'    pos_y: {pairs("Y_MAP")}\n'
+            f'    timing: {pairs("T_MAP")}\n'
+            f'    hit_type: {pairs("TYPE_HIT")}\n'
+            f'    action_type: {pairs("TYPE_MAP")}'
+        )
@@ -0,0 +1,128 @@
+"""
+Runs analyses over a whole data file and writes the results to disk.
+
+Plays are grouped by map and mods, and each group is analyzed in its own worker process.
+Results of each analysis are saved as ``<out_dir>/<md5>_<mods>/<analysis>.npz`` with one array per
+analysis output. ``<out_dir>/index.csv`` lists every group and analysis that was run, along with
+the error message of analyses that failed.
+
+Usage:
+
+    AnalysisBatch.run('data/data.h5', 'reports', [ 'aim_difficulty', 'dev_velocity' ], num_workers=4)
+"""
+import os
+import concurrent.futures
+
+import numpy as np
+import pandas as pd
+
+from misc.Logger import Logger
+from misc.play_segments import PlaySegments
+from file_managers.npy_mgr import NpyManager
+from data_recording.diff_npy import DiffNpy
+from analysis.analyses import Analyses
+
+
+
+class AnalysisBatch():
+
+    logger = Logger.get_logger(__name__)
+
+    @staticmethod
+    def run(score_file, out_dir, names=None, params={}, num_workers=None):
+        """
+        Runs the analyses ``names`` (all registered analyses if None) on every map and mods
+        combination in ``score_file``. Difficulty data is read from the ``_diff.h5`` file next to it.
+        ``params`` are settings passed to the analyses that have them.
+
+        Returns the index of results as a DataFrame.
+        """
+        names = Analyses.get_names() if names is None else list(names)
+        for name in names:
+            Analyses.get_info(name)  # Raises KeyError for unknown analyses
+
+        score_data, diff_data = AnalysisBatch.__load_data(score_file)
+        if score_data is None:
+            AnalysisBatch.logger.warning(f'No score data in {score_file}')
+            return pd.DataFrame(columns=[ 'MD5', 'MODS', 'NUM_PLAYS', 'ANALYSIS', 'FILE', 'ERROR' ])
+
+        groups = score_data.groupby(level=[ 'MD5', 'MODS' ]).indices
+        AnalysisBatch.logger.info(f'Running {len(names)} analyses on {len(groups)} maps with {num_workers or os.cpu_count()} workers')
+
+        os.makedirs(out_dir, exist_ok=True)
+        entries = []
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(AnalysisBatch.run_group, score_data.iloc[idxs], diff_data.iloc[idxs], names, params, out_dir)
+                for idxs in groups.values()
+            ]
+
+            for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                entries.extend(future.result())
+                AnalysisBatch.logger.debug(f'{i + 1}/{len(futures)} maps done')
+
+        index = pd.DataFrame(entries, columns=[ 'MD5', 'MODS', 'NUM_PLAYS', 'ANALYSIS', 'FILE', 'ERROR' ])
+        index.to_csv(os.path.join(out_dir, 'index.csv'), index=False)
+
+        num_failed = np.count_nonzero(index['ERROR'] != '')
+        if num_failed > 0:
+            AnalysisBatch.logger.warning(f'{num_failed} of {index.shape[0]} analyses failed. See {out_dir}/index.csv')
+
+        return index
+
+
+    @staticmethod
+    def run_group(score_data, diff_data, names, params, out_dir):
+        """
+        Runs the analyses on the plays of a single map and mods combination, and saves their results.
+        Returns an index entry for each analysis.
+        """
+        md5, _, mods, _ = score_data.index[0]
+        num_plays = np.unique(score_data.index.get_level_values(1)).shape[0]
+
+        group_dir = os.path.join(out_dir, f'{md5}_{mods}')
+        os.makedirs(group_dir, exist_ok=True)
+
+        segments = PlaySegments(score_data, diff_data)
+
+        entries = []
+        for name in names:
+            file_pathname = os.path.join(group_dir, f'{name}.npz')
+
+            try:
+                results = Analyses.run(name, score_data, diff_data, segments, **params)
+                np.savez_compressed(file_pathname, **results)
+            except Exception as e:
+                entries.append([ md5, mods, num_plays, name, '', f'{type(e).__name__}: {e}' ])
+                continue
+
+            entries.append([ md5, mods, num_plays, name, os.path.relpath(file_pathname, out_dir), '' ])
+
+        return entries
+
+
+    @staticmethod
+    def __load_data(score_file):
+        score_mgr = NpyManager(score_file)
+        diff_mgr  = NpyManager(f'{os.path.splitext(score_file)[0]}_diff.h5', DiffNpy.INDEX_NAMES)
+
+        score_data = score_mgr.data()
+        diff_data  = diff_mgr.data()
+
+        score_mgr.close()
+        diff_mgr.close()
+
+        if score_data is None:
+            return None, None
+
+        score_data = score_data.sort_index()
+
+        if diff_data is None:
+            diff_data = DiffNpy.get_blank_data()
+
+        missing_maps = DiffNpy.get_missing_maps(score_data, diff_data)
+        if missing_maps:
+            AnalysisBatch.logger.warning(f'{len(missing_maps)} maps have no difficulty data. Analyses needing it will be NaN for those maps')
+
+        return score_data, DiffNpy.expand(score_data, diff_data)
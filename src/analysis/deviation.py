@@ -0,0 +1,417 @@
+"""
+Deviation of hits against map properties.
+
+Hit presses are binned by two map properties and the mean or deviation of the hit offsets in each
+bin is taken. Which offset (x, y, or t) and which statistic is used are settings of the analysis.
+Analyses that work per play instead reduce each play to a point, such as its average BPM and deviation.
+"""
+import numpy as np
+
+from osu_analysis import StdScoreData
+
+from misc.osu_utils import OsuUtils
+from misc.binned_stats import BinnedStats
+from misc.group_stats import GroupStats
+from misc.play_segments import PlaySegments
+from analysis.analyses import Analyses
+
+
+
+class DeviationAnalysis():
+
+    DEV_DATA_X = 0
+    DEV_DATA_Y = 1
+    DEV_DATA_T = 2
+
+    DEV_TYPE_AVG = 0
+    DEV_TYPE_DEV = 1
+
+    NEEDED_NUM_DATA_POINTS = 30
+
+    # Make sure StdScoreData.Settings valid range window is set to [100, 100] for this to be accurate
+    VALID_RANGE_WIN = 200  # ms
+
+    @staticmethod
+    @Analyses.register('dev_velocity', [ 'dev', 'x', 'c' ])
+    def velocity(score_data, diff_data, dev_data=DEV_DATA_X, dev_type=DEV_TYPE_DEV, min_count=NEEDED_NUM_DATA_POINTS):
+        """
+        x-axis: velocity
+        y-axis: deviation or mean
+        color:  angle
+        """
+        data_filter = DeviationAnalysis.__get_hit_circle_filter(score_data)
+
+        # Gather relevant data
+        data_c = diff_data['DIFF_XY_ANGLE'].values[data_filter]
+        data_x = 1000*diff_data['DIFF_XY_LIN_VEL'].values[data_filter]
+        data_y = DeviationAnalysis.__get_offsets(score_data, dev_data)[data_filter]
+
+        #            MIN    MAX   MIN DELTA
+        chunks_c = [   0,   180,   15  ]     # Angle,    12 bins max
+        chunks_x = [   0,  2000,   10  ]     # Velocty,  200 bins max
+
+        return DeviationAnalysis.__get_binned_devs(data_c, data_x, data_y, chunks_c, chunks_x, dev_type, min_count)
+
+
+    @staticmethod
+    @Analyses.register('dev_angle', [ 'dev', 'x', 'c' ])
+    def angle(score_data, diff_data, dev_data=DEV_DATA_X, dev_type=DEV_TYPE_DEV, min_count=NEEDED_NUM_DATA_POINTS):
+        """
+        x-axis: angles
+        y-axis: deviation or mean
+        color:  bpm
+        """
+        data_filter = DeviationAnalysis.__get_hit_circle_filter(score_data)
+
+        # Gather relevant data
+        data_c = 15000/diff_data['DIFF_T_PRESS_DIFF'].values[data_filter]
+        data_x = diff_data['DIFF_XY_ANGLE'].values[data_filter]
+        data_y = DeviationAnalysis.__get_offsets(score_data, dev_data)[data_filter]
+
+        #            MIN    MAX   MIN DELTA
+        chunks_c = [   0,   400,   20  ]      # BPM,    20 bins max
+        chunks_x = [   0,   180,   3   ]      # Angle,  60 bins max
+
+        return DeviationAnalysis.__get_binned_devs(data_c, data_x, data_y, chunks_c, chunks_x, dev_type, min_count)
+
+
+    @staticmethod
+    @Analyses.register('dev_t_ar', [ 'density', 'dev', 'bpm' ])
+    def t_ar(score_data, diff_data, segments=None):
+        """
+        For each play:
+
+        density: number of notes visible at a time based on AR and average BPM
+        dev:     tap deviation (2σ) as a portion of the valid hit range, with misses counted as hits at the edges of it
+        bpm:     average BPM, rounded
+
+        Meant to be used on single play and not multiple plays
+        """
+        if segments is None:
+            segments = PlaySegments(score_data, diff_data)
+
+        if len(segments) == 0:
+            data_blank = np.asarray([])
+            return data_blank, data_blank, data_blank
+
+        ar_ms = np.asarray([ OsuUtils.ar_to_ms(ar) for ar in segments.first(segments.column(score_data, 'AR')) ])
+
+        t_map       = segments.column(score_data, 'T_MAP')
+        hit_offsets = segments.column(score_data, 'T_HIT') - t_map
+        type_map    = segments.column(score_data, 'TYPE_MAP')
+        type_hit    = segments.column(score_data, 'TYPE_HIT')
+
+        press_select = (type_map == StdScoreData.ACTION_PRESS)
+        hit_select   = press_select & (type_hit == StdScoreData.TYPE_HITP)
+        miss_select  = press_select & (type_hit == StdScoreData.TYPE_MISS)
+
+        bpm   = DeviationAnalysis.__get_play_bpms(segments, t_map, hit_select)
+        t_dev = DeviationAnalysis.__get_play_devs(segments, hit_offsets, hit_select, miss_select, 100)
+
+        # Round to nearest BPM so that cases like [ 136.01, 136.02 ]
+        # don't spawn extra descrete BPM selections
+        bpm     = np.round(bpm, 0)
+        density = ar_ms*bpm / 30000
+        dev     = 2*t_dev / DeviationAnalysis.VALID_RANGE_WIN
+
+        return density, dev, bpm
+
+
+    @staticmethod
+    @Analyses.register('dev_visible_ar', [ 'num_visible', 'miss_rate' ], score_only=True)
+    def visible_miss_rate(score_data, segments=None):
+        """
+        x-axis: number of notes visible at the time of a press (including itself), based on AR
+        y-axis: portion of presses with that many notes visible that were missed
+
+        Presses of all plays are processed at once. Their timings are offset by play so that
+        each play occupies its own range of a single sorted array, and the number of presses
+        visible for each one is found with a pair of binary searches on that array.
+        """
+        if segments is None:
+            segments = PlaySegments(score_data)
+
+        press_select = (segments.column(score_data, 'TYPE_MAP') == StdScoreData.ACTION_PRESS)
+        if np.count_nonzero(press_select) == 0:
+            data_blank = np.asarray([])
+            return data_blank, data_blank
+
+        ar_ms = np.asarray([ OsuUtils.ar_to_ms(ar) for ar in segments.first(segments.column(score_data, 'AR')) ])
+        ar_ms = ar_ms[segments.play_ids()]
+
+        t_map    = segments.column(score_data, 'T_MAP')[press_select]
+        ar_ms    = ar_ms[press_select]
+        play_ids = segments.play_ids()[press_select]
+        is_miss  = (segments.column(score_data, 'TYPE_HIT')[press_select] == StdScoreData.TYPE_MISS)
+
+        # Spacing plays further apart than any press can see keeps windows from reaching into other plays
+        play_span = (t_map.max() - t_map.min()) + ar_ms.max() + 1
+        t_keys = t_map - t_map.min() + play_ids*play_span
+
+        sort_idx = np.argsort(t_keys, kind='stable')
+        t_keys   = t_keys[sort_idx]
+        ar_ms    = ar_ms[sort_idx]
+        is_miss  = is_miss[sort_idx]
+
+        # Presses within [ t - ar_ms, t ] of each press
+        num_visible = \
+            np.searchsorted(t_keys, t_keys, side='right') - \
+            np.searchsorted(t_keys, t_keys - ar_ms, side='left')
+
+        num_total  = np.bincount(num_visible)
+        num_misses = np.bincount(num_visible, weights=is_miss)
+
+        x_data = np.flatnonzero(num_total)
+        y_data = num_misses[x_data] / num_total[x_data]
+
+        return x_data, y_data
+
+
+    @staticmethod
+    @Analyses.register('dev_xy_ar', [ 'density', 'dev', 'bpm' ])
+    def xy_ar(score_data, diff_data, segments=None):
+        """
+        For each play:
+
+        density: number of notes visible at a time based on AR and average BPM
+        dev:     x aim deviation (1σ px), with misses counted as hits at twice the circle radius
+        bpm:     average BPM, rounded
+        """
+        if segments is None:
+            segments = PlaySegments(score_data, diff_data)
+
+        if len(segments) == 0:
+            data_blank = np.asarray([])
+            return data_blank, data_blank, data_blank
+
+        ar_ms = np.asarray([ OsuUtils.ar_to_ms(ar) for ar in segments.first(segments.column(score_data, 'AR')) ])
+        cs_px = np.asarray([ OsuUtils.cs_to_px(cs) for cs in segments.first(segments.column(score_data, 'CS')) ])
+
+        t_map       = segments.column(score_data, 'T_MAP')
+        hit_offsets = segments.column(score_data, 'X_HIT') - segments.column(score_data, 'X_MAP')
+        type_map    = segments.column(score_data, 'TYPE_MAP')
+        type_hit    = segments.column(score_data, 'TYPE_HIT')
+
+        press_select = (type_map == StdScoreData.ACTION_PRESS)
+        hit_select   = press_select & (type_hit == StdScoreData.TYPE_HITP)
+        miss_select  = press_select & (type_hit == StdScoreData.TYPE_MISS)
+
+        bpm = DeviationAnalysis.__get_play_bpms(segments, t_map, hit_select)
+        dev = DeviationAnalysis.__get_play_devs(segments, hit_offsets, hit_select, miss_select, 2*cs_px)
+
+        # Round to nearest BPM so that cases like [ 136.01, 136.02 ]
+        # don't spawn extra descrete BPM selections
+        bpm     = np.round(bpm, 0)
+        density = ar_ms*bpm / 30000
+
+        return density, dev, bpm
+
+
+    @staticmethod
+    @Analyses.register('dev_rhythm', [ 'rhythm', 'dev', 'bpm' ])
+    def rhythm(score_data, diff_data, segments=None):
+        """
+        For each play:
+
+        rhythm: average note rhythm (%) of the notes that have one
+        dev:    tap deviation (1σ ms), with misses counted as hits at the edges of the valid hit range
+        bpm:    average BPM, rounded
+        """
+        if segments is None:
+            segments = PlaySegments(score_data, diff_data)
+
+        if len(segments) == 0:
+            data_blank = np.asarray([])
+            return data_blank, data_blank, data_blank
+
+        rhythms     = segments.column(diff_data, 'DIFF_T_PRESS_RHM')
+        t_map       = segments.column(score_data, 'T_MAP')
+        hit_offsets = segments.column(score_data, 'T_HIT') - t_map
+        type_map    = segments.column(score_data, 'TYPE_MAP')
+        type_hit    = segments.column(score_data, 'TYPE_HIT')
+
+        press_select = (type_map == StdScoreData.ACTION_PRESS)
+        hit_select   = press_select & (type_hit == StdScoreData.TYPE_HITP)
+        miss_select  = press_select & (type_hit == StdScoreData.TYPE_MISS)
+
+        rhythm = segments.mean(rhythms, ~np.isnan(rhythms))
+        bpm    = DeviationAnalysis.__get_play_bpms(segments, t_map, hit_select)
+        dev    = DeviationAnalysis.__get_play_devs(segments, hit_offsets, hit_select, miss_select, DeviationAnalysis.VALID_RANGE_WIN/2)
+
+        return rhythm, dev, np.round(bpm, 0)
+
+
+    @staticmethod
+    @Analyses.register('dev_offsets', [ 'bpm', 'dev' ])
+    def offsets(score_data, diff_data, segments=None):
+        """
+        x-axis: average BPM of each play
+        y-axis: deviation of hit offsets of each play, averaged over plays with the same average BPM
+        """
+        if segments is None:
+            segments = PlaySegments(score_data, diff_data)
+
+        if len(segments) == 0:
+            data_blank = np.asarray([])
+            return data_blank, data_blank
+
+        bpms = 15000/segments.column(diff_data, 'DIFF_T_PRESS_DIFF')
+
+        hit_offsets = segments.column(score_data, 'T_HIT') - segments.column(score_data, 'T_MAP')
+
+        # Keep just the press taps that have not been missed
+        hit_select = \
+            (segments.column(score_data, 'TYPE_MAP') == StdScoreData.ACTION_PRESS) & \
+            (segments.column(score_data, 'TYPE_HIT') == StdScoreData.TYPE_HITP)
+
+        data_x = segments.mean(bpms, ~np.isnan(bpms))
+        data_y = segments.std(hit_offsets, hit_select)
+
+        # Average along similiar x-axis value
+        return GroupStats.mean(data_x, data_y)
+
+
+    @staticmethod
+    @Analyses.register('dev_doffsets', [ 'bpm', 'dev' ])
+    def doffsets(score_data, diff_data, segments=None):
+        """
+        x-axis: average BPM of each play
+        y-axis: deviation of the change in hit offset between consecutive hit presses of each play,
+                averaged over plays with the same average BPM
+        """
+        if segments is None:
+            segments = PlaySegments(score_data, diff_data)
+
+        if len(segments) == 0:
+            data_blank = np.asarray([])
+            return data_blank, data_blank
+
+        bpms     = 15000/segments.column(diff_data, 'DIFF_T_PRESS_DIFF')
+        type_map = segments.column(score_data, 'TYPE_MAP')
+        type_hit = segments.column(score_data, 'TYPE_HIT')
+
+        hit_offsets = segments.column(score_data, 'T_HIT') - segments.column(score_data, 'T_MAP')
+
+        data_x = segments.mean(bpms, ~np.isnan(bpms))
+        data_y = np.zeros(len(segments))
+
+        # For each map and timestamp
+        for i, play in enumerate(segments.slices()):
+            # Keep just the press taps
+            press_select = (type_map[play] == StdScoreData.ACTION_PRESS)
+
+            play_offsets  = hit_offsets[play][press_select]
+            play_type_hit = type_hit[play][press_select]
+
+            dhit_offsets = play_offsets[2:] - play_offsets[1:-1]
+
+            # Keep just the notes that have not been missed
+            dhit_offsets = dhit_offsets[
+                (play_type_hit[2:] == StdScoreData.TYPE_HITP) &
+                (play_type_hit[1:-1] == StdScoreData.TYPE_HITP)
+            ]
+
+            data_y[i] = np.std(dhit_offsets)
+
+        # Average along similiar x-axis value
+        return GroupStats.mean(data_x, data_y)
+
+
+    @staticmethod
+    def get_t_ar_model_points(density, dev):
+        """
+        Points the dev_t_ar model is fit to: the data sorted by density,
+        padded with full deviation at densities no one can read
+        """
+        idx_sort = np.argsort(density)
+        data_x = density[idx_sort]
+        data_y = dev[idx_sort]
+
+        data_x = np.append(data_x, np.asarray([15, 16, 17, 18, 19, 20]).repeat(10))
+        data_y = np.append(data_y, np.asarray([ 1,  1,  1,  1,  1,  1]).repeat(10))
+
+        return data_x, data_y
+
+
+    @staticmethod
+    def __get_hit_circle_filter(score_data):
+        type_map = score_data['TYPE_MAP'].values
+
+        # Filters to get just hitcircles with valid hits
+        data_filter = np.ones(score_data.shape[0], dtype=np.bool8)
+
+        # Filter out sliders
+        data_filter[:-1] = \
+            (type_map[:-1] == StdScoreData.ACTION_PRESS) & ~(
+                (type_map[1:] == StdScoreData.ACTION_HOLD) | \
+                (type_map[1:] == StdScoreData.ACTION_RELEASE)
+            )
+
+        # Select hit presses
+        data_filter &= (score_data['TYPE_HIT'].values == StdScoreData.TYPE_HITP)
+
+        return data_filter
+
+
+    @staticmethod
+    def __get_offsets(score_data, dev_data):
+        if dev_data == DeviationAnalysis.DEV_DATA_X:
+            return score_data['PERF_X_OFFSET'].values
+        if dev_data == DeviationAnalysis.DEV_DATA_Y:
+            return score_data['PERF_Y_OFFSET'].values
+        if dev_data == DeviationAnalysis.DEV_DATA_T:
+            return score_data['PERF_T_OFFSET'].values
+
+        raise ValueError(f'Unknown deviation data: {dev_data}')
+
+
+    @staticmethod
+    def __get_binned_devs(data_c, data_x, data_y, chunks_c, chunks_x, dev_type, min_count):
+        # Reduce data to bins. Data outside the range is left out
+        edges_c = np.arange(chunks_c[0], chunks_c[1] + chunks_c[2], chunks_c[2])
+        edges_x = np.arange(chunks_x[0], chunks_x[1] + chunks_x[2], chunks_x[2])
+
+        bins, _, means, variances = BinnedStats.calc([ data_c, data_x ], data_y, [ edges_c, edges_x ], min_count=min_count)
+
+        if dev_type == DeviationAnalysis.DEV_TYPE_AVG:
+            dev_data_y = means
+        elif dev_type == DeviationAnalysis.DEV_TYPE_DEV:
+            dev_data_y = np.sqrt(variances)
+        else:
+            raise ValueError(f'Unknown deviation type: {dev_type}')
+
+        return dev_data_y, bins[:, 1], bins[:, 0]
+
+
+    @staticmethod
+    def __get_play_bpms(segments, t_map, hit_select):
+        """
+        Average BPM of each play, from the time between each hit note and the note before it in the same play.
+        It needs to be calculated before filtering out notes
+        """
+        is_first = np.zeros(t_map.shape[0], dtype=bool)
+        is_first[segments.starts()] = True
+
+        with np.errstate(divide='ignore'):
+            bpm = 30000/np.diff(t_map, prepend=np.nan)
+
+        return segments.mean(bpm, hit_select & ~is_first)
+
+
+    @staticmethod
+    def __get_play_devs(segments, offsets, hit_select, miss_select, edges):
+        """
+        Deviation (1σ) of the hit ``offsets`` of each play. Misses count as hits at both ``edges``
+        (+/-), which is either one value or a value per play.
+        """
+        edges = np.broadcast_to(edges, (len(segments),))
+
+        num_hits    = segments.sum(hit_select.astype(np.int64))
+        num_misses  = segments.sum(miss_select.astype(np.int64))
+        num_offsets = num_hits + 2*num_misses
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means  = segments.sum(np.where(hit_select, offsets, 0)) / num_offsets
+            diffs  = np.where(hit_select, offsets - means[segments.play_ids()], 0)
+            sq_sum = segments.sum(diffs*diffs) + num_misses*((edges - means)**2 + (-edges - means)**2)
+            return np.sqrt(sq_sum / num_offsets)
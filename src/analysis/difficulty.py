@@ -0,0 +1,185 @@
+"""
+Difficulty factors of score points.
+
+Factors are sorted by difficulty and spread across [ 0, 1 ] on the x-axis, so the
+curve reads as how much of the selection is at or below a given difficulty.
+"""
+import math
+import numpy as np
+
+from osu_analysis import StdScoreData
+
+from misc.osu_utils import OsuUtils
+from analysis.analyses import Analyses
+
+
+
+class DifficultyAnalysis():
+
+    @staticmethod
+    @Analyses.register('aim_difficulty', [ 'x', 'y', 'is_miss' ])
+    def aim_factors(score_data, diff_data):
+        """
+        Aim factor of each score point from its velocity, angle, and the map's CS.
+        ``is_miss`` marks score points that were missed.
+        """
+        # Check if there is any data to operate on
+        if score_data.shape[0] < 3:
+            data_stub = np.asarray([])
+            return data_stub, data_stub, data_stub
+
+        type_map = score_data['TYPE_MAP'].values
+
+        # Selects release points for short sliders. These kind of sliders
+        # do not have any consequences for not aiming the slider end. As a
+        # result, it is not a significant aiming challenge if they go very
+        # fast. Sliders are considered short when they have no hold scorepoints.
+        short_slider_rel_select = np.zeros(score_data.shape[0], dtype=np.bool8)
+        short_slider_rel_select[1:] = (
+            (type_map[:-1] == StdScoreData.ACTION_PRESS) &
+            (type_map[1:] == StdScoreData.ACTION_RELEASE)
+        )
+
+        # For now selects press points for short sliders. Sliders are considered
+        # short when they have no hold scorepoints.
+        #
+        # Slider paths oriented in the direction of jump effectively have their
+        # CS artificially increased by at least 1.5x (due to follow circle size).
+        # Can be a bit more if slider velocity and path is right.
+        #
+        # TODO: How to determine if slider path is oriented in the direction of jump?
+        # TODO: What if slider path goes into opposite direction of jump?
+        short_slider_prs_select = np.zeros(score_data.shape[0], dtype=np.bool8)
+        short_slider_prs_select[:-1] = (
+            (type_map[:-1] == StdScoreData.ACTION_PRESS) &
+            (type_map[1:] == StdScoreData.ACTION_RELEASE)
+        )
+
+        score_data = score_data[~short_slider_rel_select]
+        diff_data  = diff_data[~short_slider_rel_select]
+
+        short_slider_prs_select = short_slider_prs_select[~short_slider_rel_select]
+        type_map = type_map[~short_slider_rel_select]
+
+        cs_px = OsuUtils.cs_to_px(score_data['CS'].values[0])
+        dists = diff_data['DIFF_XY_DIST'].values
+
+        # Small distance do not require to reposition the cursor to aim the next
+        # note. As a result patters like double taps can have very short timing
+        # between them while being offset by some amount, resulting in high
+        # velocities. Distances are considered small if the scorepoints are less
+        # than 75% the diameter of circle size apart.
+        #
+        # NOTE: This doesn't work for streams or large stacks as they have multiple
+        # successions of small distances, effectively requiring the player to move
+        # the cursor. Perhaps look into implementing a strategy that decides whether
+        # velocity is too large for notes that are closely spaced.
+        small_small_dist_select = (dists < cs_px*1.5)
+
+
+        # Calculate data (x2 is considered current score point, x1 and x0 are previous score points)
+        t_map  = score_data['T_MAP'].values
+        vels   = diff_data['DIFF_XY_LIN_VEL'].values
+        angles = diff_data['DIFF_XY_ANGLE'].values
+
+        is_miss = (
+            (score_data['TYPE_HIT'].values == StdScoreData.TYPE_MISS) & (
+                (type_map == StdScoreData.ACTION_HOLD) |
+                (type_map == StdScoreData.ACTION_PRESS)
+            )
+        )
+
+        Analyses.check_timing(score_data)
+
+        angle_factor = (1 + 2.5*np.exp(-0.026*angles))/(1 + 2.5)
+        cs_factor = np.full_like(angle_factor, OsuUtils.cs_to_px(4)/cs_px)
+        cs_factor[short_slider_prs_select] = (OsuUtils.cs_to_px(4)/(1.5*cs_px))
+
+        data_y = (cs_factor*vels*angle_factor*4)
+        inv_filter = ~np.isnan(data_y)
+
+        data_y = data_y[inv_filter]
+        is_miss = is_miss[inv_filter]
+
+        if True:
+            data_x = np.linspace(0, 1, data_y.shape[0])
+
+            sort_idx = np.argsort(data_y)
+            data_y  = data_y[sort_idx]
+            is_miss = is_miss[sort_idx]
+        else:
+            # Debug
+            data_x = t_map[inv_filter]
+
+        return data_x, data_y, is_miss
+
+
+    @staticmethod
+    @Analyses.register('tap_difficulty', [ 'x', 'y', 'score_mask' ])
+    def tap_factors(score_data, diff_data):
+        """
+        Tap factor of each press from the rate of presses and a stamina factor.
+        Columns of ``score_mask`` mark misses, hits within 32 ms, and hits outside of it.
+        """
+        # Determine what was the latest play
+        #data_filter = \
+        #    (score_data[:, ScoreNpyData.TIMESTAMP] == max(score_data[:, ScoreNpyData.TIMESTAMP]))
+        #score_data = score_data[data_filter]
+
+        # Filter out sliders holds and releases
+        data_filter = (
+            (score_data['TYPE_MAP'].values != StdScoreData.ACTION_HOLD) & \
+            (score_data['TYPE_MAP'].values != StdScoreData.ACTION_RELEASE)
+        )
+
+        score_data = score_data[data_filter]
+        diff_data  = diff_data[data_filter]
+
+        # Check if there is any data to operate on
+        if score_data.shape[0] < 3:
+            data_stub = np.asarray([])
+            return data_stub, data_stub, data_stub
+
+        # Calculate data
+        timings = score_data['T_MAP'].values
+        toffsets = score_data['T_HIT'].values - timings
+        bpm_inc = diff_data['DIFF_T_PRESS_DEC'].values
+        bpm_dec = diff_data['DIFF_T_PRESS_INC'].values
+        rhym = diff_data['DIFF_T_PRESS_RHM'].values
+
+        is_miss = (
+            (score_data['TYPE_HIT'].values == StdScoreData.TYPE_MISS) & (
+                (score_data['TYPE_MAP'].values == StdScoreData.ACTION_PRESS)
+            )
+        )
+        score_mask = np.zeros((timings.shape[0] - 2, 3), dtype=np.bool8)
+        score_mask[:, 0] = is_miss[2:]
+        score_mask[:, 1] = np.abs(toffsets[2:] <= 32)
+        score_mask[:, 2] = np.abs(toffsets[2:] > 32) & ~is_miss[2:]
+
+        rates = 1000/(timings[2:] - timings[:-2])
+
+        stamina = np.zeros(rates.shape[0])
+        stamina_select = (bpm_dec[2:] > bpm_inc[2:])
+        stamina[stamina_select]  = 0.1*(np.log(bpm_inc[2:][stamina_select]/1000 + 1) + 1)
+        stamina[~stamina_select] = 0.1
+
+        #vec_rhym_cplx_func = np.vectorize(DifficultyAnalysis.__rhym_cplx_func)
+        #rhyhm_cplx = vec_rhym_cplx_func(rhym/100)
+
+        data_x = np.linspace(0, 1, rates.shape[0])
+        data_y = rates*stamina*3
+
+        sort_idx = np.argsort(data_y)
+        data_y = data_y[sort_idx]
+        score_mask[:, 0] = score_mask[sort_idx, 0]
+        score_mask[:, 1] = score_mask[sort_idx, 1]
+        score_mask[:, 2] = score_mask[sort_idx, 2]
+
+        return data_x, data_y, score_mask
+
+
+    @staticmethod
+    def __rhym_cplx_func(x):
+        n = np.arange(1, 8)
+        return np.sum(np.abs(np.sin(2*(2**n)*math.pi*x)))
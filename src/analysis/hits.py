@@ -0,0 +1,137 @@
+"""
+Hit offsets and their distributions for the score graphs.
+"""
+import numpy as np
+
+from osu_interfaces import Mod
+from osu_analysis import StdScoreData
+
+from misc.utils import MathUtils
+from analysis.analyses import Analyses
+
+
+
+class HitAnalysis():
+
+    @staticmethod
+    @Analyses.register('hit_offsets', [ 'press_t', 'press_offsets', 'release_t', 'release_offsets', 'miss_t', 'mean', 'std', 'miss_counts', 'acc' ], score_only=True)
+    def hit_offsets(score_data):
+        """
+        Hit offsets of presses and releases against their map timing, and hit timings of missed presses.
+
+        mean and std are of the hit offsets of all score points. miss_counts is the number of
+        [ free, press, release, hold ] misses, and acc is how close hits are to the map timing,
+        scored by a normal distribution with a 95% deviation of 200 ms and counting misses as 0.
+        """
+        type_map = score_data['TYPE_MAP'].values
+        type_hit = score_data['TYPE_HIT'].values
+        t_map    = score_data['T_MAP'].values
+        t_hit    = score_data['T_HIT'].values
+
+        hit_offsets = t_hit - t_map
+
+        prs_select  = (type_map == StdScoreData.ACTION_PRESS)
+        rel_select  = (type_map == StdScoreData.ACTION_RELEASE)
+        miss_select = (type_hit == StdScoreData.TYPE_MISS)
+
+        miss_counts = np.asarray([
+            np.count_nonzero(miss_select & (type_map == StdScoreData.ACTION_FREE)),
+            np.count_nonzero(miss_select & prs_select),
+            np.count_nonzero(miss_select & rel_select),
+            np.count_nonzero(miss_select & (type_map == StdScoreData.ACTION_HOLD)),
+        ])
+
+        t_offsets = hit_offsets[type_hit == StdScoreData.TYPE_HITP]
+
+        acc_window = 200  # 95% dev (ms)
+        acc_score = MathUtils.normal_distr(t_offsets, 0, acc_window/2)/MathUtils.normal_distr(0, 0, acc_window/2)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            acc = acc_score.sum() / (len(acc_score) + np.sum(miss_counts[1:]))
+
+        return \
+            t_map[prs_select], hit_offsets[prs_select], \
+            t_map[rel_select], hit_offsets[rel_select], \
+            t_hit[miss_select & prs_select], \
+            np.mean(hit_offsets), np.std(hit_offsets), \
+            miss_counts, acc
+
+
+    @staticmethod
+    @Analyses.register('hit_distr', [ 'x', 'y', 'peak' ], score_only=True)
+    def hit_distr(score_data):
+        """
+        Histogram of hit offsets of hit presses. ``x`` are the bin edges, ``y`` the counts,
+        and ``peak`` the center of the most frequent bin.
+        """
+        data_filter = \
+            (score_data['TYPE_MAP'].values == StdScoreData.ACTION_PRESS) & \
+            (score_data['TYPE_HIT'].values == StdScoreData.TYPE_HITP)
+
+        hit_offsets = score_data['T_HIT'].values[data_filter] - score_data['T_MAP'].values[data_filter]
+        return HitAnalysis.__get_distr(hit_offsets, 0.1, 0.3)
+
+
+    @staticmethod
+    @Analyses.register('doffset_distr', [ 'x', 'y', 'peak' ], score_only=True)
+    def doffset_distr(score_data):
+        """
+        Histogram of the change in hit offset between consecutive hit presses. ``x`` are the
+        bin edges, ``y`` the counts, and ``peak`` the center of the most frequent bin.
+        """
+        data_filter = \
+            (score_data['TYPE_MAP'].values == StdScoreData.ACTION_PRESS) & \
+            (score_data['TYPE_HIT'].values == StdScoreData.TYPE_HITP)
+
+        hit_offsets = score_data['T_HIT'].values[data_filter] - score_data['T_MAP'].values[data_filter]
+        doffsets = hit_offsets[2:] - hit_offsets[1:-1]     # x[1] - x[0]
+
+        return HitAnalysis.__get_distr(doffsets, 0.5, 0.5)
+
+
+    @staticmethod
+    @Analyses.register('aim_offsets', [ 'cs', 'hit_offsets', 'miss_offsets' ], score_only=True)
+    def aim_offsets(score_data):
+        """
+        Aim offsets (x, y) of hits and of missed presses, and the CS of the map with
+        HardRock and Easy applied.
+        """
+        if score_data.shape[0] == 0:
+            data_stub = np.zeros((0, 2))
+            return np.nan, data_stub, data_stub
+
+        cs = score_data['CS'].values[0]
+
+        mods = Mod(int(score_data.index.get_level_values(2)[0]))
+        if mods.has_mod(Mod.HardRock): cs *= 1.3
+        if mods.has_mod(Mod.Easy):     cs *= 0.5
+
+        cs = min(cs, 10)
+
+        type_hit = score_data['TYPE_HIT'].values
+        offsets  = score_data[[ 'X_HIT', 'Y_HIT' ]].values - score_data[[ 'X_MAP', 'Y_MAP' ]].values
+
+        hit_select  = (type_hit == StdScoreData.TYPE_HITP)
+        miss_select = \
+            (type_hit == StdScoreData.TYPE_MISS) & \
+            (score_data['TYPE_MAP'].values == StdScoreData.ACTION_PRESS)
+
+        return cs, offsets[hit_select], offsets[miss_select]
+
+
+    @staticmethod
+    def __get_distr(values, step_scale, bins_scale):
+        """
+        Histogram of ``values`` over [ -150, 150 ] with a number of bins proportional to the number of values
+        """
+        if values.shape[0] == 0:
+            return np.asarray([]), np.asarray([]), np.nan
+
+        step = (150 - 0)/(step_scale*values.shape[0])
+        y, x = np.histogram(values, bins=np.linspace(-150, 150, int(bins_scale*values.shape[0])))
+
+        if y.shape[0] == 0:
+            return np.asarray([]), np.asarray([]), np.nan
+
+        peak = x[:-1][y == np.max(y)][0] + step/2
+        return x, y, peak
@@ -0,0 +1,70 @@
+"""
+Hit timing offsets against map properties.
+"""
+import numpy as np
+
+from misc.group_stats import GroupStats
+from misc.play_segments import PlaySegments
+from analysis.analyses import Analyses
+
+
+
+class OffsetAnalysis():
+
+    @staticmethod
+    @Analyses.register('toffset_bpm', [ 'x', 'y', 'dev' ])
+    def toffset_bpm(score_data, diff_data, avg_data_points=True):
+        """
+        Hit offsets relative to the press rate against hit timing. If ``avg_data_points`` is
+        set, offsets of the same hit timing are averaged and ``dev`` is their deviation.
+        """
+        data = np.zeros((score_data.shape[0], 3))
+        data[:, 0:2] = score_data[['T_HIT', 'T_MAP']].values
+        data[:, 2]   = diff_data['DIFF_T_PRESS_RATE'].values
+
+        data = data[~(np.isnan(data).any(axis=1))]
+
+        x_data = data[:, 0]
+        y_data = data[:, 1] - data[:, 2]
+
+        if avg_data_points:
+            # Average overlapping data points
+            x_data, y_data, y_data_dev = GroupStats.agg(x_data, y_data, 'mean', 'std')
+        else:
+            y_data_dev = np.zeros(y_data.shape[0])
+
+        return x_data, y_data, y_data_dev
+
+
+    @staticmethod
+    @Analyses.register('toffset_rhythm', [ 'rhythm', 't_dev' ])
+    def toffset_rhythm(score_data, diff_data, segments=None):
+        """
+        Average change in hit offset for each press rhythm (rounded down to 5%), for every play.
+        """
+        if segments is None:
+            segments = PlaySegments(score_data, diff_data)
+
+        rhythms     = segments.column(diff_data, 'DIFF_T_PRESS_RHM')
+        hit_offsets = segments.column(score_data, 'T_HIT') - segments.column(score_data, 'T_MAP')
+
+        rhythms_all = []
+        t_devs_all  = []
+
+        # For each map and timestamp
+        for play in segments.slices():
+            nan_filter = ~np.isnan(rhythms[play])
+            t_offsets  = np.diff(hit_offsets[play][nan_filter])
+            rhythm     = rhythms[play][nan_filter][1:]
+
+            # Operate on overlapping data points (those that have same x-axis within +/- 5%)
+            # and get average offsets for collected rhythms
+            rounded_rhythms, t_avgs = GroupStats.mean(rhythm // 5 * 5, t_offsets)
+
+            rhythms_all.append(rounded_rhythms)
+            t_devs_all.append(2 * t_avgs)
+
+        if len(rhythms_all) == 0:
+            return np.asarray([]), np.asarray([])
+
+        return np.concatenate(rhythms_all), np.concatenate(t_devs_all)
@@ -0,0 +1,119 @@
+"""
+Accuracy statistics of multiple plays of the same map.
+"""
+import numpy as np
+
+from osu_analysis import StdScoreData
+
+from misc.osu_utils import OsuUtils
+from misc.group_stats import GroupStats
+from misc.acc_probs import AccProbs
+from analysis.analyses import Analyses
+
+
+
+class ScoreAnalysis():
+
+    # OD values accuracy probabilities are evaluated at
+    OD_SWEEP = np.arange(0, 111)/10
+
+    # Accuracy targets and their portion of circles that can be 100s and 50s
+    #                ACC   100s    50s
+    ACC_TARGETS = [ [ 99,  0.010,  0.0   ],
+                    [ 98,  0.024,  0.0   ],
+                    [ 97,  0.040,  0.0   ],
+                    [ 95,  0.0625, 0.003 ] ]
+
+    @staticmethod
+    @Analyses.register('hit_stats', [ 'od', 'exp_300s', 'prob_accs', 'max_ods', 'needed_300s', 'counts' ], score_only=True)
+    def hit_stats(score_data):
+        """
+        Treats the plays as samples of how each hitobject gets hit, and for every OD in ``OD_SWEEP`` evaluates:
+
+        exp_300s:  expected % of hitobjects that are 300s
+        prob_accs: % probability of reaching each of the ``ACC_TARGETS``, of shape (num ODs, num targets)
+
+        max_ods is the highest OD each accuracy target is more likely than not to be reached at (NaN if none),
+        needed_300s is the number of 300s each target needs, and counts is [ num plays, num circles, num sliders ].
+
+        Meant to be used on plays of a single map with a single mod combination.
+        """
+        unique_map_timestamps = np.unique(score_data.index.get_level_values(1))
+        num_plays = unique_map_timestamps.shape[0]
+
+        # Extract hit press data
+        #
+        # NOTE: If only hitcircles are extracted for processing (no sliders), then
+        # results tend to display very low probability outcomes. This is because a lot
+        # of accuracy increasing hits come from sliders. Sliders are kept as a result.
+        type_map = score_data['TYPE_MAP'].values
+        all_select = (type_map == StdScoreData.ACTION_PRESS)
+
+        slider_select = np.zeros(score_data.shape[0], dtype=np.bool8)
+        slider_select[:-1] = \
+            (type_map[:-1] == StdScoreData.ACTION_PRESS) & (
+                (type_map[1:] == StdScoreData.ACTION_HOLD) | \
+                (type_map[1:] == StdScoreData.ACTION_RELEASE)
+            )
+
+        # Reduce data to just contain hitobject press info
+        hitcircles_data = score_data[all_select]
+        hit_timings = hitcircles_data['T_MAP'].values
+        hit_offsets = hitcircles_data['T_HIT'].values - hitcircles_data['T_MAP'].values
+
+        # Determine number of circles and sliders in the map
+        unique_hit_timings, unique_idx = np.unique(hit_timings, return_index=True)
+        num_total = unique_idx.shape[0]
+
+        slider_mask = slider_select[all_select][unique_idx]
+        num_sliders = np.count_nonzero(slider_mask)
+        num_circles = num_total - num_sliders
+
+        # Determine number of misses per hitobject
+        miss_select = \
+            (score_data['TYPE_HIT'].values == StdScoreData.TYPE_MISS) & \
+            (type_map == StdScoreData.ACTION_PRESS)
+        miss_mask = miss_select[all_select]
+
+        _, miss_count = GroupStats.agg(hit_timings, miss_mask.astype(np.int64), 'sum')
+
+        # Stacks hits for each timestamp and calculates average and deviation
+        _, avgs, devs, counts = GroupStats.agg(hit_timings, hit_offsets, 'mean', 'std', 'count')
+        devs = np.where(counts > 1, devs, 1)
+
+        devs[devs == 0] = 1
+
+        # Needed 300s for each accuracy target
+        needed_num_300s = np.asarray([
+            int((num_circles + num_sliders) - num_circles*(portion_100s + portion_50s))
+            for _, portion_100s, portion_50s in ScoreAnalysis.ACC_TARGETS
+        ])
+
+        hit_windows = OsuUtils.od_to_ms(ScoreAnalysis.OD_SWEEP)
+
+        # For each score point, calculate probability it would be within OD window for one of the plays
+        # Sliders are excluded from required 300s by marking them as 100% change of 300s because
+        # osu! slider hit window is so lenient it may as well be a free hit
+        # Misses are averaged into the probabilities
+        prob_300s = AccProbs.get_300_probs(avgs, devs, hit_windows, slider_mask, miss_count/num_plays)
+
+        # Distribution of number of 300s for each OD, and probability of getting at least the needed 300s for each accuracy
+        pmfs = AccProbs.get_pmfs(prob_300s)
+        prob_accs = AccProbs.get_tail_probs(pmfs, needed_num_300s)
+
+        exp_300s = np.sum(prob_300s, axis=1)
+
+        # Highest OD each accuracy target is more likely than not to be reached at
+        max_ods = np.full(needed_num_300s.shape[0], np.nan)
+        for i in range(needed_num_300s.shape[0]):
+            likely = np.flatnonzero(prob_accs[:, i] >= 0.5)
+            if likely.shape[0] > 0:
+                max_ods[i] = ScoreAnalysis.OD_SWEEP[likely[-1]]
+
+        return \
+            ScoreAnalysis.OD_SWEEP, \
+            100*exp_300s/max(num_total, 1), \
+            100*prob_accs, \
+            max_ods, \
+            needed_num_300s, \
+            np.asarray([ num_plays, num_circles, num_sliders ])
@@ -0,0 +1,191 @@
+"""
+Difficulty of score points over the course of the map.
+"""
+import numpy as np
+
+from osu_analysis import StdScoreData
+
+from misc.osu_utils import OsuUtils
+from misc.play_segments import PlaySegments
+from analysis.analyses import Analyses
+
+
+
+class TimingAnalysis():
+
+    @staticmethod
+    @Analyses.register('timing_aim_difficulty', [ 'x', 'y', 'is_miss' ])
+    def aim_difficulty(score_data, diff_data):
+        """
+        Aim factor of each score point against its map timing.
+        """
+        # Check if there is any data to operate on
+        if score_data.shape[0] < 3:
+            data_stub = np.asarray([])
+            return data_stub, data_stub, data_stub
+
+        type_map = score_data['TYPE_MAP'].values
+
+        # Selects release points for short sliders. These kind of sliders
+        # do not have any consequences for not aiming the slider end. As a
+        # result, it is not a significant aiming challenge if they go very
+        # fast. Sliders are considered short when they have no hold scorepoints.
+        short_slider_rel_select = np.zeros(score_data.shape[0], dtype=np.bool8)
+        short_slider_rel_select[1:] = (
+            (type_map[:-1] == StdScoreData.ACTION_PRESS) &
+            (type_map[1:] == StdScoreData.ACTION_RELEASE)
+        )
+
+        # For now selects press points for short sliders. Sliders are considered
+        # short when they have no hold scorepoints.
+        #
+        # Slider paths oriented in the direction of jump effectively have their
+        # CS artificially increased by at least 1.5x (due to follow circle size).
+        # Can be a bit more if slider velocity and path is right.
+        #
+        # TODO: How to determine if slider path is oriented in the direction of jump?
+        # TODO: What if slider path goes into opposite direction of jump?
+        short_slider_prs_select = np.zeros(score_data.shape[0], dtype=np.bool8)
+        short_slider_prs_select[:-1] = (
+            (type_map[:-1] == StdScoreData.ACTION_PRESS) &
+            (type_map[1:] == StdScoreData.ACTION_RELEASE)
+        )
+
+        score_data = score_data[~short_slider_rel_select]
+        diff_data  = diff_data[~short_slider_rel_select]
+
+        short_slider_prs_select = short_slider_prs_select[~short_slider_rel_select]
+        type_map = type_map[~short_slider_rel_select]
+
+        cs_px = OsuUtils.cs_to_px(score_data['CS'].values[0])
+        dists = diff_data['DIFF_XY_DIST'].values
+
+        # Small distance do not require to reposition the cursor to aim the next
+        # note. As a result patters like double taps can have very short timing
+        # between them while being offset by some amount, resulting in high
+        # velocities. Distances are considered small if the scorepoints are less
+        # than 75% the diameter of circle size apart.
+        #
+        # NOTE: This doesn't work for streams or large stacks as they have multiple
+        # successions of small distances, effectively requiring the player to move
+        # the cursor. Perhaps look into implementing a strategy that decides whether
+        # velocity is too large for notes that are closely spaced.
+        small_small_dist_select = (dists < cs_px*1.5)
+
+        # Calculate data (x2 is considered current score point, x1 and x0 are previous score points)
+        t_map  = score_data['T_MAP'].values
+        vels   = diff_data['DIFF_XY_LIN_VEL'].values
+        angles = diff_data['DIFF_XY_ANGLE'].values
+
+        is_miss = (
+            (score_data['TYPE_HIT'].values == StdScoreData.TYPE_MISS) & (
+                (type_map == StdScoreData.ACTION_HOLD) |
+                (type_map == StdScoreData.ACTION_PRESS)
+            )
+        )
+
+        Analyses.check_timing(score_data)
+
+        angle_factor = (1 + 2.5*np.exp(-0.026*angles))/(1 + 2.5)
+        cs_factor = np.full_like(angle_factor, OsuUtils.cs_to_px(4)/cs_px)
+        cs_factor[short_slider_prs_select] = (OsuUtils.cs_to_px(4)/(1.5*cs_px))
+
+        data_y = (cs_factor*vels*angle_factor*4)
+        inv_filter = ~np.isnan(data_y)
+
+        data_y = data_y[inv_filter]
+        data_x = t_map[inv_filter]
+        is_miss = is_miss[inv_filter]
+
+        return data_x, data_y, is_miss
+
+
+    @staticmethod
+    @Analyses.register('timing_reading_difficulty', [ 'x', 'y', 'is_miss' ])
+    def reading_difficulty(score_data, diff_data):
+        """
+        Number of visible notes times BPM of each score point against its map timing.
+        """
+        # Check if there is any data to operate on
+        if score_data.shape[0] < 3:
+            data_stub = np.asarray([])
+            return data_stub, data_stub, data_stub
+
+        type_map = score_data['TYPE_MAP'].values
+        type_hit = score_data['TYPE_HIT'].values
+
+        # Calculate data (x2 is considered current score point, x1 and x0 are previous score points)
+        t_map  = score_data['T_MAP'].values
+
+        num_visible = diff_data['DIFF_VIS_VISIBLE'].values
+        bpm         = 15000/diff_data['DIFF_T_PRESS_DIFF'].values
+
+        is_miss = (
+            (type_hit == StdScoreData.TYPE_MISS) & (
+                (type_map == StdScoreData.ACTION_HOLD) |
+                (type_map == StdScoreData.ACTION_PRESS)
+            )
+        )
+
+        Analyses.check_timing(score_data)
+
+        data_y = num_visible*bpm
+        inv_filter = ~np.isnan(data_y)
+
+        data_y = data_y[inv_filter]
+        data_x = t_map[inv_filter]
+        is_miss = is_miss[inv_filter]
+
+        return data_x, data_y, is_miss
+
+
+    @staticmethod
+    @Analyses.register('timing_bpm_inc', [ 'x', 'y' ])
+    def bpm_inc(score_data, diff_data):
+        """
+        Time since the last BPM increase at each score point against its map timing.
+        Only the first play is used.
+        """
+        return TimingAnalysis.__get_first_play(score_data, diff_data, 'DIFF_T_PRESS_INC')
+
+
+    @staticmethod
+    @Analyses.register('timing_bpm_dec', [ 'x', 'y' ])
+    def bpm_dec(score_data, diff_data):
+        """
+        Time since the last BPM decrease at each score point against its map timing.
+        Only the first play is used.
+        """
+        return TimingAnalysis.__get_first_play(score_data, diff_data, 'DIFF_T_PRESS_DEC')
+
+
+    @staticmethod
+    @Analyses.register('timing_visible_ar', [ 'x', 'y' ])
+    def visible_ar(score_data, diff_data):
+        """
+        Number of objects visible per AR period at each score point against its map timing.
+        Only the first play is used.
+        """
+        return TimingAnalysis.__get_first_play(score_data, diff_data, 'DIFF_VIS_VISIBLE')
+
+
+    @staticmethod
+    def __get_first_play(score_data, diff_data, column):
+        segments = PlaySegments(score_data, diff_data)
+        if len(segments) == 0:
+            data_stub = np.asarray([])
+            return data_stub, data_stub
+
+        if len(segments) > 1:
+            Analyses.logger.info('Multiple plays are selected. Taking just the first one...')
+
+        play = segments.slices()[0]
+
+        # Plays are told apart by md5 and timestamp. Keep to the lowest mods in case there is more than one
+        mods   = segments.take(score_data.index.get_level_values(2).values)[play]
+        select = (mods == mods.min())
+
+        data_x = segments.column(score_data, 'T_MAP')[play][select]
+        data_y = segments.column(diff_data, column)[play][select]
+
+        return data_x, data_y
@@ -0,0 +1,59 @@
+# Runs graph analyses over a data file without the GUI and saves the results. Example:
+#
+#   python src/analyze.py data/data.h5 -o reports -a aim_difficulty dev_velocity -j 4 -p dev_data=2
+#
+# Everything is put under __main__ so worker processes don't re-run it on import
+if __name__ == '__main__':
+    import os, sys
+    import ast
+    import argparse
+    import multiprocessing
+
+    is_win = sys.platform.startswith('win')
+    is_exe = getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS')
+
+    if is_win and is_exe:
+        # See: https://stackoverflow.com/a/27694505
+        multiprocessing.freeze_support()
+
+    if not is_exe and ('VIRTUAL_ENV' in os.environ):
+        # Add editable libs to path
+        sys.path.append(f'{os.environ["VIRTUAL_ENV"]}{os.sep}src')
+
+    from analysis import Analyses
+    from analysis.batch import AnalysisBatch
+
+    parser = argparse.ArgumentParser(description='Runs graph analyses over all maps in a data file and saves the results')
+    parser.add_argument('data_file', nargs='?', help='Score data file (*.h5). Difficulty data is read from the *_diff.h5 file next to it')
+    parser.add_argument('-o', '--out-dir', default='reports', help='Directory results are saved to')
+    parser.add_argument('-a', '--analyses', nargs='+', default=None, metavar='NAME', help='Analyses to run. Runs all of them if not given')
+    parser.add_argument('-p', '--param', action='append', default=[], metavar='KEY=VALUE', help='Setting passed to the analyses that have it')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes. Defaults to the number of CPUs')
+    parser.add_argument('-l', '--list', action='store_true', help='List the available analyses and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for name in Analyses.get_names():
+            info = Analyses.get_info(name)
+            print(f'{name:<28} outputs: {", ".join(info["outputs"])}' + (f'  |  settings: {", ".join(info["params"])}' if info['params'] else ''))
+        sys.exit(0)
+
+    if args.data_file is None:
+        parser.error('data_file is required')
+
+    unknown = set(args.analyses or []) - set(Analyses.get_names())
+    if unknown:
+        parser.error(f'Unknown analyses: {", ".join(sorted(unknown))}')
+
+    params = {}
+    for param in args.param:
+        key, sep, value = param.partition('=')
+        if not sep:
+            parser.error(f'Setting must be KEY=VALUE: {param}')
+
+        try: params[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            params[key] = value
+
+    index = AnalysisBatch.run(args.data_file, args.out_dir, args.analyses, params, args.jobs)
+    print(f'{index.shape[0]} results written to {args.out_dir}, {(index["ERROR"] != "").sum()} failed')
@@ -13,6 +13,7 @@ from beatmap_reader import BeatmapIO
 
 from misc.Logger import Logger
 from file_managers import AppConfig
+from file_managers.map_name_cache import MapNameCache
 
 
 """
@@ -114,6 +115,9 @@ class App(QtWidgets.QMainWindow):
             with open('config.json', 'w') as f:
                 json.dump(AppConfig.cfg, f, indent=4)
 
+        # osu!.db takes a while to parse for large libraries, so it's parsed in the background
+        MapNameCache.preload()
+
         self.__osu_recorder = OsuRecorder(AppConfig.cfg['osu_dir'], callback=self.__play_handler_signal.emit)
 
         if __AUTO_RECORDER_EN__:
@@ -303,6 +307,7 @@ class App(QtWidgets.QMainWindow):
 
         # Hide any widgets to allow the app to close
         try:
+            self.data_overview_window.cancel_recalc()
             self.data_overview_window.hide()
             if __DATA_GRAPHS_EN__:   self.data_graphs_window.hide()
             if __MAP_ARCHITECT_EN__: self.map_architect_window.hide()
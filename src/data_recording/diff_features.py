@@ -0,0 +1,109 @@
+"""
+Registry of difficulty features and the intermediates they are computed from.
+
+Every DIFF_* column is declared as a feature along with the inputs it needs. An input is either
+the name of a registered intermediate, another feature, or a score data column (T_MAP, X_MAP, AR, etc).
+'DTYPE' is also available as an input, the dtype features are computed in, so that arrays features
+allocate are of that dtype to begin with rather than converted once computed.
+When a set of features is evaluated, each intermediate is computed at most once and shared across
+all features that need it, and only the intermediates the requested features depend on get computed.
+
+Registering a feature:
+
+    @DiffFeatures.feature('DIFF_XY_DIST', [ 'N', 'XY_NORM', 'DTYPE' ], label='Distance (osu!px)')
+    def __get_xy_dist(n, xy_norm, dtype):
+        ...
+
+Registered features are picked up by DiffNpy.get_data and by the composition viewer.
+"""
+import numpy as np
+
+
+
+class DiffFeatures():
+
+    __intermediates = {}
+    __features = {}
+
+    @staticmethod
+    def intermediate(name, inputs):
+        """
+        Decorator registering a function that computes a shared intermediate value.
+        The function is called with the resolved ``inputs`` as positional arguments.
+        """
+        def decorator(func):
+            DiffFeatures.__intermediates[name] = {
+                'inputs' : inputs,
+                'func'   : func,
+            }
+            return staticmethod(func)
+
+        return decorator
+
+
+    @staticmethod
+    def feature(name, inputs, label=None, scale=1.0):
+        """
+        Decorator registering a function that computes a DIFF_* column.
+
+        ``label`` is the axis label used when displaying the feature, and ``scale``
+        is the factor the values are multiplied by when they are displayed.
+        """
+        def decorator(func):
+            DiffFeatures.__features[name] = {
+                'inputs' : inputs,
+                'func'   : func,
+                'label'  : name if label is None else label,
+                'scale'  : scale,
+            }
+            return staticmethod(func)
+
+        return decorator
+
+
+    @staticmethod
+    def get_names():
+        """
+        Names of all registered features in order of registration
+        """
+        return list(DiffFeatures.__features.keys())
+
+
+    @staticmethod
+    def get_info(name):
+        return DiffFeatures.__features[name]
+
+
+    @staticmethod
+    def compute(score_data, features=None, dtype=np.float64):
+        """
+        Evaluates the requested features for a single play's score data.
+
+        Returns a dict of feature name -> array of values. If ``features``
+        is None then all registered features are evaluated.
+
+        Score data columns are converted to ``dtype`` before being used, so features
+        are computed in that precision, and the returned values are of that ``dtype``.
+        """
+        if features is None:
+            features = DiffFeatures.get_names()
+
+        dtype = np.dtype(dtype)
+        cache = { 'DTYPE' : dtype }
+
+        def resolve(name):
+            if name in cache:
+                return cache[name]
+
+            if name in DiffFeatures.__features:
+                entry = DiffFeatures.__features[name]
+            elif name in DiffFeatures.__intermediates:
+                entry = DiffFeatures.__intermediates[name]
+            else:
+                cache[name] = score_data[name].values.astype(dtype, copy=False)
+                return cache[name]
+
+            cache[name] = entry['func'](*[ resolve(input_) for input_ in entry['inputs'] ])
+            return cache[name]
+
+        return { name : resolve(name).astype(dtype, copy=False) for name in features }
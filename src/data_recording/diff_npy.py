@@ -6,6 +6,9 @@ import pandas as pd
 from misc.Logger import Logger
 from misc.osu_utils import OsuUtils
 
+from data_recording.diff_features import DiffFeatures
+from file_managers.config_mgr import AppConfig
+
 from osu_analysis import StdScoreData
 
 
@@ -14,462 +17,431 @@ class DiffNpy():
 
     logger = Logger.get_logger(__name__)
 
-    @staticmethod
-    def __process_t_press(score_data):
-        """
-        Calculates press related difficulty attributes
-        diff_vec = [
-            t_press_diff,  # Time difference between presses
-            t_press_inc,   # Time since last increase between scorepoint press timing
-            t_press_dec,   # Time since last decrease between scorepoint press timing
-            t_press_rhm,   # Scorepoint press's relative spacing compared to other scorepoint presses
-            t_hold_dur,    # Time duration of hold
-        ]
-        """
-        map_t = score_data['T_MAP'].values
+    INDEX_NAMES = [ 'MD5', 'MODS', 'LAYOUT', 'IDXS' ]
+    PERF_COLUMNS = [ 'PERF_DT_NOTES', 'PERF_DT_HITS', 'PERF_X_OFFSET', 'PERF_Y_OFFSET', 'PERF_T_OFFSET' ]
 
-        prs_select = (score_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-        rel_select = (score_data['TYPE_MAP'] == StdScoreData.ACTION_RELEASE)
-        hld_select = (score_data['TYPE_MAP'] == StdScoreData.ACTION_HOLD)
+    @DiffFeatures.intermediate('N', [ 'T_MAP' ])
+    def __get_n(map_t):
+        return map_t.shape[0]
 
-        map_t_prs_select = prs_select
-        map_t_rel_select = rel_select
 
-        # TODO: Figure out how to relate presses to releases associated with holds
-        #map_t_hld_select = np.zeros(map_t.shape[0], dtype=np.bool8)
-        #map_t_hld_select[1:] = (prs_select[:-1] & rel_select[1:]) | (hld_select[:-1] & rel_select[1:])
+    @DiffFeatures.intermediate('PRS_SELECT', [ 'TYPE_MAP' ])
+    def __get_prs_select(map_type):
+        return (map_type == StdScoreData.ACTION_PRESS)
 
-        map_t_prs_idx_ref = np.arange(map_t_prs_select.shape[0])[map_t_prs_select]
-        #map_t_hld_idx_ref = np.arange(map_t_hld_select.shape[0])[map_t_hld_select]
 
-        def __get_t_press_mask():
-            t_press_mask = np.zeros(score_data.shape[0])
-            t_press_mask[map_t_prs_select] = 1
+    @DiffFeatures.intermediate('PRS_IDX_REF', [ 'PRS_SELECT' ])
+    def __get_prs_idx_ref(prs_select):
+        return np.arange(prs_select.shape[0])[prs_select]
 
-            return t_press_mask
 
-        def __get_t_press_diff():
-            """
-            Gets the difference between each scorepoint press timing
-            Invalid entries are set to int32.max
+    @DiffFeatures.intermediate('T_PRS', [ 'T_MAP', 'PRS_SELECT' ])
+    def __get_t_prs(map_t, prs_select):
+        return map_t[prs_select]
 
-            Valid range: [0, int32.max - 1]
 
-            Invalid scorepoints:
-                - Scorepoint indices: [0]
-                - Scorepoints that are not a press type
-                  Use t_press_mask to filter out invalid entries
-            """
-            t_press_diff = np.full(score_data.shape[0], np.nan)
+    @DiffFeatures.intermediate('T_PRS_DT', [ 'T_PRS' ])
+    def __get_t_prs_dt(map_t_prs):
+        """
+        Time between consecutive scorepoint presses; t1 - t0
+        """
+        return map_t_prs[1:] - map_t_prs[:-1]
 
-            # Not enough scorepoint presses
-            if map_t_prs_idx_ref.shape[0] < 2:
-                return t_press_diff
 
-            map_t_prs = map_t[map_t_prs_select]
-            t_press_diff[map_t_prs_idx_ref[1:]] = map_t_prs[1:] - map_t_prs[:-1]
-            return t_press_diff
+    @DiffFeatures.intermediate('XY_DX', [ 'X_MAP' ])
+    def __get_xy_dx(map_x):
+        return map_x[1:] - map_x[:-1]  # x1 - x0
 
-        def __get_t_press_rate():
-            """
-            Gets the difference across 3 scorepoint press timings
-            Invalid entries are set to int32.max
 
-            Valid range: [0, int32.max - 1]
+    @DiffFeatures.intermediate('XY_DY', [ 'Y_MAP' ])
+    def __get_xy_dy(map_y):
+        return map_y[1:] - map_y[:-1]  # y1 - y0
 
-            Invalid scorepoints:
-                - Scorepoint indices: [0, 1]
-                - Scorepoints that are not a press type
-                  Use t_press_mask to filter out invalid entries
-            """
-            t_press_diff = np.full(score_data.shape[0], np.nan)
 
-            # Not enough scorepoint presses
-            if map_t_prs_idx_ref.shape[0] < 3:
-                return t_press_diff
+    @DiffFeatures.intermediate('XY_NORM', [ 'XY_DX', 'XY_DY' ])
+    def __get_xy_norm(dx, dy):
+        return (dx**2 + dy**2)**0.5
 
-            map_t_prs = map_t[map_t_prs_select]
-            t_press_diff[map_t_prs_idx_ref[2:]] = map_t_prs[2:] - map_t_prs[:-2]
-            return t_press_diff
 
-        def __get_t_press_inc():
-            """
-            Get the time since last increase in scorepoint press timing
-            Invalid entries are set to int32.max
+    @DiffFeatures.intermediate('XY_THETA_DIFF', [ 'XY_DX', 'XY_DY' ])
+    def __get_xy_theta_diff(dx, dy):
+        """
+        Angle between each consecutive pair of scorepoint displacements in deg, rounded
+        """
+        theta_d = np.arctan2(dy, dx)*(180/math.pi)
 
-            A scorepoint is valid if:
-                - Scorepoint indices: [0, 1]
-                - Scorepoints that are not a press type
-                  Use t_press_mask to filter out invalid entries
-            """
-            t_press_inc = np.full(score_data.shape[0], np.nan)
+        thetas = np.abs(theta_d[1:] - theta_d[:-1])
+        thetas[thetas > 180] = 360 - thetas[thetas > 180]
+        return np.round(thetas)
 
-            # Not enough scorepoint presses
-            if map_t_prs_idx_ref.shape[0] < 3:
-                return t_press_inc
 
-            map_t_prs = map_t[map_t_prs_select]
+    @DiffFeatures.feature('DIFF_T_PRESS_DIFF', [ 'N', 'PRS_IDX_REF', 'T_PRS_DT', 'DTYPE' ], label='Time interval between presses (ms)')
+    def __get_t_press_diff(n, map_t_prs_idx_ref, map_t_prs_dt, dtype):
+        """
+        Gets the difference between each scorepoint press timing
+        Invalid entries are set to int32.max
 
-            dt0 = map_t_prs[1:-1] - map_t_prs[:-2]   # t1 - t0
-            dt1 = map_t_prs[2:] - map_t_prs[1:-1]    # t2 - t1
+        Valid range: [0, int32.max - 1]
 
-            # The first interval increase comes as soon as note t2 is further than expected
-            # This makes the time since last increase for first and second notes ALWAYS 0
-            t_press_inc[map_t_prs_idx_ref[0:2]] = 0
+        Invalid scorepoints:
+            - Scorepoint indices: [0]
+            - Scorepoints that are not a press type
+              Use t_press_mask to filter out invalid entries
+        """
+        t_press_diff = np.full(n, np.nan, dtype=dtype)
 
-            ms = 0
+        # Not enough scorepoint presses
+        if map_t_prs_idx_ref.shape[0] < 2:
+            return t_press_diff
 
-            # How much the interval needs to change by to be considered a BPM decrease
-            # For example, if the previous interval is 100ms and the current is 200ms,
-            # then the interval is considered a BPM decrease (1/8 snap to 1/4 or 1/4 to 1/2, etc).
-            # On the other hand, if the previous interval is 100ms and the interval changes to 105ms,
-            # then the interval is not considered a BPM increase.
-            d_threshold = 1.05  # Must be >= 1
+        t_press_diff[map_t_prs_idx_ref[1:]] = map_t_prs_dt
+        return t_press_diff
 
-            for i in range(dt0.shape[0]):
-                if dt1[i] > dt0[i]*d_threshold:
-                    # Next note is further from the previous than expected, but actual
-                    # time resets from the moment the note that was expected did not occur.
-                    # This expected note would have been at t1 + (t1 - t0), so we need to determine
-                    # the time difference between t2 and t1 + (t1 - t0), which is (t2 - t1) - (t1 - t0)
-                    ms = dt1[i] - dt0[i]
-                else:
-                    # Otherwise, keep adding time; Current note is t2,
-                    # so the time interval to add is t2 - t1
-                    ms += dt1[i]
 
-                t_press_inc[map_t_prs_idx_ref[i + 2]] = ms
+    @DiffFeatures.feature('DIFF_T_PRESS_RATE', [ 'N', 'PRS_IDX_REF', 'T_PRS', 'DTYPE' ], label='Time interval across 3 presses (ms)')
+    def __get_t_press_rate(n, map_t_prs_idx_ref, map_t_prs, dtype):
+        """
+        Gets the difference across 3 scorepoint press timings
+        Invalid entries are set to int32.max
 
-            return t_press_inc
+        Valid range: [0, int32.max - 1]
 
-        def __get_t_press_dec():
-            """
-            Get the time since last decrease in scorepoint press timing
-            Invalid entries are set to int32.max
+        Invalid scorepoints:
+            - Scorepoint indices: [0, 1]
+            - Scorepoints that are not a press type
+              Use t_press_mask to filter out invalid entries
+        """
+        t_press_diff = np.full(n, np.nan, dtype=dtype)
 
-            A scorepoint is valid if:
-                - Scorepoint indices: [0, 1]
-                - Scorepoints that are not a press type
-                  Use t_press_mask to filter out invalid entries
-            """
-            t_press_dec = np.full(score_data.shape[0], np.nan)
+        # Not enough scorepoint presses
+        if map_t_prs_idx_ref.shape[0] < 3:
+            return t_press_diff
 
-            # Not enough scorepoint presses
-            if map_t_prs_idx_ref.shape[0] < 3:
-                return t_press_dec
+        t_press_diff[map_t_prs_idx_ref[2:]] = map_t_prs[2:] - map_t_prs[:-2]
+        return t_press_diff
 
-            map_t_prs = map_t[map_t_prs_select]
 
-            dt0 = map_t_prs[1:-1] - map_t_prs[:-2]   # t1 - t0
-            dt1 = map_t_prs[2:] - map_t_prs[1:-1]    # t2 - t1
+    @DiffFeatures.feature('DIFF_T_PRESS_INC', [ 'N', 'PRS_IDX_REF', 'T_PRS_DT', 'DTYPE' ], label='BPM Increase Time (ms)')
+    def __get_t_press_inc(n, map_t_prs_idx_ref, map_t_prs_dt, dtype):
+        """
+        Get the time since last increase in scorepoint press timing
+        Invalid entries are set to int32.max
 
-            # The first interval decrease comes from lack of notes before the start of the map.
-            # The time since last decrease for first note is ALWAYS 0
-            # The time since last decrease for the second note is ALWAYS the time between the first and second notes
-            t_press_dec[map_t_prs_idx_ref[0]] = 0
-            t_press_dec[map_t_prs_idx_ref[1]] = dt0[0]
+        A scorepoint is valid if:
+            - Scorepoint indices: [0, 1]
+            - Scorepoints that are not a press type
+              Use t_press_mask to filter out invalid entries
+        """
+        t_press_inc = np.full(n, np.nan, dtype=dtype)
 
-            ms = dt0[0]
+        # Not enough scorepoint presses
+        if map_t_prs_idx_ref.shape[0] < 3:
+            return t_press_inc
 
-            # How much the interval needs to change by to be considered a BPM increase
-            # For example, if the previous interval is 100ms and the current is 50ms,
-            # then the interval is considered a BPM increase (1/4 snap to 1/8 or 1/2 to 1/4, etc).
-            # On the other hand, if the previous interval is 100ms and the interval changes to 95ms,
-            # then the interval is not considered a BPM increase.
-            d_threshold = 0.95  # Must be <= 1
+        dt0 = map_t_prs_dt[:-1]  # t1 - t0
+        dt1 = map_t_prs_dt[1:]   # t2 - t1
 
-            for i in range(dt0.shape[0]):
-                if dt1[i] < dt0[i]*d_threshold:
-                    # Next note is closer to the previous one than expected
-                    # Reset time since last decrease
-                    ms = 0
-                else:
-                    # Otherwise, keep adding time; Current note is t2,
-                    # so the time interval to add is t2 - t1
-                    ms += dt1[i]
+        # The first interval increase comes as soon as note t2 is further than expected
+        # This makes the time since last increase for first and second notes ALWAYS 0
+        t_press_inc[map_t_prs_idx_ref[0:2]] = 0
 
-                t_press_dec[map_t_prs_idx_ref[i + 2]] = ms
+        ms = 0
 
-            return t_press_dec
+        # How much the interval needs to change by to be considered a BPM decrease
+        # For example, if the previous interval is 100ms and the current is 200ms,
+        # then the interval is considered a BPM decrease (1/8 snap to 1/4 or 1/4 to 1/2, etc).
+        # On the other hand, if the previous interval is 100ms and the interval changes to 105ms,
+        # then the interval is not considered a BPM increase.
+        d_threshold = 1.05  # Must be >= 1
 
-        def __get_t_press_rhm():
-            # TODO: See https://discord.com/channels/546120878908506119/886986744090734682/935701345451786290
-            # https://cdn.discordapp.com/attachments/886986744090734682/935701344721961010/unknown.png
-            #
-            # somewhere between 0.25 and 0.5, 0.5 and 0.75 would be considered irregular snaps, therefore higher rhythmic complexity
-            # for slightly off from 50%, I expect offsets equal to (t2 - t0)/2 - (t2 - t0)*percent
-            """
-            Scorepoint press's relative spacing compared to other scorepoint presses x ϵ (0, 1)
-            Invalid entries are set to int32.max
+        for i in range(dt0.shape[0]):
+            if dt1[i] > dt0[i]*d_threshold:
+                # Next note is further from the previous than expected, but actual
+                # time resets from the moment the note that was expected did not occur.
+                # This expected note would have been at t1 + (t1 - t0), so we need to determine
+                # the time difference between t2 and t1 + (t1 - t0), which is (t2 - t1) - (t1 - t0)
+                ms = dt1[i] - dt0[i]
+            else:
+                # Otherwise, keep adding time; Current note is t2,
+                # so the time interval to add is t2 - t1
+                ms += dt1[i]
 
-            A scorepoint is valid if:
-                - Scorepoint indices: [0, 1]
-                - Scorepoints that are not a press type
-                  Use t_press_mask to filter out invalid entries
-            """
-            t_press_rhm = np.full(score_data.shape[0], np.nan)
+            t_press_inc[map_t_prs_idx_ref[i + 2]] = ms
 
-            # Not enough scorepoint presses
-            if map_t_prs_idx_ref.shape[0] < 3:
-                return t_press_rhm
+        return t_press_inc
 
-            map_t_prs = map_t[map_t_prs_select]
 
-            part  = map_t_prs[1:] - map_t_prs[:-1]  # t1 - t0
-            total = map_t_prs[2:] - map_t_prs[:-2]  # t2 - t0
+    @DiffFeatures.feature('DIFF_T_PRESS_DEC', [ 'N', 'PRS_IDX_REF', 'T_PRS_DT', 'DTYPE' ], label='BPM Decrease Time (ms)')
+    def __get_t_press_dec(n, map_t_prs_idx_ref, map_t_prs_dt, dtype):
+        """
+        Get the time since last decrease in scorepoint press timing
+        Invalid entries are set to int32.max
 
-            # x = (t1 - t0)/(t2 - t0])
-            t_press_rhm[map_t_prs_idx_ref[2:]] = 100*part[:-1]/total
-            return t_press_rhm
+        A scorepoint is valid if:
+            - Scorepoint indices: [0, 1]
+            - Scorepoints that are not a press type
+              Use t_press_mask to filter out invalid entries
+        """
+        t_press_dec = np.full(n, np.nan, dtype=dtype)
 
-        def __get_t_hold_dur():
-            """
-            Gets the duration between press and release scorepoints
-            Invalid entries are set to int32.max
+        # Not enough scorepoint presses
+        if map_t_prs_idx_ref.shape[0] < 3:
+            return t_press_dec
 
-            A scorepoint is valid if:
-                - Scorepoint indices: [0]
-                - Scorepoints that are ???
-            """
-            t_hold_dur = np.full(score_data.shape[0], np.nan)
+        dt0 = map_t_prs_dt[:-1]  # t1 - t0
+        dt1 = map_t_prs_dt[1:]   # t2 - t1
 
-            # TODO: Figure this out
-            return t_hold_dur
+        # The first interval decrease comes from lack of notes before the start of the map.
+        # The time since last decrease for first note is ALWAYS 0
+        # The time since last decrease for the second note is ALWAYS the time between the first and second notes
+        t_press_dec[map_t_prs_idx_ref[0]] = 0
+        t_press_dec[map_t_prs_idx_ref[1]] = dt0[0]
 
-            # Not enough scorepoint presses
-            if map_t_hld_idx_ref.shape[0] <= 0:
-                return t_hold_dur
+        ms = dt0[0]
 
-            map_t_prs_hld = map_t[map_t_prs_select & map_t_hld_select]
-            map_t_rel_hld = map_t[map_t_rel_select & map_t_hld_select]
+        # How much the interval needs to change by to be considered a BPM increase
+        # For example, if the previous interval is 100ms and the current is 50ms,
+        # then the interval is considered a BPM increase (1/4 snap to 1/8 or 1/2 to 1/4, etc).
+        # On the other hand, if the previous interval is 100ms and the interval changes to 95ms,
+        # then the interval is not considered a BPM increase.
+        d_threshold = 0.95  # Must be <= 1
 
-            # +1 to set it for release scorepoint instead of press
-            t_hold_dur[map_t_hld_idx_ref + 1] = map_t_rel_hld - map_t_prs_hld
-            return t_hold_dur
+        for i in range(dt0.shape[0]):
+            if dt1[i] < dt0[i]*d_threshold:
+                # Next note is closer to the previous one than expected
+                # Reset time since last decrease
+                ms = 0
+            else:
+                # Otherwise, keep adding time; Current note is t2,
+                # so the time interval to add is t2 - t1
+                ms += dt1[i]
 
-        t_press_mask = __get_t_press_mask()
-        t_press_diff = __get_t_press_diff()
-        t_press_rate = __get_t_press_rate()
-        t_press_inc  = __get_t_press_inc()
-        t_press_dec  = __get_t_press_dec()
-        t_press_rhm  = __get_t_press_rhm()
-        t_hold_dur   = __get_t_hold_dur()
+            t_press_dec[map_t_prs_idx_ref[i + 2]] = ms
 
-        return t_press_mask, t_press_diff, t_press_rate, t_press_inc, t_press_dec, t_press_rhm, t_hold_dur
+        return t_press_dec
 
 
-    @staticmethod
-    def __process_xy(score_data):
-        """
-        Calculates aim related difficulty attributes
-        diff_vec = [
-            xy_dist,       # Distance between every scorepoint
-            xy_angle,      # Angle between every scorepoint
-            xy_lin_vel,    # Linear velocity between every scorepoint
-            xy_ang_vel,    # Angular velocity between every scorepoint
-        ]
+    @DiffFeatures.feature('DIFF_T_PRESS_RHM', [ 'N', 'PRS_IDX_REF', 'T_PRS', 'T_PRS_DT', 'DTYPE' ], label='% the note is from previous note to next note (% of tn[2] - tn[0])')
+    def __get_t_press_rhm(n, map_t_prs_idx_ref, map_t_prs, map_t_prs_dt, dtype):
+        # TODO: See https://discord.com/channels/546120878908506119/886986744090734682/935701345451786290
+        # https://cdn.discordapp.com/attachments/886986744090734682/935701344721961010/unknown.png
+        #
+        # somewhere between 0.25 and 0.5, 0.5 and 0.75 would be considered irregular snaps, therefore higher rhythmic complexity
+        # for slightly off from 50%, I expect offsets equal to (t2 - t0)/2 - (t2 - t0)*percent
         """
-        map_t = score_data['T_MAP'].values
-        map_x = score_data['X_MAP'].values
-        map_y = score_data['Y_MAP'].values
+        Scorepoint press's relative spacing compared to other scorepoint presses x ϵ (0, 1)
+        Invalid entries are set to int32.max
 
-        prs_select = (score_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-        hld_select = (score_data['TYPE_MAP'] == StdScoreData.ACTION_HOLD)
+        A scorepoint is valid if:
+            - Scorepoint indices: [0, 1]
+            - Scorepoints that are not a press type
+              Use t_press_mask to filter out invalid entries
+        """
+        t_press_rhm = np.full(n, np.nan, dtype=dtype)
 
-        aim_select = prs_select | hld_select
-        map_aim_ref = np.arange(score_data.shape[0])[aim_select]
+        # Not enough scorepoint presses
+        if map_t_prs_idx_ref.shape[0] < 3:
+            return t_press_rhm
 
-        map_len = score_data.shape[0]
+        part  = map_t_prs_dt                     # t1 - t0
+        total = map_t_prs[2:] - map_t_prs[:-2]  # t2 - t0
 
-        def __get_xy_dist():
-            """
-            Gets the spacing between each aimpoint
-            Invalid entries are set to int32.max
+        # x = (t1 - t0)/(t2 - t0])
+        t_press_rhm[map_t_prs_idx_ref[2:]] = 100*part[:-1]/total
+        return t_press_rhm
 
-            A scorepoint is valid if:
-                - Scorepoint indices: [0]
-            """
-            xy_dist = np.full(map_len, np.nan)
 
-            # Not enough scorepoints
-            if map_len < 2:
-                return xy_dist
+    @DiffFeatures.feature('DIFF_T_HOLD_DUR', [ 'N', 'DTYPE' ], label='Hold duration (ms)')
+    def __get_t_hold_dur(n, dtype):
+        """
+        Gets the duration between press and release scorepoints
+        Invalid entries are set to int32.max
 
-            dx = map_x[1:] - map_x[:-1]  # x1 - x0
-            dy = map_y[1:] - map_y[:-1]  # y1 - y0
+        A scorepoint is valid if:
+            - Scorepoint indices: [0]
+            - Scorepoints that are ???
 
-            # Cursor is assumed to start on first note, so distance from prev point is 0
-            # xy_dist[0] = 0 (implicit)
-            xy_dist[1:] = (dx**2 + dy**2)**0.5
+        TODO: Figure out how to relate presses to releases associated with holds
+        """
+        t_hold_dur = np.full(n, np.nan, dtype=dtype)
+        return t_hold_dur
 
-            return xy_dist
 
-        def __get_xy_angle():
-            """
-            Gets the angle between each scorepoint in deg
-            Invalid entries are set to int32.max
+    @DiffFeatures.feature('DIFF_XY_DIST', [ 'N', 'XY_NORM', 'DTYPE' ], label='Distance (osu!px)')
+    def __get_xy_dist(n, xy_norm, dtype):
+        """
+        Gets the spacing between each aimpoint
+        Invalid entries are set to int32.max
 
-            A scorepoint is valid if:
-                - Scorepoint indices: [0, -1]
-                    (requires a point present before and after to calc angle of current point)
+        A scorepoint is valid if:
+            - Scorepoint indices: [0]
+        """
+        xy_dist = np.full(n, np.nan, dtype=dtype)
 
-            TODO: Ignore overlaps because https://i.imgur.com/Iwuajar.gif
-            """
-            xy_angle = np.full(map_len, np.nan)
+        # Not enough scorepoints
+        if n < 2:
+            return xy_dist
 
-            # Not enough scorepoints
-            if map_len < 3:
-                return xy_angle
+        # Cursor is assumed to start on first note, so distance from prev point is 0
+        # xy_dist[0] = 0 (implicit)
+        xy_dist[1:] = xy_norm
 
-            dx0 = map_x[1:-1] - map_x[:-2]   # x1 - x0
-            dx1 = map_x[2:] - map_x[1:-1]    # x2 - x1
+        return xy_dist
 
-            dy0 = map_y[1:-1] - map_y[:-2]   # y1 - y0
-            dy1 = map_y[2:] - map_y[1:-1]    # y2 - y1
 
-            theta_d0 = np.arctan2(dy0, dx0)*(180/math.pi)
-            theta_d1 = np.arctan2(dy1, dx1)*(180/math.pi)
+    @DiffFeatures.feature('DIFF_XY_ANGLE', [ 'N', 'XY_THETA_DIFF', 'DTYPE' ], label='Angle (deg)')
+    def __get_xy_angle(n, thetas, dtype):
+        """
+        Gets the angle between each scorepoint in deg
+        Invalid entries are set to int32.max
 
-            thetas = np.abs(theta_d1 - theta_d0)
-            thetas[thetas > 180] = 360 - thetas[thetas > 180]
-            thetas = np.round(thetas)
+        A scorepoint is valid if:
+            - Scorepoint indices: [0, -1]
+                (requires a point present before and after to calc angle of current point)
 
-            # xy_angle[0] = np.nan (implicit)
-            xy_angle[1:-1] = thetas
-            # xy_angle[-1] = np.nan (implicit)
+        TODO: Ignore overlaps because https://i.imgur.com/Iwuajar.gif
+        """
+        xy_angle = np.full(n, np.nan, dtype=dtype)
 
+        # Not enough scorepoints
+        if n < 3:
             return xy_angle
 
-        def __get_xy_lin_vel():
-            """
-            Gets the linear velocity between each aimpoint
-            Invalid entries are set to int32.max
+        # xy_angle[0] = np.nan (implicit)
+        xy_angle[1:-1] = thetas
+        # xy_angle[-1] = np.nan (implicit)
 
-            A scorepoint is valid if:
-                - Scorepoint indices: [0]
-            """
-            xy_lin_vel = np.full(map_len, np.nan)
+        return xy_angle
 
-            # Not enough scorepoints
-            if map_len < 2:
-                return xy_lin_vel
 
-            dx = map_x[1:] - map_x[:-1]  # x1 - x0
-            dy = map_y[1:] - map_y[:-1]  # y1 - y0
-            vels = (dx**2 + dy**2)**0.5
+    @DiffFeatures.feature('DIFF_XY_LIN_VEL', [ 'N', 'T_MAP', 'XY_NORM', 'DTYPE' ], label='Linear Velocity (osu!px/s)', scale=1000)
+    def __get_xy_lin_vel(n, map_t, xy_norm, dtype):
+        """
+        Gets the linear velocity between each aimpoint
+        Invalid entries are set to int32.max
 
-            # xy_lin_vel[0] = 0 (implicit)
-            xy_lin_vel[1:] = vels / (map_t[1:] - map_t[:-1])
+        A scorepoint is valid if:
+            - Scorepoint indices: [0]
+        """
+        xy_lin_vel = np.full(n, np.nan, dtype=dtype)
 
+        # Not enough scorepoints
+        if n < 2:
             return xy_lin_vel
 
-        def __get_xy_ang_vel():
-            """
-            Gets the angular velocity between each aimpoint in RPM
-            Invalid entries are set to int32.max
-
-            A scorepoint is valid if:
-                - Scorepoint indices: [0]
-            """
-            xy_ang_vel = np.full(map_len, np.nan)
-
-            # Not enough scorepoints
-            if map_len < 3:
-                return xy_ang_vel
-
-            dx0 = map_x[1:-1] - map_x[:-2]   # x1 - x0
-            dx1 = map_x[2:] - map_x[1:-1]    # x2 - x1
+        # xy_lin_vel[0] = 0 (implicit)
+        xy_lin_vel[1:] = xy_norm / (map_t[1:] - map_t[:-1])
 
-            dy0 = map_y[1:-1] - map_y[:-2]   # y1 - y0
-            dy1 = map_y[2:] - map_y[1:-1]    # y2 - y1
+        return xy_lin_vel
 
-            theta_d0 = np.arctan2(dy0, dx0)*(180/math.pi)
-            theta_d1 = np.arctan2(dy1, dx1)*(180/math.pi)
 
-            thetas = np.abs(theta_d1 - theta_d0)
-            thetas[thetas > 180] = 360 - thetas[thetas > 180]
-            thetas = np.round(thetas)
+    @DiffFeatures.feature('DIFF_XY_ANG_VEL', [ 'N', 'T_MAP', 'XY_THETA_DIFF', 'DTYPE' ], label='Angular Velocity (RPM)')
+    def __get_xy_ang_vel(n, map_t, thetas, dtype):
+        """
+        Gets the angular velocity between each aimpoint in RPM
+        Invalid entries are set to int32.max
 
-            # xy_ang_vel[0] = 0 (implicit)
-            # xy_ang_vel[1] = 0 (implicit)
-            xy_ang_vel[2:] = 60000/360*thetas/(map_t[2:] - map_t[:-2])  # (deg/ms)*(1000 ms/s)*(60 s/min)*(1 rot/360 deg)
+        A scorepoint is valid if:
+            - Scorepoint indices: [0]
+        """
+        xy_ang_vel = np.full(n, np.nan, dtype=dtype)
 
+        # Not enough scorepoints
+        if n < 3:
             return xy_ang_vel
 
-        xy_dist    = __get_xy_dist()
-        xy_angle   = __get_xy_angle()
-        xy_lin_vel = __get_xy_lin_vel()
-        xy_ang_vel = __get_xy_ang_vel()
+        # xy_ang_vel[0] = 0 (implicit)
+        # xy_ang_vel[1] = 0 (implicit)
+        xy_ang_vel[2:] = 60000/360*thetas/(map_t[2:] - map_t[:-2])  # (deg/ms)*(1000 ms/s)*(60 s/min)*(1 rot/360 deg)
 
-        return xy_dist, xy_angle, xy_lin_vel, xy_ang_vel
+        return xy_ang_vel
 
 
-    @staticmethod
-    def __process_visual(score_data):
-        # TODO: Figure out how I want to do this. Number of notes present is
-        #       not representative of visual difficulty due to sliders. Perhaps
-        #       total hitobject area is a better metric? Will need to be normalized
-        #       to CS.
-        #
-        #       See https://discord.com/channels/546120878908506119/886986744090734682/928768553899925535
-        #       for brief idea regarding area and overlap metrics.
+    # TODO: Figure out how I want to do this. Number of notes present is
+    #       not representative of visual difficulty due to sliders. Perhaps
+    #       total hitobject area is a better metric? Will need to be normalized
+    #       to CS.
+    #
+    #       See https://discord.com/channels/546120878908506119/886986744090734682/928768553899925535
+    #       for brief idea regarding area and overlap metrics.
+    @DiffFeatures.feature('DIFF_VIS_VISIBLE', [ 'N', 'PRS_IDX_REF', 'T_PRS', 'AR', 'DTYPE' ], label='Number of notes visible (#)')
+    def __get_vis_visible(n, map_t_prs_idx_ref, map_t_prs, ar, dtype):
         """
-        Calculates reading related difficulty attributes
-        diff_vec = [
-            vis_visible,    # Number of notes visible
-        ]
+        Gets the number of notes visible
+        Invalid entries are set to int32.max
+
+        A scorepoint is valid if:
+            - Scorepoints that are not a press type
+              Use t_press_mask to filter out invalid entries
         """
-        map_t = score_data['T_MAP'].values
-        map_x = score_data['X_MAP'].values
-        map_y = score_data['Y_MAP'].values
+        vis_visible = np.full(n, np.nan, dtype=dtype)
+        ar_ms = OsuUtils.ar_to_ms(ar[0])
 
-        ar_ms = OsuUtils.ar_to_ms(score_data['AR'].values[0])
+        for i in range(map_t_prs_idx_ref.shape[0]):
+            # TODO: Right hand side should really be release time
+            ar_select = (map_t_prs[i] <= map_t_prs) & (map_t_prs <= (map_t_prs[i] + ar_ms))
+            vis_visible[map_t_prs_idx_ref[i]] = np.count_nonzero(ar_select)
 
-        prs_select = (score_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-        rel_select = (score_data['TYPE_MAP'] == StdScoreData.ACTION_RELEASE)
+        return vis_visible
 
-        map_t_prs_select = prs_select
-        map_t_rel_select = rel_select
-        map_t_hld_select = prs_select[:-1] & rel_select[1:]
 
-        map_t_prs_idx_ref = np.arange(map_t_prs_select.shape[0])[map_t_prs_select]
-        map_t_hld_idx_ref = np.arange(map_t_hld_select.shape[0])[map_t_hld_select]
+    @staticmethod
+    def get_play_offsets(score_data):
+        """
+        Returns the row offsets at which each play in ``score_data`` starts.
+        Rows of a play are expected to be contiguous.
+        """
+        num_rows = score_data.shape[0]
+        if num_rows == 0:
+            return np.zeros(0, dtype=np.int64)
 
-        def __get_vis_visible():
-            """
-            Gets the number of notes visible
-            Invalid entries are set to int32.max
+        is_start = np.zeros(num_rows, dtype=np.bool8)
+        is_start[0] = True
 
-            A scorepoint is valid if:
-                - Scorepoints that are not a press type
-                  Use t_press_mask to filter out invalid entries
-            """
-            vis_visible = np.full(score_data.shape[0], np.nan)
-            map_t_prs = map_t[map_t_prs_select]
+        # Play changes wherever any of MD5, TIMESTAMP, or MODS changes
+        for level in range(3):
+            codes = score_data.index.codes[level]
+            is_start[1:] |= (codes[1:] != codes[:-1])
 
-            for i in range(map_t_prs_idx_ref.shape[0]):
-                # TODO: Right hand side should really be release time
-                ar_select = (map_t_prs[i] <= map_t_prs) & (map_t_prs <= (map_t_prs[i] + ar_ms))
-                #print(f'{i}: {map_t_prs[i]} <= map_t_prs & map_t_prs <= {map_t_prs[i] + ar_ms}')
-                vis_visible[map_t_prs_idx_ref[i]] = np.count_nonzero(ar_select)
+        return np.flatnonzero(is_start)
 
-            return vis_visible
 
-        vis_visible = __get_vis_visible()
+    @staticmethod
+    def get_performance_data(score_data, play_offsets=None):
+        """
+        Computes performance data for a batch of plays in a single pass.
+
+        ``play_offsets`` are the row offsets at which each play in ``score_data`` starts.
+        If None, they are determined from the index. Values are never related across
+        play boundaries.
+
+        Returns a dataframe with the same index as ``score_data`` and columns:
+            PERF_DT_NOTES,  # Interval between note timings across 3 presses
+            PERF_DT_HITS,   # Change in tap offset across 3 presses; Only for 3 valid hit presses in a row
+            PERF_X_OFFSET,  # Rotation compensated x offset of hit from note
+            PERF_Y_OFFSET,  # Rotation compensated y offset of hit from note
+            PERF_T_OFFSET,  # Tap offset of hit from note
+        """
+        if play_offsets is None:
+            play_offsets = DiffNpy.get_play_offsets(score_data)
 
-        return vis_visible
+        num_rows = score_data.shape[0]
 
+        map_x = score_data['X_MAP'].values
+        map_y = score_data['Y_MAP'].values
+        map_t = score_data['T_MAP'].values
 
-    @staticmethod
-    def get_performance_data(score_data):
-        map_x = score_data['map_x'].values
-        map_y = score_data['map_y'].values
-        map_t = score_data['map_t'].values
+        hit_x = score_data['X_HIT'].values
+        hit_y = score_data['Y_HIT'].values
+        hit_t = score_data['T_HIT'].values
 
-        act_type = score_data['action'].values  # What action was performed (press, release, hold)
-        scr_type = score_data['type'].values    # What the resultant score action was (hit press, hit release, miss, empty, etc)
+        act_type = score_data['TYPE_MAP'].values  # What action was performed (press, release, hold)
+        scr_type = score_data['TYPE_HIT'].values  # What the resultant score action was (hit press, hit release, miss, empty, etc)
 
-        hit_t = score_data['replay_t'].values
+        # Play each row belongs to
+        play_ids = np.zeros(num_rows, dtype=np.int64)
+        play_ids[play_offsets[1:]] = 1
+        play_ids = np.cumsum(play_ids)
 
         press_select = (act_type == StdScoreData.ACTION_PRESS)
         valid_select = (scr_type == StdScoreData.TYPE_HITP)
@@ -482,64 +454,51 @@ class DiffNpy():
             Entries consist of score points related to press
             An entry is valid if:
                 - The entry is a press for any note
-                - First 2 notes are invalid
+                - First 2 notes of the play are invalid
+                - Plays with 3 or less presses are invalid
             """
-            dt_notes = np.empty(map_t.shape[0]) * np.nan
-            dt_hits  = np.empty(map_t.shape[0]) * np.nan
+            dt_notes = np.full(num_rows, np.nan)
+            dt_hits  = np.full(num_rows, np.nan)
 
-            # Not enough note presses
-            if np.sum(press_select) <= 3:
+            press_idx_ref = np.flatnonzero(press_select)
+            if press_idx_ref.shape[0] < 3:
                 return dt_notes, dt_hits
 
-            dt_notes_idx_ref = np.arange(map_t.shape[0])
-            dt_hits_idx_ref  = np.arange(map_t.shape[0])
+            press_play_ids = play_ids[press_idx_ref]
 
-            note_start_map_t = map_t[press_select]
-            hit_press_replay_t = hit_t[press_select]
+            # Not enough note presses in play
+            num_play_presses = np.bincount(press_play_ids, minlength=len(play_offsets))
+            press_play_ok = (num_play_presses > 3)[press_play_ids]
 
-            # size = orig[note_press_select]
-            dt_notes_idx_ref = dt_notes_idx_ref[press_select]
-            dt_hits_idx_ref = dt_hits_idx_ref[press_select]
+            # Timing t[i] and t[i + 2] must come from the same play
+            triple_select = (press_play_ids[2:] == press_play_ids[:-2]) & press_play_ok[2:]
 
-            #print('note_start_map_t: ', note_start_map_t.shape[0])
-            #print('dt_notes_mask: ', np.sum(dt_notes_mask))
-            #print('dt_hits_mask: ', dt_hits_mask[:10])
-
-            # Timing t[i]
-            note_timings0 = note_start_map_t[:-2]
-            hit_timings0 = hit_press_replay_t[:-2]
-
-            # Timing t[i + 2]
-            note_timings1 = note_start_map_t[2:]
-            hit_timings1 = hit_press_replay_t[2:]
+            note_timings = map_t[press_idx_ref]
+            hit_timings  = hit_t[press_idx_ref]
 
             # d_tn = tn[i + 2] - tn[i]
             # d_th = (th[i + 2] - tn[i + 2]) - (th[i] - tn[i])
-            _dt_notes = note_timings1 - note_timings0
-            _dt_hits  = (hit_timings1 - hit_timings0) - (note_timings1 - note_timings0)
-
-            # size = orig[note_press_select] - 2
-            dt_notes_idx_ref = dt_notes_idx_ref[2:]
+            _dt_notes = note_timings[2:] - note_timings[:-2]
+            _dt_hits  = (hit_timings[2:] - hit_timings[:-2]) - _dt_notes
 
             # All 3 notes in question must be valid hit presses
-            # size = (orig[note_press_select] - 2)[valid_select]
-            valid_press_select = valid_select[dt_hits_idx_ref]
-            valid_press_select = (valid_press_select[2:] & valid_press_select[1:-1] & valid_press_select[:-2])
-            dt_hits_idx_ref = dt_hits_idx_ref[2:][valid_press_select]
+            valid_press_select = valid_select[press_idx_ref]
+            valid_press_select = triple_select & (valid_press_select[2:] & valid_press_select[1:-1] & valid_press_select[:-2])
 
             # Record interval across 3 notes for all presses, but for hits record only valid presses
-            dt_notes[dt_notes_idx_ref] = _dt_notes
-            dt_hits[dt_hits_idx_ref] = _dt_hits[valid_press_select]
+            dt_notes[press_idx_ref[2:][triple_select]] = _dt_notes[triple_select]
+            dt_hits[press_idx_ref[2:][valid_press_select]] = _dt_hits[valid_press_select]
 
             return dt_notes, dt_hits
 
         def __get_position_offsets():
             """
             Gets rotation compensated offset between notes. Rotation compensated means,
-            all triplets of notes are rotated to be orthogonal to a common direction
+            all triplets of notes are rotated to be orthogonal to a common direction.
+            First scorepoint of each play has no incoming direction and is left as is.
             """
-            x_offsets = score_data['replay_x'].values - score_data['map_x'].values
-            y_offsets = score_data['replay_y'].values - score_data['map_y'].values
+            x_offsets = hit_x - map_x
+            y_offsets = hit_y - map_y
 
             # Correct for incoming direction
             dx = map_x[1:] - map_x[:-1]
@@ -549,68 +508,257 @@ class DiffNpy():
             hit_thetas = np.arctan2(y_offsets, x_offsets)
             mags = (x_offsets**2 + y_offsets**2)**0.5
 
-            x_offsets[1:] = mags[1:]*np.cos(map_thetas - hit_thetas[1:])
-            y_offsets[1:] = mags[1:]*np.sin(map_thetas - hit_thetas[1:])
+            same_play = np.zeros(num_rows, dtype=np.bool8)
+            same_play[1:] = (play_ids[1:] == play_ids[:-1])
+
+            x_offsets[same_play] = (mags[1:]*np.cos(map_thetas - hit_thetas[1:]))[same_play[1:]]
+            y_offsets[same_play] = (mags[1:]*np.sin(map_thetas - hit_thetas[1:]))[same_play[1:]]
 
             return x_offsets, y_offsets
 
         dt_notes, dt_hits = __get_hit_interval_offset()
         x_offsets, y_offsets = __get_position_offsets()
 
-        return dt_notes, dt_hits, x_offsets, y_offsets, (hit_t - map_t)
+        df = pd.DataFrame(index=score_data.index)
+        df['PERF_DT_NOTES'] = dt_notes
+        df['PERF_DT_HITS']  = dt_hits
+        df['PERF_X_OFFSET'] = x_offsets
+        df['PERF_Y_OFFSET'] = y_offsets
+        df['PERF_T_OFFSET'] = hit_t - map_t
+
+        return df
 
 
     @staticmethod
-    def get_data(score_data):
-        t_press_mask, \
-        t_press_diff, \
-        t_press_rate, \
-        t_press_inc,  \
-        t_press_dec,  \
-        t_press_rhm,  \
-        t_hold_dur    \
-            = DiffNpy.__process_t_press(score_data)
-
-        xy_dist,      \
-        xy_angle,     \
-        xy_lin_vel,   \
-        xy_ang_vel    \
-            = DiffNpy.__process_xy(score_data)
-
-        vis_visible   \
-            = DiffNpy.__process_visual(score_data)
+    def get_dtype():
+        """
+        Precision difficulty data is computed and stored in, as set by the
+        'diff_precision' config value
+        """
+        return np.dtype(AppConfig.cfg.get('diff_precision', 'float64'))
+
+
+    @staticmethod
+    def get_data(score_data, features=None, dtype=None):
+        """
+        Computes difficulty data for the map of a single play. If ``features`` is None,
+        all registered DIFF_* features are computed. If ``dtype`` is None, the configured
+        precision is used.
+
+        Difficulty features depend only on the map and mods, so the returned data is
+        indexed by (MD5, MODS, LAYOUT, IDXS) and is shared by all plays of that map and mods
+        that have the same score point rows (see ``DiffNpy.get_layouts``). Plays reference it
+        by scorepoint index; see ``DiffNpy.expand``.
+        """
+        if dtype is None:
+            dtype = DiffNpy.get_dtype()
+
+        data = DiffFeatures.compute(score_data, features, dtype)
 
         # NOTE: Must start with "DIFF_" so that difficulty specific
         # columns can be recognized and recalculated upon request
         df = pd.DataFrame()
-        df['MD5']               = score_data.index.get_level_values(0)
-        df['TIMESTAMP']         = score_data.index.get_level_values(1)
-        df['MODS']              = score_data.index.get_level_values(2)
-        df['IDXS']              = score_data.index.get_level_values(3)
-        df['DIFF_T_PRESS_DIFF'] = t_press_diff
-        df['DIFF_T_PRESS_RATE'] = t_press_rate
-        df['DIFF_T_PRESS_INC']  = t_press_inc
-        df['DIFF_T_PRESS_DEC']  = t_press_dec
-        df['DIFF_T_PRESS_RHM']  = t_press_rhm
-        df['DIFF_T_HOLD_DUR']   = t_hold_dur
-        df['DIFF_XY_DIST']      = xy_dist
-        df['DIFF_XY_ANGLE']     = xy_angle
-        df['DIFF_XY_LIN_VEL']   = xy_lin_vel
-        df['DIFF_XY_ANG_VEL']   = xy_ang_vel
-        df['DIFF_VIS_VISIBLE']  = vis_visible
-
-        df.set_index(['MD5', 'TIMESTAMP', 'MODS', 'IDXS'], inplace=True)
+        df['MD5']    = score_data.index.get_level_values(0)
+        df['MODS']   = score_data.index.get_level_values(2)
+        df['LAYOUT'] = DiffNpy.get_layouts(score_data)
+        df['IDXS']   = score_data.index.get_level_values(3)
+
+        for name, values in data.items():
+            df[name] = values
+
+        df.set_index(DiffNpy.INDEX_NAMES, inplace=True)
         return df
 
 
     @staticmethod
     def get_blank_data():
-        df = pd.DataFrame(columns=[
-            'MD5', 'TIMESTAMP', 'MODS', 'IDXS',
-            'DIFF_T_PRESS_DIFF', 'DIFF_T_PRESS_RATE', 'DIFF_T_PRESS_INC', 'DIFF_T_PRESS_DEC', 'DIFF_T_PRESS_RHM', 'DIFF_T_HOLD_DUR',
-            'DIFF_XY_DIST', 'DIFF_XY_ANGLE', 'DIFF_XY_LIN_VEL', 'DIFF_XY_ANG_VEL',
-            'DIFF_VIS_VISIBLE'
-        ])
-
-        df.set_index(['MD5', 'TIMESTAMP', 'MODS', 'IDXS'], inplace=True)
+        df = pd.DataFrame(columns=DiffNpy.INDEX_NAMES + DiffFeatures.get_names())
+        df = df.astype({ name : DiffNpy.get_dtype() for name in DiffFeatures.get_names() })
+
+        df.set_index(DiffNpy.INDEX_NAMES, inplace=True)
+        return df
+
+
+    @staticmethod
+    def expand(score_data, diff_data):
+        """
+        Expands map level difficulty data to the rows of ``score_data``. The returned
+        data has the same index and row order as ``score_data``. Rows whose map has no
+        difficulty data for the play's layout are filled with NaN.
+        """
+        df = diff_data.reindex(DiffNpy.__get_diff_index(score_data))
+        df.index = score_data.index
         return df
+
+
+    @staticmethod
+    def get_missing_maps(score_data, diff_data):
+        """
+        Returns the set of (md5, mods, layout) maps in ``score_data`` that have no difficulty data
+        """
+        score_maps = set(DiffNpy.__get_diff_index(score_data).droplevel(3).unique())
+        if diff_data is None:
+            return score_maps
+
+        return score_maps - DiffNpy.get_maps(diff_data)
+
+
+    @staticmethod
+    def get_maps(diff_data):
+        """
+        Returns the set of (md5, mods, layout) maps that ``diff_data`` has difficulty data for
+        """
+        return set(diff_data.index.droplevel(3).unique())
+
+
+    @staticmethod
+    def get_layouts(score_data):
+        """
+        Layout key of the play of each row in ``score_data``.
+
+        Score data has replay dependent rows, such as misses for clicks that are not on any note, and
+        difficulty features are computed over all rows of a play. So plays of the same map and mods can
+        only share difficulty data if they have the same rows. The layout key is a hash of the scorepoint
+        index, map timing, and action type of all of a play's rows, and is the same for plays with the same rows.
+        """
+        index = score_data.index
+        if score_data.shape[0] == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        t_map    = np.ascontiguousarray(score_data['T_MAP'].values, dtype=np.float64).view(np.uint64)
+        type_map = np.ascontiguousarray(score_data['TYPE_MAP'].values, dtype=np.float64).view(np.uint64)
+        idxs     = index.get_level_values(3).values.astype(np.uint64)
+
+        row_hashes = DiffNpy.__mix(t_map + DiffNpy.__mix(type_map + DiffNpy.__mix(idxs)))
+
+        # Play of each row by its (MD5, TIMESTAMP, MODS)
+        play_codes = np.zeros(score_data.shape[0], dtype=np.int64)
+        for level in range(3):
+            play_codes = play_codes*len(index.levels[level]) + index.codes[level]
+
+        _, play_ids = np.unique(play_codes, return_inverse=True)
+
+        # Sum of row hashes wraps around, so it does not depend on the order of the rows
+        layouts = np.zeros(play_ids.max() + 1, dtype=np.uint64)
+        np.add.at(layouts, play_ids, row_hashes)
+
+        return layouts.view(np.int64)[play_ids]
+
+
+    @staticmethod
+    def __mix(x):
+        """
+        splitmix64 finalizer. Integer overflow wraps around without warnings for arrays
+        """
+        x = x ^ (x >> np.uint64(30))
+        x = x * np.uint64(0xbf58476d1ce4e5b9)
+        x = x ^ (x >> np.uint64(27))
+        x = x * np.uint64(0x94d049bb133111eb)
+        return x ^ (x >> np.uint64(31))
+
+
+    @staticmethod
+    def __get_diff_index(score_data):
+        """
+        Difficulty data index each row of ``score_data`` refers to
+        """
+        index = score_data.index
+        return pd.MultiIndex.from_arrays([
+            index.get_level_values(0),
+            index.get_level_values(2),
+            DiffNpy.get_layouts(score_data),
+            index.get_level_values(3),
+        ], names=DiffNpy.INDEX_NAMES)
+
+
+    @staticmethod
+    def is_outdated(diff_data):
+        """
+        Difficulty data is outdated if it was stored in a different layout or precision
+        and needs to be recalculated from scratch.
+        """
+        if diff_data is None:
+            return False
+
+        if list(diff_data.index.names) != DiffNpy.INDEX_NAMES:
+            return True
+
+        dtype = DiffNpy.get_dtype()
+        return any([ diff_data[name].dtype != dtype for name in DiffFeatures.get_names() if name in diff_data.columns ])
+
+
+    @staticmethod
+    def get_ref_plays(score_data, skip_keys=None):
+        """
+        Picks the first play of each (md5, mods, layout) map in ``score_data`` to compute
+        difficulty data from. Maps in the ``skip_keys`` set are skipped.
+        """
+        index = score_data.index
+        plays = pd.DataFrame({
+            'MD5'       : index.get_level_values(0),
+            'TIMESTAMP' : index.get_level_values(1),
+            'MODS'      : index.get_level_values(2),
+            'LAYOUT'    : DiffNpy.get_layouts(score_data),
+        }).drop_duplicates([ 'MD5', 'TIMESTAMP', 'MODS' ])
+
+        ref_plays = {}
+        for md5, timestamp, mods, layout in plays.itertuples(index=False):
+            if (skip_keys is not None) and ((md5, mods, layout) in skip_keys):
+                continue
+
+            ref_plays.setdefault((md5, mods, layout), (md5, timestamp, mods))
+
+        ref_select = index.droplevel(3).isin(list(ref_plays.values()))
+        return [ play for _, play in score_data[ref_select].groupby(level=[ 0, 1, 2 ]) ]
+
+
+    @staticmethod
+    def get_precision_report(score_data, dtype=np.float32):
+        """
+        Computes difficulty data for all maps in ``score_data`` in both float64 and ``dtype``,
+        and reports how much each feature deviates from float64 when computed in ``dtype``.
+
+        Returns a dataframe indexed by feature with columns:
+            MAX_ABS_DEV,   # Maximum absolute deviation
+            MAX_REL_DEV,   # Maximum deviation relative to the float64 value
+            NAN_MISMATCH,  # Number of values that are NaN in one precision but not the other
+            NUM_VALUES,    # Number of values compared
+        """
+        names  = DiffFeatures.get_names()
+        report = pd.DataFrame(0.0, index=names, columns=[ 'MAX_ABS_DEV', 'MAX_REL_DEV', 'NAN_MISMATCH', 'NUM_VALUES' ])
+
+        for play in DiffNpy.get_ref_plays(score_data):
+            data_ref = DiffFeatures.compute(play, dtype=np.float64)
+            data_low = DiffFeatures.compute(play, dtype=dtype)
+
+            for name in names:
+                ref = data_ref[name]
+                low = data_low[name].astype(np.float64)
+
+                ref_nan = np.isnan(ref)
+                low_nan = np.isnan(low)
+                select  = ~(ref_nan | low_nan)
+
+                abs_dev = np.abs(low[select] - ref[select])
+                rel_dev = abs_dev/np.maximum(np.abs(ref[select]), np.finfo(np.float64).tiny)
+
+                report.loc[name, 'NAN_MISMATCH'] += np.count_nonzero(ref_nan != low_nan)
+                report.loc[name, 'NUM_VALUES']   += np.count_nonzero(select)
+
+                if abs_dev.shape[0] > 0:
+                    report.loc[name, 'MAX_ABS_DEV'] = max(report.loc[name, 'MAX_ABS_DEV'], np.max(abs_dev))
+                    report.loc[name, 'MAX_REL_DEV'] = max(report.loc[name, 'MAX_REL_DEV'], np.max(rel_dev))
+
+        return report
+
+
+    @staticmethod
+    def get_missing_features(diff_data):
+        """
+        Returns the registered features that are not present in ``diff_data``. These can be
+        computed and added as new columns without recalculating the existing ones.
+        """
+        if diff_data is None:
+            return []
+
+        return [ name for name in DiffFeatures.get_names() if name not in diff_data.columns ]
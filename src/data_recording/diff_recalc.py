@@ -0,0 +1,190 @@
+"""
+Background job that recalculates difficulty data for all loaded maps.
+
+Difficulty data is stored once per map, mods, and layout of score point rows, so one play of each
+(md5, mods, layout) is picked to compute it from. These plays are partitioned into chunks which are processed across a process
+pool. Results are collected by a coordinator thread and streamed in batches back to the GUI thread,
+which is the single writer to the difficulty data file. Because each batch is committed to file as
+it arrives, a cancelled job can be resumed by skipping the maps that are already present in the
+difficulty data file.
+"""
+import os
+import time
+import threading
+import concurrent.futures
+
+import pandas as pd
+
+from PyQt6 import QtCore
+
+from misc.Logger import Logger
+from data_recording.diff_npy import DiffNpy
+
+
+
+class DiffRecalc(QtCore.QObject):
+
+    logger = Logger.get_logger(__name__)
+
+    batch_ready = QtCore.pyqtSignal(object)                  # Difficulty data to be appended to file
+    progress    = QtCore.pyqtSignal(int, int, float, float)  # Rows done, rows total, rows/s, ETA in seconds
+    finished    = QtCore.pyqtSignal(bool)                    # True if completed, False if cancelled
+
+    __batch_computed  = QtCore.pyqtSignal(int, object)
+    __progress_update = QtCore.pyqtSignal(int, int, int, float, float)
+    __job_done        = QtCore.pyqtSignal(int, bool)
+
+    PLAYS_PER_CHUNK = 20   # Maps sent to a worker process at a time
+    PLAYS_PER_BATCH = 500  # Maps per batch committed to file
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+
+        # Every started or cancelled job gets a new id. Results
+        # queued from a job that is no longer current are dropped.
+        self.__job_id = 0
+        self.__thread = None
+        self.__cancel_event = threading.Event()
+
+        self.__batch_computed.connect(self.__batch_computed_event)
+        self.__progress_update.connect(self.__progress_update_event)
+        self.__job_done.connect(self.__job_done_event)
+
+
+    @staticmethod
+    def calc_plays(plays, features=None, dtype=None):
+        """
+        Worker process entry. Computes difficulty data for the maps of a chunk of plays.
+        """
+        return pd.concat([ DiffNpy.get_data(play, features, dtype) for play in plays ])
+
+
+    def start(self, score_data, skip_keys=None, features=None):
+        """
+        Starts recalculating difficulty data for the maps in ``score_data``.
+
+        ``skip_keys`` is a set of (md5, mods, layout) maps that already have difficulty data
+        committed and are to be skipped. This is what allows a cancelled job to resume
+        and maps without difficulty data to be filled in.
+
+        ``features`` limits which DIFF_* features get computed. If None, all are computed.
+        """
+        self.cancel()
+
+        self.__job_id += 1
+        self.__cancel_event = threading.Event()
+
+        self.__thread = threading.Thread(target=self.__run, args=(self.__job_id, self.__cancel_event, score_data, skip_keys, features))
+        self.__thread.start()
+
+
+    def cancel(self):
+        """
+        Cancels the running job. Batches that were not yet committed are discarded.
+        """
+        if not self.is_running():
+            return
+
+        self.logger.info('Cancelling difficulty recalculation...')
+
+        self.__job_id += 1
+        self.__cancel_event.set()
+        self.__thread.join()
+        self.__thread = None
+
+        self.finished.emit(False)
+
+
+    def is_running(self):
+        return (self.__thread is not None) and self.__thread.is_alive()
+
+
+    def __run(self, job_id, cancel_event, score_data, skip_keys, features):
+        # One play of each map and mods combination to compute difficulty data from
+        plays = DiffNpy.get_ref_plays(score_data, skip_keys)
+
+        num_rows_total = sum([ play.shape[0] for play in plays ])
+        num_rows_done  = 0
+
+        self.logger.info(f'Recalculating difficulties for {len(plays)} maps ({num_rows_total} rows)')
+
+        if len(plays) == 0:
+            self.__job_done.emit(job_id, True)
+            return
+
+        # Resolve precision here so worker processes don't depend on their own config state
+        dtype = DiffNpy.get_dtype()
+
+        chunks = [ plays[i : i + DiffRecalc.PLAYS_PER_CHUNK] for i in range(0, len(plays), DiffRecalc.PLAYS_PER_CHUNK) ]
+        chunks_per_batch = max(1, DiffRecalc.PLAYS_PER_BATCH // DiffRecalc.PLAYS_PER_CHUNK)
+
+        num_workers = max(1, (os.cpu_count() or 1) - 1)
+        max_pending = 2*num_workers
+
+        batch = []
+        time_start = time.perf_counter()
+
+        executor  = concurrent.futures.ProcessPoolExecutor(max_workers=num_workers)
+        pending   = set()
+        chunk_idx = 0
+
+        try:
+            while (chunk_idx < len(chunks)) or (len(pending) > 0):
+                # Keep a bounded number of chunks in flight so plays are not all pickled at once
+                while (chunk_idx < len(chunks)) and (len(pending) < max_pending):
+                    pending.add(executor.submit(DiffRecalc.calc_plays, chunks[chunk_idx], features, dtype))
+                    chunk_idx += 1
+
+                done, pending = concurrent.futures.wait(pending, timeout=0.5, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                if cancel_event.is_set():
+                    self.__job_done.emit(job_id, False)
+                    return
+
+                for future in done:
+                    try: data = future.result()
+                    except Exception:
+                        self.logger.exception('Failed to calculate difficulty data')
+                        self.__job_done.emit(job_id, False)
+                        return
+
+                    batch.append(data)
+                    num_rows_done += data.shape[0]
+
+                is_last = (chunk_idx >= len(chunks)) and (len(pending) == 0)
+                if (len(batch) >= chunks_per_batch) or (is_last and len(batch) > 0):
+                    self.__batch_computed.emit(job_id, pd.concat(batch))
+                    batch = []
+
+                elapsed = time.perf_counter() - time_start
+                rate = num_rows_done/elapsed if elapsed > 0 else 0.0
+                eta  = (num_rows_total - num_rows_done)/rate if rate > 0 else -1.0
+
+                self.__progress_update.emit(job_id, num_rows_done, num_rows_total, rate, eta)
+        finally:
+            # Don't hold up a cancel waiting on chunks that are still being processed
+            executor.shutdown(wait=not cancel_event.is_set(), cancel_futures=True)
+
+        self.__job_done.emit(job_id, True)
+
+
+    def __batch_computed_event(self, job_id, data):
+        if job_id != self.__job_id:
+            return
+
+        self.batch_ready.emit(data)
+
+
+    def __progress_update_event(self, job_id, num_rows_done, num_rows_total, rate, eta):
+        if job_id != self.__job_id:
+            return
+
+        self.progress.emit(num_rows_done, num_rows_total, rate, eta)
+
+
+    def __job_done_event(self, job_id, completed):
+        if job_id != self.__job_id:
+            return
+
+        self.__thread = None
+        self.finished.emit(completed)
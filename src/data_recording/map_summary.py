@@ -0,0 +1,148 @@
+"""
+Per map summary of the loaded plays, a row per map md5.
+
+The play list displays each map's name, mods, time period played, amount of data, and average
+difficulty. Computing those means grouping all of the score and difficulty data by map, and
+looking up every map's name. The summary is kept in the data file instead, merged with each
+new play as it is appended, so opening a data file only needs to read it back.
+
+Summary columns:
+    NAME,         # Map file name, or md5 if it could not be resolved
+    MODS,         # Mods of the map's first play
+    T_FIRST,      # Timestamp of the first play
+    T_LAST,       # Timestamp of the last play
+    NUM_ROWS,     # Number of score data rows
+    AVG_BPM,      # Difficulty averages. NaN if the map has no difficulty data (yet)
+    AVG_LIN_VEL,
+    AVG_ANG_VEL,
+"""
+import numpy as np
+import pandas as pd
+
+
+
+class MapSummary():
+
+    INDEX_NAME  = 'MD5'
+    COLUMNS     = [ 'NAME', 'MODS', 'T_FIRST', 'T_LAST', 'NUM_ROWS', 'AVG_BPM', 'AVG_LIN_VEL', 'AVG_ANG_VEL' ]
+    AVG_COLUMNS = [ 'AVG_BPM', 'AVG_LIN_VEL', 'AVG_ANG_VEL' ]
+
+    @staticmethod
+    def get_data(score_data, diff_data=None, map_names=None):
+        """
+        Computes the summary of the maps in ``score_data``. ``diff_data`` is the map level
+        difficulty data of those maps, and ``map_names`` is a dict of md5 -> map name.
+        """
+        index = score_data.index
+        md5s, first_idxs, inverse = np.unique(index.get_level_values(0).values, return_index=True, return_inverse=True)
+
+        timestamps = pd.Series(index.get_level_values(1).values).groupby(inverse).agg([ 'min', 'max', 'size' ])
+
+        if map_names is None:
+            map_names = {}
+
+        summary = pd.DataFrame({
+            'NAME'     : [ map_names.get(md5, md5) for md5 in md5s ],
+            'MODS'     : index.get_level_values(2).values[first_idxs].astype(np.int64),
+            'T_FIRST'  : timestamps['min'].values.astype(np.int64),
+            'T_LAST'   : timestamps['max'].values.astype(np.int64),
+            'NUM_ROWS' : timestamps['size'].values.astype(np.int64),
+        }, index=pd.Index(md5s, name=MapSummary.INDEX_NAME))
+
+        summary[MapSummary.AVG_COLUMNS] = MapSummary.get_avgs(diff_data).reindex(summary.index).values
+        return summary
+
+
+    @staticmethod
+    def get_avgs(diff_data):
+        """
+        Averages of the difficulty features shown in the play list, a row per map md5.
+        Values that are NaN are left out.
+        """
+        if (diff_data is None) or (diff_data.shape[0] == 0):
+            return pd.DataFrame(columns=MapSummary.AVG_COLUMNS, dtype=np.float64, index=pd.Index([], name=MapSummary.INDEX_NAME))
+
+        md5s, inverse = np.unique(diff_data.index.get_level_values(0).values, return_inverse=True)
+        avgs = pd.DataFrame(index=pd.Index(md5s, name=MapSummary.INDEX_NAME))
+
+        with np.errstate(divide='ignore'):
+            columns = {
+                'AVG_BPM'     : 15000/MapSummary.__get_column(diff_data, 'DIFF_T_PRESS_DIFF'),
+                'AVG_LIN_VEL' : MapSummary.__get_column(diff_data, 'DIFF_XY_LIN_VEL'),
+                'AVG_ANG_VEL' : MapSummary.__get_column(diff_data, 'DIFF_XY_ANG_VEL'),
+            }
+
+        for name, values in columns.items():
+            select = ~np.isnan(values)
+            counts = np.bincount(inverse[select], minlength=md5s.shape[0])
+            sums   = np.bincount(inverse[select], weights=values[select], minlength=md5s.shape[0])
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                avgs[name] = sums/counts
+
+        return avgs
+
+
+    @staticmethod
+    def merge(summary, new_summary):
+        """
+        Merges the summary of newly added plays into ``summary``. Maps already in it keep their
+        name, mods, and position, and get their time period and number of rows extended. Averages
+        are replaced by the new ones where those are available.
+        """
+        if (summary is None) or (summary.shape[0] == 0):
+            return new_summary.copy()
+
+        is_existing = new_summary.index.isin(summary.index)
+        existing = new_summary[is_existing]
+
+        summary = summary.copy()
+        if existing.shape[0] > 0:
+            old = summary.loc[existing.index]
+
+            summary.loc[existing.index, 'T_FIRST']  = np.minimum(old['T_FIRST'].values, existing['T_FIRST'].values)
+            summary.loc[existing.index, 'T_LAST']   = np.maximum(old['T_LAST'].values,  existing['T_LAST'].values)
+            summary.loc[existing.index, 'NUM_ROWS'] = old['NUM_ROWS'].values + existing['NUM_ROWS'].values
+
+            for name in MapSummary.AVG_COLUMNS:
+                new_avgs = existing[name].values
+                summary.loc[existing.index, name] = np.where(np.isnan(new_avgs), old[name].values, new_avgs)
+
+        return pd.concat([ summary, new_summary[~is_existing] ])
+
+
+    @staticmethod
+    def set_avgs(summary, diff_data):
+        """
+        Recomputes the averages in ``summary`` from ``diff_data``. Needed whenever
+        the difficulty data is recalculated.
+        """
+        summary = summary.copy()
+        summary[MapSummary.AVG_COLUMNS] = MapSummary.get_avgs(diff_data).reindex(summary.index).values
+        return summary
+
+
+    @staticmethod
+    def is_outdated(summary, score_data):
+        """
+        The summary is outdated if it does not match ``score_data``. This is the case for data files
+        made before the summary was stored in them, or ones written to by something that didn't update it.
+        """
+        if score_data is None:
+            return False
+
+        if summary is None:
+            return True
+
+        if list(summary.columns) != MapSummary.COLUMNS:
+            return True
+
+        return int(summary['NUM_ROWS'].sum()) != score_data.shape[0]
+
+
+    @staticmethod
+    def __get_column(diff_data, name):
+        if name not in diff_data.columns:
+            return np.full(diff_data.shape[0], np.nan)
+
+        return diff_data[name].values.astype(np.float64)
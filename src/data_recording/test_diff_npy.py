@@ -0,0 +1,98 @@
+"""
+Tests that difficulty data shared between plays lines up with the rows of each play.
+
+Run from ``src`` with ``python -m pytest``.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('osu_analysis')
+
+from osu_analysis import StdScoreData
+from data_recording.diff_npy import DiffNpy
+
+
+
+def make_play(timestamp, stray_click_at=None):
+    """
+    Score data of a play of a map with 20 circles. If ``stray_click_at`` is set, a miss
+    for a click that is not on any note is inserted before that note, as replays can have.
+    """
+    num = 20
+    t_map = 1000 + np.arange(num)*150.0
+    x_map = 100 + (np.arange(num) % 4)*80.0
+    y_map = 100 + (np.arange(num) % 3)*60.0
+    type_map = np.full(num, StdScoreData.ACTION_PRESS, dtype=np.float64)
+    type_hit = np.full(num, StdScoreData.TYPE_HITP, dtype=np.float64)
+
+    if stray_click_at is not None:
+        t_map    = np.insert(t_map, stray_click_at, np.nan)
+        x_map    = np.insert(x_map, stray_click_at, np.nan)
+        y_map    = np.insert(y_map, stray_click_at, np.nan)
+        type_map = np.insert(type_map, stray_click_at, StdScoreData.ACTION_FREE)
+        type_hit = np.insert(type_hit, stray_click_at, StdScoreData.TYPE_MISS)
+
+    num = t_map.shape[0]
+    df = pd.DataFrame({
+        'MD5'       : 'md5',
+        'TIMESTAMP' : timestamp,
+        'MODS'      : 0,
+        'IDXS'      : np.arange(num),
+        'CS'        : 4.0,
+        'AR'        : 9.0,
+        'T_MAP'     : t_map,
+        'X_MAP'     : x_map,
+        'Y_MAP'     : y_map,
+        'T_HIT'     : t_map + 5,
+        'X_HIT'     : x_map + 2,
+        'Y_HIT'     : y_map - 2,
+        'TYPE_MAP'  : type_map,
+        'TYPE_HIT'  : type_hit,
+    })
+
+    return df.set_index([ 'MD5', 'TIMESTAMP', 'MODS', 'IDXS' ])
+
+
+@pytest.fixture
+def plays():
+    return [ make_play(1000), make_play(2000, stray_click_at=10), make_play(3000) ]
+
+
+def test_plays_with_different_rows_get_their_own_data(plays):
+    score_data = pd.concat(plays)
+
+    layouts = DiffNpy.get_layouts(score_data)
+    play_layouts = [ np.unique(DiffNpy.get_layouts(play)) for play in plays ]
+
+    assert all(len(layout) == 1 for layout in play_layouts)
+    assert play_layouts[0][0] == play_layouts[2][0]
+    assert play_layouts[0][0] != play_layouts[1][0]
+    assert np.array_equal(layouts, np.concatenate([ np.repeat(layout, play.shape[0]) for layout, play in zip(play_layouts, plays) ]))
+
+    ref_plays = DiffNpy.get_ref_plays(score_data)
+    assert [ play.index.get_level_values(1)[0] for play in ref_plays ] == [ 1000, 2000 ]
+
+
+def test_expand_matches_data_of_each_play(plays):
+    score_data = pd.concat(plays)
+    diff_data  = pd.concat([ DiffNpy.get_data(play, dtype=np.float64) for play in DiffNpy.get_ref_plays(score_data) ])
+
+    assert not DiffNpy.get_missing_maps(score_data, diff_data)
+
+    expanded = DiffNpy.expand(score_data, diff_data)
+    assert expanded.index.equals(score_data.index)
+
+    for play in plays:
+        expected = DiffNpy.get_data(play, dtype=np.float64)
+        actual   = expanded.loc[play.index]
+
+        np.testing.assert_array_equal(actual.values, expected.values)
+
+
+def test_new_rows_are_missing(plays):
+    diff_data = DiffNpy.get_data(plays[0], dtype=np.float64)
+
+    assert not DiffNpy.get_missing_maps(plays[2], diff_data)
+    assert DiffNpy.get_missing_maps(plays[1], diff_data) == DiffNpy.get_missing_maps(plays[1], None)
+    assert np.isnan(DiffNpy.expand(plays[1], diff_data).values).all()
@@ -8,6 +8,9 @@ class _AppConfig():
         'id'         : random.randint(100, 1000000),
         'osu_dir'    : '',
         'delete_gen' : True,
+        'diff_precision' : 'float64',
+        'graph_cache_mb' : 256,
+        'selection_latency_ms' : 150,
     }
 
     @staticmethod
@@ -29,6 +32,18 @@ class _AppConfig():
         if not 'delete_gen' in _AppConfig.cfg:
             _AppConfig.update_value('delete_gen', False)
 
+        # Precision difficulty data is computed and stored in; 'float64' or 'float32'
+        if not 'diff_precision' in _AppConfig.cfg:
+            _AppConfig.update_value('diff_precision', 'float64')
+
+        # Memory budget of cached graph results
+        if not 'graph_cache_mb' in _AppConfig.cfg:
+            _AppConfig.update_value('graph_cache_mb', 256)
+
+        # Time selections need to settle for before graphs are updated
+        if not 'selection_latency_ms' in _AppConfig.cfg:
+            _AppConfig.update_value('selection_latency_ms', 150)
+
 
     @staticmethod
     def update_value(key, value):
@@ -0,0 +1,249 @@
+"""
+Persistent cache of which map file each map md5 belongs to.
+
+Looking up a map by md5 needs osu!.db, which takes a while to parse for large libraries. Looked up
+maps are kept in a json file along with the modification time of osu!.db at the time they were looked
+up. An entry is valid as long as osu!.db is not modified. Entries that are missing or no longer valid
+are looked up in the background, all md5s of a request in one batch, and osu!.db is parsed there the
+first time it's needed rather than on startup. It's parsed again if it's modified while the app is running.
+
+Usage:
+
+    names = MapNameCache.get_names(md5s)                            # What's cached, md5 if nothing is
+    MapNameCache.resolve(md5s, self.__map_names_resolved_event)     # Called with newly resolved names
+
+Must be used from the Qt thread.
+"""
+import os
+import json
+import threading
+import concurrent.futures
+
+from PyQt6 import QtCore
+
+from osu_db import MapsDB
+
+from misc.Logger import Logger
+from .config_mgr import AppConfig
+
+
+
+class MapNameCache(QtCore.QObject):
+
+    logger = Logger.get_logger(__name__)
+
+    CACHE_FILE = './data/map_names.json'
+
+    __resolved = QtCore.pyqtSignal(object, object, object)
+
+    __instance = None
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+
+        # Lookups share a single worker so that osu!.db gets parsed only once per modification
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='map_names')
+        self.__db_lock  = threading.Lock()
+
+        # Parsed osu!.db and its mtime when it was parsed
+        self.__maps_db  = None
+        self.__db_mtime = None
+
+        # mtime of osu!.db when it last failed to load, so the same file isn't parsed again
+        self.__failed_db_mtime = None
+
+        # md5 -> { 'path' : map file path, 'name' : map file name, 'db_mtime' : osu!.db mtime when looked up }
+        # 'path' and 'name' are None if the map is not in osu!.db
+        self.__entries = self.__read_cache()
+
+        # md5s with a lookup in progress
+        self.__pending = set()
+
+        self.__resolved.connect(self.__resolved_event)
+
+
+    @staticmethod
+    def preload():
+        """
+        Starts parsing osu!.db in the background so that it's ready by the time it's needed
+        """
+        instance = MapNameCache.__get_instance()
+        instance.__executor.submit(instance.__get_maps_db)
+
+
+    @staticmethod
+    def get_names(md5s):
+        """
+        md5 -> map name of each of ``md5s`` that's cached, even if it's no longer valid.
+        Maps that are not cached or are not in osu!.db are named by their md5.
+        """
+        entries = MapNameCache.__get_instance().__entries
+
+        names = {}
+        for md5 in md5s:
+            entry = entries.get(md5, None)
+            names[md5] = md5 if (entry is None) or (entry['name'] is None) else entry['name']
+
+        return names
+
+
+    @staticmethod
+    def resolve(md5s, callback):
+        """
+        Looks up the maps of ``md5s`` that are not cached or whose entries are no longer valid.
+        Once done, ``callback(names)`` is called with md5 -> map name of the ones that were looked up.
+        ``callback`` is not called if there is nothing to look up.
+        """
+        instance = MapNameCache.__get_instance()
+
+        db_mtime = MapNameCache.__get_db_mtime()
+        if (db_mtime is None) or (db_mtime == instance.__failed_db_mtime):
+            # No osu!.db to look maps up in
+            return
+
+        md5s = [ md5 for md5 in md5s if (not instance.__is_valid(md5, db_mtime)) and (md5 not in instance.__pending) ]
+        if len(md5s) == 0:
+            return
+
+        instance.__pending.update(md5s)
+        instance.__executor.submit(instance.__resolve_job, md5s, callback)
+
+
+    @staticmethod
+    def get_file_path(md5):
+        """
+        Path of the map file of ``md5``, None if it's not in osu!.db. Blocks if the map needs to be looked up.
+        """
+        instance = MapNameCache.__get_instance()
+
+        db_mtime = MapNameCache.__get_db_mtime()
+        if (db_mtime is not None) and (not instance.__is_valid(md5, db_mtime)):
+            entries = instance.__executor.submit(instance.__lookup, [ md5 ]).result()
+            instance.__update(entries)
+
+        entry = instance.__entries.get(md5, None)
+        return None if (entry is None) else entry['path']
+
+
+    @staticmethod
+    def __get_instance():
+        if MapNameCache.__instance is None:
+            MapNameCache.__instance = MapNameCache()
+
+        return MapNameCache.__instance
+
+
+    @staticmethod
+    def __get_db_mtime():
+        try: return os.path.getmtime(os.path.join(AppConfig.cfg['osu_dir'], 'osu!.db'))
+        except OSError:
+            return None
+
+
+    def __is_valid(self, md5, db_mtime):
+        """
+        Whether the entry of ``md5`` was looked up in osu!.db as it is at ``db_mtime``
+        """
+        entry = self.__entries.get(md5, None)
+        if entry is None:
+            return False
+
+        return (entry['db_mtime'] == db_mtime)
+
+
+    def __get_maps_db(self):
+        """
+        Runs in the worker. Returns the parsed osu!.db and its mtime, parsing it if it was modified
+        since it was last parsed. Returns (None, None) if it can't be loaded.
+        """
+        with self.__db_lock:
+            db_mtime = MapNameCache.__get_db_mtime()
+            if db_mtime is None:
+                return None, None
+
+            if (self.__maps_db is not None) and (self.__db_mtime == db_mtime):
+                return self.__maps_db, self.__db_mtime
+
+            if self.__failed_db_mtime == db_mtime:
+                return None, None
+
+            self.logger.info('Loading osu!.db...')
+
+            try: maps_db = MapsDB(AppConfig.cfg['osu_dir'])
+            except Exception:
+                self.logger.exception('Unable to load osu!.db')
+                self.__failed_db_mtime = db_mtime
+                return None, None
+
+            self.__maps_db  = maps_db
+            self.__db_mtime = db_mtime
+
+            return self.__maps_db, self.__db_mtime
+
+
+    def __lookup(self, md5s):
+        """
+        Runs in the worker. Returns entries of ``md5s``, or none if osu!.db can't be loaded
+        """
+        maps_db, db_mtime = self.__get_maps_db()
+        if maps_db is None:
+            return {}
+
+        entries = {}
+        for md5 in md5s:
+            path = maps_db.get_map_file_name(md5)
+            name = None if (path is None) else path.replace('\\', '/').split('/')[-1]
+
+            entries[md5] = { 'path' : path, 'name' : name, 'db_mtime' : db_mtime }
+
+        return entries
+
+
+    def __resolve_job(self, md5s, callback):
+        try: entries = self.__lookup(md5s)
+        except Exception:
+            self.logger.exception('Map lookup failed')
+            entries = {}
+
+        self.__resolved.emit(md5s, entries, callback)
+
+
+    def __resolved_event(self, md5s, entries, callback):
+        self.__pending.difference_update(md5s)
+        if len(entries) == 0:
+            return
+
+        self.__update(entries)
+        callback({ md5 : (md5 if (entry['name'] is None) else entry['name']) for md5, entry in entries.items() })
+
+
+    def __update(self, entries):
+        if len(entries) == 0:
+            return
+
+        self.__entries.update(entries)
+        self.__write_cache()
+
+
+    def __read_cache(self):
+        try:
+            with open(MapNameCache.CACHE_FILE) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.decoder.JSONDecodeError):
+            self.logger.warning(f'Unable to read {MapNameCache.CACHE_FILE}. Maps will be looked up again')
+            return {}
+
+
+    def __write_cache(self):
+        try:
+            os.makedirs(os.path.dirname(MapNameCache.CACHE_FILE), exist_ok=True)
+
+            # Written to a temporary file first so an interrupted write doesn't corrupt the cache
+            with open(f'{MapNameCache.CACHE_FILE}.tmp', 'w') as f:
+                json.dump(self.__entries, f)
+
+            os.replace(f'{MapNameCache.CACHE_FILE}.tmp', MapNameCache.CACHE_FILE)
+        except OSError:
+            self.logger.exception(f'Unable to write {MapNameCache.CACHE_FILE}')
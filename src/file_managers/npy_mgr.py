@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import pandas as pd
 
 from misc.Logger import Logger
@@ -8,6 +9,13 @@ class NpyManager():
 
     INDEX_NAMES = ['MD5', 'TIMESTAMP', 'MODS', 'IDXS']
 
+    # Columns added to an existing store via `append_column` are each kept
+    # in their own table, row aligned with the main '/play_data' table
+    __COLUMN_KEY_PREFIX = '/play_data_col_'
+
+    # Per map summary of the data, see `MapSummary`. It is small, so it gets rewritten as a whole
+    __SUMMARY_KEY = '/map_summary'
+
     logger = Logger.get_logger(__name__)
     class CorruptionError(Exception):
 
@@ -20,26 +28,35 @@ class NpyManager():
             Exception.__init__(self)
 
 
-    def __init__(self, file_pathname):
+    def __init__(self, file_pathname, index_names=INDEX_NAMES):
         self.__save_file = file_pathname
+        self.__index_names = index_names
 
         if not os.path.exists(self.__save_file):
             self.__data_file = None
             self.__dataframe = None
+            self.__summary   = None
             return
 
         self.__data_file = pd.HDFStore(self.__save_file, mode='a')
 
-        try: self.__dataframe = self.__data_file['/play_data']
+        try: self.__dataframe = self.__read_data()
         except KeyError:
             self.__data_file.close()
             raise NpyManager.CorruptionError
 
-        if len(self.__dataframe.index[0]) != len(NpyManager.INDEX_NAMES):
+        self.__summary = self.__read_summary()
+
+        if self.__dataframe.index.nlevels != len(self.__index_names):
+            if not set(self.__index_names).issubset(set(self.__dataframe.index.names) | set(self.__dataframe.columns)):
+                # Made with a different layout. Left as is for the caller to tell it's outdated
+                NpyManager.logger.info('Data has a different index and can\'t be reindexed')
+                return
+
             NpyManager.logger.info('Data needs reindexing. Please wait...')
 
             self.__dataframe.reset_index(inplace=True)
-            self.__dataframe.set_index(NpyManager.INDEX_NAMES, inplace=True)
+            self.__dataframe.set_index(self.__index_names, inplace=True)
 
             # TODO: Figure out how to modify the h5 store itself to apply the reindex columns to file
 
@@ -54,12 +71,31 @@ class NpyManager():
         return self.__dataframe.loc[md5]
 
 
+    def summary(self):
+        """
+        Per map summary stored along with the data. None if there is none
+        """
+        return self.__summary
+
+
+    def write_summary(self, summary):
+        """
+        Replaces the stored per map summary with `summary`
+        """
+        if (self.__data_file is None) or (not self.__data_file.is_open):
+            NpyManager.logger.error('NpyManager.write_summary | Data file is not open')
+            raise NpyManager.FileError
+
+        self.__data_file.put(NpyManager.__SUMMARY_KEY, summary, format='fixed')
+        self.__summary = summary
+
+
     def query_data(self, query_lst):
         if not self.__data_file.is_open:
             NpyManager.logger.error('NpyManager.query_data | Data file is not open')
             raise NpyManager.FileError
 
-        return self.__data_file.select_as_multiple('/play_data', where=query_lst)
+        return self.__data_file.select_as_multiple([ '/play_data' ] + self.__get_column_keys(), where=query_lst, selector='/play_data')
 
 
     def create_new(self, file_pathname):
@@ -68,6 +104,7 @@ class NpyManager():
         self.__save_file = file_pathname
         self.__data_file = None
         self.__dataframe = None
+        self.__summary   = None
 
 
     def append(self, data, index=True):
@@ -76,7 +113,7 @@ class NpyManager():
             data.to_hdf(self.__save_file, key='play_data', mode='a', format='table')
 
             self.__data_file = pd.HDFStore(self.__save_file, mode='a')
-            self.__dataframe = self.__data_file['/play_data']
+            self.__dataframe = self.__read_data()
 
             return
 
@@ -84,9 +121,71 @@ class NpyManager():
             NpyManager.logger.error('NpyManager.append | Data file is not open')
             raise NpyManager.FileError
 
-        # Exists and can be appended to
-        self.__data_file.append('play_data', data, data_columns=[ 'MD5', 'TIMESTAMP', 'MODS', 'IDX' ])
-        self.__dataframe = self.__data_file['/play_data']
+        # Exists and can be appended to. Columns that are kept in their own
+        # table get appended there so all tables remain row aligned.
+        column_keys = self.__get_column_keys()
+        column_names = [ key[len(NpyManager.__COLUMN_KEY_PREFIX):] for key in column_keys ]
+
+        self.__data_file.append('play_data', data.drop(columns=column_names, errors='ignore'), data_columns=[ 'MD5', 'TIMESTAMP', 'MODS', 'IDX' ])
+
+        for key, name in zip(column_keys, column_names):
+            if name in data.columns:
+                self.__data_file.append(key, data[[ name ]])
+            else:
+                self.__data_file.append(key, pd.DataFrame({ name : np.full(data.shape[0], np.nan, dtype=self.__dataframe[name].dtype) }, index=data.index))
+
+        self.__dataframe = self.__read_data()
+
+
+    def append_column(self, name, data):
+        """
+        Adds a new column to all existing rows without rewriting the existing columns.
+
+        `data` is a Series indexed the same way as the stored data. Rows that are
+        not present in `data` are set to NaN.
+        """
+        if self.__dataframe is None:
+            NpyManager.logger.error('NpyManager.append_column | Data file is empty')
+            raise NpyManager.FileError
+
+        if not self.__data_file.is_open:
+            NpyManager.logger.error('NpyManager.append_column | Data file is not open')
+            raise NpyManager.FileError
+
+        if name in self.__dataframe.columns:
+            NpyManager.logger.error(f'NpyManager.append_column | Column "{name}" already exists')
+            raise NpyManager.FileError
+
+        # Order the new column the same way as the rows in the main table
+        column = pd.DataFrame({ name : data.reindex(self.__dataframe.index).values }, index=self.__dataframe.index)
+
+        self.__data_file.append(f'{NpyManager.__COLUMN_KEY_PREFIX}{name}', column)
+        self.__dataframe = self.__read_data()
+
+
+    def __get_column_keys(self):
+        return [ key for key in self.__data_file.keys() if key.startswith(NpyManager.__COLUMN_KEY_PREFIX) ]
+
+
+    def __read_data(self):
+        data = self.__data_file['/play_data']
+
+        column_keys = self.__get_column_keys()
+        if len(column_keys) == 0:
+            return data
+
+        columns = [ self.__data_file[key] for key in column_keys ]
+        for column in columns:
+            column.index = data.index
+
+        return pd.concat([ data ] + columns, axis=1)
+
+
+    def __read_summary(self):
+        if NpyManager.__SUMMARY_KEY not in self.__data_file:
+            return None
+
+        return self.__data_file[NpyManager.__SUMMARY_KEY]
 
 
     def reindex(self):
@@ -103,7 +202,7 @@ class NpyManager():
             data.to_hdf(self.__save_file, key='play_data', mode='a', format='table')
 
             self.__data_file = pd.HDFStore(self.__save_file, mode='a')
-            self.__dataframe = self.__data_file['/play_data']
+            self.__dataframe = self.__read_data()
         else:
             # Exists and can be overwritten
             self.__dataframe.loc[md5] = data
@@ -162,6 +261,8 @@ class NpyManager():
         self.__data_file.close()
         os.remove(self.__save_file)
         self.__data_file = pd.HDFStore(self.__save_file)
+        self.__dataframe = None
+        self.__summary   = None
 
 
 #score_data_obj = NpyManager('score_data')
@@ -5,8 +5,9 @@ from PyQt6 import QtWidgets
 import pyqtgraph
 
 
-from osu_analysis import StdScoreData
-from data_recording.data import ScoreNpyData
+from misc.group_stats import GroupStats
+from misc.result_cache import ResultCache
+from analysis import DeviationAnalysis
 
 
 class DevGraphVel(QtWidgets.QWidget):
@@ -14,14 +15,14 @@ class DevGraphVel(QtWidgets.QWidget):
     def __init__(self, parent=None):
         QtWidgets.QWidget.__init__(self, parent)
 
-        self.DEV_DATA_X = 0
-        self.DEV_DATA_Y = 1
-        self.DEV_DATA_T = 2
+        self.DEV_DATA_X = DeviationAnalysis.DEV_DATA_X
+        self.DEV_DATA_Y = DeviationAnalysis.DEV_DATA_Y
+        self.DEV_DATA_T = DeviationAnalysis.DEV_DATA_T
 
-        self.DEV_TYPE_AVG = 0
-        self.DEV_TYPE_DEV = 1
+        self.DEV_TYPE_AVG = DeviationAnalysis.DEV_TYPE_AVG
+        self.DEV_TYPE_DEV = DeviationAnalysis.DEV_TYPE_DEV
 
-        self.NEEDED_NUM_DATA_POINTS = 30
+        self.NEEDED_NUM_DATA_POINTS = DeviationAnalysis.NEEDED_NUM_DATA_POINTS
 
         self.__dev_data_select = self.DEV_DATA_X
         self.__dev_type_select = self.DEV_TYPE_DEV
@@ -61,96 +62,15 @@ class DevGraphVel(QtWidgets.QWidget):
         self.__layout.addWidget(self.__graph)
 
 
-    def __get_deviation_data(self, play_data):
-        '''
-        x-axis: velocity
-        y-axis: deviation or mean
-        color:  angle
-
-        Meant to be used on single play and not multiple plays
-        '''
-        # Filters to get just hitcircles with valid hits
-        data_filter = np.ones(play_data.shape[0], dtype=np.bool8)
-
-        # Filter out sliders
-        data_filter[:-1] = \
-            (play_data[:-1, ScoreNpyData.ACT_TYPE] == StdScoreData.ACTION_PRESS) & ~(
-                (play_data[1:, ScoreNpyData.ACT_TYPE] == StdScoreData.ACTION_HOLD) | \
-                (play_data[1:, ScoreNpyData.ACT_TYPE] == StdScoreData.ACTION_RELEASE)
-            )
-
-        # Select hit presses
-        data_filter &= (play_data[:, ScoreNpyData.HIT_TYPE] == StdScoreData.TYPE_HITP)
-
-        # Apply filter
-        play_data = play_data[data_filter]
-
-        # Gather relevant data
-        data_c = play_data[:, ScoreNpyData.ANGLE]
-        data_x = 1000*play_data[:, ScoreNpyData.DS]/play_data[:, ScoreNpyData.DT]
-
-        if self.__dev_data_select == self.DEV_DATA_X:
-            data_y = play_data[:, ScoreNpyData.X_OFFSETS]
-        elif self.__dev_data_select == self.DEV_DATA_Y:
-            data_y = play_data[:, ScoreNpyData.Y_OFFSETS]
-        elif self.__dev_data_select == self.DEV_DATA_T:
-            data_y = play_data[:, ScoreNpyData.T_OFFSETS]
-
-        #            MIN    MAX   MIN DELTA
-        chunks_c = [   0,   180,   15  ]     # Angle,    12 bins max
-        chunks_x = [   0,  2000,   10  ]     # Velocty,  60 bins max
-
-        # Filter out data outside the range
-        range_filter = \
-            (chunks_c[0] <= data_c) & (data_c <= chunks_c[1]) & \
-            (chunks_x[0] <= data_x) & (data_x <= chunks_x[1])
-
-        data_c = data_c[range_filter]
-        data_x = data_x[range_filter]
-        data_y = data_y[range_filter]
-
-        # Reduce data to bins
-        num_bins_c = (chunks_c[1] - chunks_c[0])//chunks_c[2]
-        num_bins_x = (chunks_x[1] - chunks_x[0])//chunks_x[2]
-
-        dev_data_c = np.linspace(chunks_c[0], chunks_c[1], num_bins_c)
-        dev_data_x = np.linspace(chunks_x[0], chunks_x[1], num_bins_x)
-
-        idx_data_c = np.digitize(data_c, dev_data_c) - 1
-        idx_data_x = np.digitize(data_x, dev_data_x) - 1
-
-        c_unique_idxs = np.unique(idx_data_c)
-        x_unique_idxs = np.unique(idx_data_x)
-
-        dev_data = np.zeros((c_unique_idxs.shape[0]*x_unique_idxs.shape[0], 3), dtype=float)
-
-        for c_idx in range(c_unique_idxs.shape[0]):
-            for x_idx in range(x_unique_idxs.shape[0]):
-                data_select = (idx_data_c == c_unique_idxs[c_idx]) & (idx_data_x == x_unique_idxs[x_idx])
-                if np.sum(data_select) < self.NEEDED_NUM_DATA_POINTS:
-                    continue
-
-                if self.__dev_type_select == self.DEV_TYPE_AVG:
-                    dev_data_y = np.mean(data_y[data_select])
-                elif self.__dev_type_select == self.DEV_TYPE_DEV:
-                    dev_data_y = np.std(data_y[data_select])
-                else:
-                    print('Unknown deviation type')
-                    return
-
-                idx_dev_data = c_idx*x_unique_idxs.shape[0] + x_idx
-                dev_data[idx_dev_data, 0] = dev_data_y
-                dev_data[idx_dev_data, 1] = dev_data_x[x_unique_idxs[x_idx]]
-                dev_data[idx_dev_data, 2] = dev_data_c[c_unique_idxs[c_idx]]
-
-        # Filter out ones that don't have enough data
-        dev_data = dev_data[dev_data[:, 0] != 0]
-
-        return dev_data
-
+    def plot_data(self, score_data, diff_data):
+        if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
+            return
 
-    def plot_data(self, play_data):
-        dev_data = self.__get_deviation_data(play_data)
+        cache_key = ResultCache.fingerprint(type(self).__name__, score_data, diff_data, self.__dev_data_select, self.__dev_type_select)
+        dev_data  = ResultCache.get(cache_key)
+        if dev_data is None:
+            dev_data = np.column_stack(DeviationAnalysis.velocity(score_data, diff_data, self.__dev_data_select, self.__dev_type_select, self.NEEDED_NUM_DATA_POINTS))
+            ResultCache.put(cache_key, dev_data)
 
         # Clear plots for redraw
         self.__graph.clearPlots()
@@ -186,13 +106,7 @@ class DevGraphVel(QtWidgets.QWidget):
 
             if self.__avg_data_points:
                 # Average overlapping data points (those that fall on same velocity)
-                data_y = np.asarray([ np.sort(data_y[data_x == x]).mean() for x in np.unique(data_x) ])
-                unique_data_x = np.unique(data_x)
-
-                # Get sort mapping to make points on line graph connect in proper order
-                idx_sort = np.argsort(unique_data_x)
-                data_x = unique_data_x[idx_sort]
-                data_y = data_y[idx_sort]
+                data_x, data_y = GroupStats.mean(data_x, data_y)
 
             # Plot color
             color = angle_lut.map(angle, 'qcolor')
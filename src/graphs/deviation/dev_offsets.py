@@ -4,9 +4,7 @@ The purpose of this graph is
 import PyQt6
 import pyqtgraph
 
-import numpy as np
-
-from osu_analysis import StdScoreData
+from analysis import DeviationAnalysis
 
 
 class DevOffsets(PyQt6.QtWidgets.QWidget):
@@ -38,43 +36,11 @@ class DevOffsets(PyQt6.QtWidgets.QWidget):
         self.__layout.addWidget(self.__graph)
 
 
-    def plot_data(self, score_data, diff_data):
+    def plot_data(self, score_data, diff_data, segments=None):
         if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
             return
 
-        score_data = score_data.groupby(['MD5', 'TIMESTAMP'])
-        diff_data  = diff_data.groupby(['MD5', 'TIMESTAMP'])
-
-        data_x = np.zeros(len(score_data))
-        data_y = np.zeros(len(score_data))
-
-        # For each map and timestamp
-        for i, ((idx_score, df_score), (idx_diff, df_diff)) in enumerate(zip(score_data, diff_data)):
-            bpms = 15000/df_diff['DIFF_T_PRESS_DIFF'].values
-            bpms = bpms[~np.isnan(bpms)]
-
-            # Keep just the press taps
-            df_score = df_score[df_score['TYPE_MAP'] == StdScoreData.ACTION_PRESS]
-
-            hit_offsets  = df_score['T_HIT'].values - df_score['T_MAP'].values
-
-            # Keep just the notes that have not been missed
-            hit_offsets = hit_offsets[
-                (df_score['TYPE_HIT'].values == StdScoreData.TYPE_HITP)
-            ]
-
-            data_x[i] = np.mean(bpms)
-            data_y[i] = np.std(hit_offsets)
-
-        # Average along similiar x-axis value
-        if True:
-            data_y = np.asarray([ np.sort(data_y[data_x == x]).mean() for x in np.unique(data_x) ])
-            unique_data_x = np.unique(data_x)
-
-            # Get sort mapping to make points on line graph connect in proper order
-            idx_sort = np.argsort(unique_data_x)
-            data_x = unique_data_x[idx_sort]
-            data_y = data_y[idx_sort]
+        data_x, data_y = DeviationAnalysis.offsets(score_data, diff_data, segments)
 
         # Clear plots for redraw
         self.__graph.clearPlots()
@@ -5,9 +5,8 @@ import pyqtgraph
 import numpy as np
 from scipy.optimize import curve_fit
 
-from osu_analysis import StdScoreData
-from misc.osu_utils import OsuUtils
 from misc.utils import MathUtils
+from analysis import DeviationAnalysis
 
 
 class DevTGraphAR(QtWidgets.QWidget):
@@ -15,9 +14,6 @@ class DevTGraphAR(QtWidgets.QWidget):
     def __init__(self, parent=None):
         QtWidgets.QWidget.__init__(self, parent)
 
-        # Make sure StdScoreData.Settings valid range window is set to [100, 100] for this to be accurate
-        self.__VALID_RANGE_WIN = 200  # ms
-
         # Main graph
         self.__graph = pyqtgraph.PlotWidget(title='AR dev-t')
         self.__graph.getPlotItem().getAxis('left').enableAutoSIPrefix(False)
@@ -53,80 +49,21 @@ class DevTGraphAR(QtWidgets.QWidget):
         self.__layout.addWidget(self.__graph)
 
 
-    def __get_deviation_data(self, score_data, diff_data):
-        '''
-        x-axis: ar_ms
-        y-axis: deviation or mean
-        color:  bpm
-
-        Meant to be used on single play and not multiple plays
-        '''
-        if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
-            return np.asarray([ ])
-
-        # Clear plots for redraw
-        self.__graph.clearPlots()
-        self.__text.setText(f'')
-
-        score_data = score_data.groupby(['MD5', 'TIMESTAMP'])
-        diff_data  = diff_data.groupby(['MD5', 'TIMESTAMP'])
-
-        '''
-        [   ar_ms  dev  avg_bpm
-            [ ..., ..., ... ],
-            ...
-        ]
-        '''
-        data = []
-
-        # For each map and timestamp
-        for i, ((idx_score, df_score), (idx_diff, df_diff)) in enumerate(zip(score_data, diff_data)):
-            ar_ms       = OsuUtils.ar_to_ms(df_score['AR'].values[0])
-            #ar_ms = df_diff['DIFF_VIS_VISIBLE'].values[0]
-
-            hit_offsets = df_score['T_HIT'].values - df_score['T_MAP'].values
-            t_map       = df_score['T_MAP'].values
-
-            # BPM needs to be calculated before filtering out notes
-            bpm = 30000/np.diff(t_map)
-
-            press_select = (df_score['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-            hit_select   = (df_score['TYPE_HIT'] == StdScoreData.TYPE_HITP)
-            miss_select  = (df_score['TYPE_HIT'] == StdScoreData.TYPE_MISS)
-
-            num_notes   = np.count_nonzero(press_select & hit_select)
-            num_misses  = np.count_nonzero(press_select & miss_select)
-
-            hit_offsets = hit_offsets[press_select & hit_select]
-            bpm = bpm[press_select[1:] & hit_select[1:]]
-
-            new_hit_offsets = np.zeros(hit_offsets.shape[0] + 2*num_misses)
-            new_hit_offsets[:hit_offsets.shape[0]] = hit_offsets
-            new_hit_offsets[hit_offsets.shape[0] : hit_offsets.shape[0] + num_misses] = 100
-            new_hit_offsets[hit_offsets.shape[0] + num_misses:] = -100
-
-            data.append([ ar_ms, np.std(new_hit_offsets), np.mean(bpm) ])
-
-        return np.asarray(data)
-
-
-    def plot_data(self, score_data, diff_data):
-        dev_data = self.__get_deviation_data(score_data, diff_data)
-
+    def plot_data(self, score_data, diff_data, segments=None):
         # Clear plots for redraw
         self.__graph.clearPlots()
         self.__text.setText(f'')
         self.__graph_text.setText('')
 
-        if dev_data.shape[0] == 0:
+        if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
             return
 
-        # Round to nearest BPM so that cases like [ 136.01, 136.02 ]
-        # don't spawn extra descrete BPM selections
-        dev_data[:, 2] = np.round(dev_data[:, 2], 0)
+        density, dev, bpms = DeviationAnalysis.t_ar(score_data, diff_data, segments)
+        if density.shape[0] == 0:
+            return
 
         # Colored gradient r->g->b multiple plots at different angles
-        unique_bpms = np.unique(dev_data[:, 2])
+        unique_bpms = np.unique(bpms)
 
         bpm_lut = pyqtgraph.ColorMap(
             np.linspace(min(unique_bpms), max(unique_bpms), 3),
@@ -142,15 +79,15 @@ class DevTGraphAR(QtWidgets.QWidget):
         # Adds a plot for every unique BPM recorded
         for bpm in unique_bpms:
             # Determine data selected by angle
-            data_select = (dev_data[:, 2] == bpm)
+            data_select = (bpms == bpm)
             if not any(data_select):
                 # Selected region has no data. Nothing else to do
                 continue
 
             # Plot data
-            data_x = dev_data[data_select, 0]*dev_data[data_select, 2] / 30000
-            data_y = 2*dev_data[data_select, 1] / self.__VALID_RANGE_WIN
-            color  = bpm_lut.map(dev_data[data_select, 2], pyqtgraph.ColorMap.QCOLOR)
+            data_x = density[data_select]
+            data_y = dev[data_select]
+            color  = bpm_lut.map(bpms[data_select], pyqtgraph.ColorMap.QCOLOR)
 
             self.__graph.plot(x=data_x, y=(1 - data_y), pen=None, symbol='o', symbolPen=None, symbolSize=5, symbolBrush=color, name=f'{bpm:.2f} bpm')
 
@@ -159,15 +96,7 @@ class DevTGraphAR(QtWidgets.QWidget):
                 continue
 
         # Plot model
-        data_x = dev_data[:, 0]*dev_data[:, 2] / 30000
-        data_y = 2*dev_data[:, 1] / self.__VALID_RANGE_WIN
-
-        idx_sort = np.argsort(data_x)
-        data_x = data_x[idx_sort]
-        data_y = data_y[idx_sort]
-
-        data_x = np.append(data_x, np.asarray([15, 16, 17, 18, 19, 20]).repeat(10))
-        data_y = np.append(data_y, np.asarray([ 1,  1,  1,  1,  1,  1]).repeat(10))
+        data_x, data_y = DeviationAnalysis.get_t_ar_model_points(density, dev)
 
         self.__graph.plot(x=data_x, y=(1 - data_y), pen=None, symbol='o', symbolPen=None, symbolSize=5, symbolBrush=pyqtgraph.mkColor(255, 255, 0), name=f'test')
 
@@ -5,9 +5,8 @@ import pyqtgraph
 import math
 import numpy as np
 
-from osu_analysis import StdScoreData
-from misc.osu_utils import OsuUtils
 from misc.utils import MathUtils
+from analysis import DeviationAnalysis
 
 
 class DevXYGraphAR(QtWidgets.QWidget):
@@ -46,79 +45,20 @@ class DevXYGraphAR(QtWidgets.QWidget):
         self.__layout.addWidget(self.__graph)
 
 
-    def __get_deviation_data(self, score_data, diff_data):
-        '''
-        x-axis: ar_ms
-        y-axis: deviation or mean
-        color:  bpm
-
-        Meant to be used on single play and not multiple plays
-        '''
-        if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
-            return np.asarray([ ])
-
-        # Clear plots for redraw
-        self.__graph.clearPlots()
-        self.__text.setText(f'')
-
-        score_data = score_data.groupby(['MD5', 'TIMESTAMP'])
-        diff_data  = diff_data.groupby(['MD5', 'TIMESTAMP'])
-
-        '''
-        [   ar_ms  dev  avg_bpm
-            [ ..., ..., ... ],
-            ...
-        ]
-        '''
-        data = []
-
-        # For each map and timestamp
-        for i, ((idx_score, df_score), (idx_diff, df_diff)) in enumerate(zip(score_data, diff_data)):
-            ar_ms       = OsuUtils.ar_to_ms(df_score['AR'].values[0])
-            #ar_ms = df_diff['DIFF_VIS_VISIBLE'].values[0]
-
-            hit_offsets = df_score['X_HIT'].values - df_score['X_MAP'].values
-            t_map       = df_score['T_MAP'].values
-
-            # BPM needs to be calculated before filtering out notes
-            bpm = 30000/np.diff(t_map)
-
-            press_select = (df_score['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-            hit_select   = (df_score['TYPE_HIT'] == StdScoreData.TYPE_HITP)
-            miss_select  = (df_score['TYPE_HIT'] == StdScoreData.TYPE_MISS)
-
-            num_notes   = np.count_nonzero(press_select & hit_select)
-            num_misses  = np.count_nonzero(press_select & miss_select)
-
-            hit_offsets = hit_offsets[press_select & hit_select]
-            bpm = bpm[press_select[1:] & hit_select[1:]]
-
-            new_hit_offsets = np.zeros(hit_offsets.shape[0] + 2*num_misses)
-            new_hit_offsets[:hit_offsets.shape[0]] = hit_offsets
-            new_hit_offsets[hit_offsets.shape[0] : hit_offsets.shape[0] + num_misses] = 2*OsuUtils.cs_to_px(df_score['CS'].values[0])
-            new_hit_offsets[hit_offsets.shape[0] + num_misses:] = -2*OsuUtils.cs_to_px(df_score['CS'].values[0])
-
-            data.append([ ar_ms, np.std(new_hit_offsets), np.mean(bpm) ])
-
-        return np.asarray(data)
-
-
-    def plot_data(self, score_data, diff_data):
-        dev_data = self.__get_deviation_data(score_data, diff_data)
-
+    def plot_data(self, score_data, diff_data, segments=None):
         # Clear plots for redraw
         self.__graph.clearPlots()
         self.__text.setText(f'')
 
-        if dev_data.shape[0] == 0:
+        if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
             return
 
-        # Round to nearest BPM so that cases like [ 136.01, 136.02 ]
-        # don't spawn extra descrete BPM selections
-        dev_data[:, 2] = np.round(dev_data[:, 2], 0)
+        density, dev, bpms = DeviationAnalysis.xy_ar(score_data, diff_data, segments)
+        if bpms.shape[0] == 0:
+            return
 
         # Colored gradient r->g->b multiple plots at different angles
-        unique_bpms = np.unique(dev_data[:, 2])
+        unique_bpms = np.unique(bpms)
 
         bpm_lut = pyqtgraph.ColorMap(
             np.linspace(min(unique_bpms), max(unique_bpms), 3),
@@ -134,14 +74,14 @@ class DevXYGraphAR(QtWidgets.QWidget):
         # Adds a plot for every unique BPM recorded
         for bpm in unique_bpms:
             # Determine data selected by angle
-            data_select = (dev_data[:, 2] == bpm)
+            data_select = (bpms == bpm)
             if not any(data_select):
                 # Selected region has no data. Nothing else to do
                 continue
 
-            data_x = dev_data[data_select, 0]*dev_data[data_select, 2] / 30000
-            data_y = dev_data[data_select, 1]
-            color  = bpm_lut.map(dev_data[data_select, 2], 'qcolor')
+            data_x = density[data_select]
+            data_y = dev[data_select]
+            color  = bpm_lut.map(bpms[data_select], 'qcolor')
 
             self.__graph.plot(x=data_x, y=data_y, pen=None, symbol='o', symbolPen=None, symbolSize=5, symbolBrush=color, name=f'{bpm:.2f} bpm')
 
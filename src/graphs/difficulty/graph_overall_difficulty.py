@@ -1,5 +1,4 @@
 import numpy as np
-import threading
 import math
 
 import PyQt6
@@ -10,12 +9,12 @@ from osu_analysis import StdScoreData
 
 from data_recording.data import ScoreNpyData
 from misc.utils import Utils
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
 
 
 class GraphOverallDifficulty(PyQt6.QtWidgets.QWidget):
 
-    __calc_data_event = PyQt6.QtCore.pyqtSignal(object, object, object)
-
     def __init__(self, parent=None):
         PyQt6.QtWidgets.QWidget.__init__(self, parent)
 
@@ -51,7 +50,6 @@ class GraphOverallDifficulty(PyQt6.QtWidgets.QWidget):
         self.__layout.addWidget(self.__graph)
 
         # Connect signals
-        self.__calc_data_event.connect(self.__display_data)
         self.__graph.sigRangeChanged.connect(self.__on_view_range_changed)
         self.__on_view_range_changed()
 
@@ -60,8 +58,8 @@ class GraphOverallDifficulty(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        thread = threading.Thread(target=self.__plot_overall_factors, args=(play_data, ))
-        thread.start()
+        cache_key = ResultCache.fingerprint(type(self).__name__, play_data)
+        ComputeScheduler.submit(self, self.__plot_overall_factors, (play_data, ), self.__display_data, cache_key)
 
 
     @Utils.benchmark(f'[ Threaded ] {__name__}')
@@ -81,8 +79,7 @@ class GraphOverallDifficulty(PyQt6.QtWidgets.QWidget):
         # Check if there is any data to operate on
         if play_data.shape[0] < 3:
             data_stub = np.asarray([])
-            self.__calc_data_event.emit(data_stub, data_stub, data_stub)
-            return
+            return data_stub, data_stub, data_stub
 
         # Calculate data
         toffsets = play_data[:, ScoreNpyData.T_HIT] - play_data[:, ScoreNpyData.T_MAP]
@@ -112,7 +109,7 @@ class GraphOverallDifficulty(PyQt6.QtWidgets.QWidget):
         score_mask[:, 1] = score_mask[sort_idx, 1]
         score_mask[:, 2] = score_mask[sort_idx, 2]
 
-        self.__calc_data_event.emit(data_x, data_y, score_mask)
+        return data_x, data_y, score_mask
 
 
     def __display_data(self, data_x, data_y, score_mask):
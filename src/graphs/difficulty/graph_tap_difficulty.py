@@ -1,19 +1,16 @@
 import numpy as np
-import threading
-import math
 
 import PyQt6
 import pyqtgraph
 from pyqtgraph.functions import mkPen
 
-from osu_analysis import StdScoreData
-from misc.utils import Utils
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
+from analysis import DifficultyAnalysis
 
 
 class GraphTapDifficulty(PyQt6.QtWidgets.QWidget):
 
-    __calc_data_event = PyQt6.QtCore.pyqtSignal(object, object, object)
-
     def __init__(self, parent=None):
         PyQt6.QtWidgets.QWidget.__init__(self, parent)
 
@@ -49,7 +46,6 @@ class GraphTapDifficulty(PyQt6.QtWidgets.QWidget):
         self.__layout.addWidget(self.__graph)
 
         # Connect signals
-        self.__calc_data_event.connect(self.__display_data)
         self.__graph.sigRangeChanged.connect(self.__on_view_range_changed)
         self.__on_view_range_changed()
 
@@ -58,71 +54,8 @@ class GraphTapDifficulty(PyQt6.QtWidgets.QWidget):
         if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
             return
 
-        thread = threading.Thread(target=self.__plot_tap_factors, args=(score_data, diff_data))
-        thread.start()
-
-
-    @Utils.benchmark(f'[ Threaded ] {__name__}')
-    def __plot_tap_factors(self, score_data, diff_data):
-        # Determine what was the latest play
-        #data_filter = \
-        #    (score_data[:, ScoreNpyData.TIMESTAMP] == max(score_data[:, ScoreNpyData.TIMESTAMP]))
-        #score_data = score_data[data_filter]
-
-        # Filter out sliders holds and releases
-        data_filter = (
-            (score_data['TYPE_MAP'].values != StdScoreData.ACTION_HOLD) & \
-            (score_data['TYPE_MAP'].values != StdScoreData.ACTION_RELEASE)
-        )
-
-        score_data = score_data[data_filter]
-        diff_data  = diff_data[data_filter]
-
-        # Check if there is any data to operate on
-        if score_data.shape[0] < 3:
-            data_stub = np.asarray([])
-            self.__calc_data_event.emit(data_stub, data_stub, data_stub)
-            return
-
-        # Calculate data
-        timings = score_data['T_MAP'].values
-        toffsets = score_data['T_HIT'].values - timings
-        bpm_inc = diff_data['DIFF_T_PRESS_DEC'].values
-        bpm_dec = diff_data['DIFF_T_PRESS_INC'].values
-        rhym = diff_data['DIFF_T_PRESS_RHM'].values
-
-        is_miss = (
-            (score_data['TYPE_HIT'].values == StdScoreData.TYPE_MISS) & (
-                (score_data['TYPE_MAP'].values == StdScoreData.ACTION_PRESS)
-            )
-        )
-        score_mask = np.zeros((timings.shape[0] - 2, 3), dtype=np.bool8)
-        score_mask[:, 0] = is_miss[2:]
-        score_mask[:, 1] = np.abs(toffsets[2:] <= 32)
-        score_mask[:, 2] = np.abs(toffsets[2:] > 32) & ~is_miss[2:]
-
-        rates = 1000/(timings[2:] - timings[:-2])
-
-        stamina = np.zeros(rates.shape[0])
-        stamina_select = (bpm_dec[2:] > bpm_inc[2:])
-        stamina[stamina_select]  = 0.1*(np.log(bpm_inc[2:][stamina_select]/1000 + 1) + 1)
-        stamina[~stamina_select] = 0.1
-
-        #vec_rhym_cplx_func = np.vectorize(self.__rhym_cplx_func)
-        #rhyhm_cplx = vec_rhym_cplx_func(rhym/100)
-        #print(rhym/100)
-        #print(rhyhm_cplx)
-
-        data_x = np.linspace(0, 1, rates.shape[0])
-        data_y = rates*stamina*3
-
-        sort_idx = np.argsort(data_y)
-        data_y = data_y[sort_idx]
-        score_mask[:, 0] = score_mask[sort_idx, 0]
-        score_mask[:, 1] = score_mask[sort_idx, 1]
-        score_mask[:, 2] = score_mask[sort_idx, 2]
-
-        self.__calc_data_event.emit(data_x, data_y, score_mask)
+        cache_key = ResultCache.fingerprint(type(self).__name__, score_data, diff_data)
+        ComputeScheduler.submit(self, DifficultyAnalysis.tap_factors, (score_data, diff_data), self.__display_data, cache_key)
 
 
     def __display_data(self, data_x, data_y, score_mask):
@@ -169,8 +102,3 @@ class GraphTapDifficulty(PyQt6.QtWidgets.QWidget):
         margin_y = 0.001*(view.top() - view.bottom())
 
         self.__graph_text.setPos(pos_x + margin_x, pos_y + margin_y)
-
-
-    def __rhym_cplx_func(self, x):
-        n = np.arange(1, 8)
-        return np.sum(np.abs(np.sin(2*(2**n)*math.pi*x)))
@@ -2,12 +2,13 @@ import PyQt6
 import pyqtgraph
 
 import numpy as np
-import threading
 
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
+from analysis import OffsetAnalysis
 
-class GraphTOffsetBPM(PyQt6.QtWidgets.QWidget):
 
-    __calc_data_event = PyQt6.QtCore.pyqtSignal(object, object, object)
+class GraphTOffsetBPM(PyQt6.QtWidgets.QWidget):
 
     def __init__(self, parent=None):
         PyQt6.QtWidgets.QWidget.__init__(self, parent)
@@ -40,9 +41,6 @@ class GraphTOffsetBPM(PyQt6.QtWidgets.QWidget):
         self.__layout.setSpacing(2)
         self.__layout.addWidget(self.__graph)
 
-        # Connect signals
-        self.__calc_data_event.connect(self.__display_data)
-
 
     def plot_data(self, score_data, diff_data):
         # Clear plots for redraw
@@ -51,31 +49,8 @@ class GraphTOffsetBPM(PyQt6.QtWidgets.QWidget):
 
         if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
             return
-        thread = threading.Thread(target=self.__proc_data, args=(score_data, diff_data))
-        thread.start()
-
-
-    def __proc_data(self, score_data, diff_data):
-        data = np.zeros((score_data.shape[0], 3))
-        data[:, 0:2] = score_data[['T_HIT', 'T_MAP']].values
-        data[:, 2]   = diff_data['DIFF_T_PRESS_RATE'].values
-
-        data = data[~(np.isnan(data).any(axis=1))]
-
-        x_data = data[:, 0]
-        y_data = data[:, 1] - data[:, 2]
-
-        if self.__avg_data_points:
-            # Average overlapping data points
-            x_data_uniques = np.unique(x_data)
-
-            y_data_dev = np.asarray([ np.std(x_data[x_data == x]) for x in x_data_uniques ])
-            y_data_avg = np.asarray([ np.mean(y_data[x_data == x]) for x in x_data_uniques ])
-
-            x_data = x_data_uniques
-            y_data = y_data_avg
-
-        self.__calc_data_event.emit(x_data, y_data, y_data_dev)
+        cache_key = ResultCache.fingerprint(type(self).__name__, score_data, diff_data, self.__avg_data_points)
+        ComputeScheduler.submit(self, OffsetAnalysis.toffset_bpm, (score_data, diff_data, self.__avg_data_points), self.__display_data, cache_key)
 
 
     def __display_data(self, data_x, data_y, data_dev):
@@ -2,16 +2,16 @@ import PyQt6
 import pyqtgraph
 
 import numpy as np
-import threading
 
 from osu_analysis import StdScoreData
 from data_recording.data import ScoreNpyData
+from misc.group_stats import GroupStats
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
 
 
 class GraphTOffsetBPMInc(PyQt6.QtWidgets.QWidget):
 
-    __calc_data_event = PyQt6.QtCore.pyqtSignal(object, object)
-
     def __init__(self, parent=None):
         PyQt6.QtWidgets.QWidget.__init__(self, parent)
 
@@ -40,9 +40,6 @@ class GraphTOffsetBPMInc(PyQt6.QtWidgets.QWidget):
         self.__layout.setSpacing(2)
         self.__layout.addWidget(self.__graph)
 
-        # Connect signals
-        self.__calc_data_event.connect(self.__display_data)
-
 
     def plot_data(self, play_data):
         # Clear plots for redraw
@@ -52,8 +49,8 @@ class GraphTOffsetBPMInc(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        thread = threading.Thread(target=self.__proc_data, args=(play_data, ))
-        thread.start()
+        cache_key = ResultCache.fingerprint(type(self).__name__, play_data)
+        ComputeScheduler.submit(self, self.__proc_data, (play_data, ), self.__display_data, cache_key)
 
 
     def __proc_data(self, play_data):
@@ -80,13 +77,12 @@ class GraphTOffsetBPMInc(PyQt6.QtWidgets.QWidget):
 
         if self.__avg_data_points:
             # Average overlapping data points (those that fall on same velocity)
-            hit_timings_all = np.asarray([ np.sort(hit_timings_all[np.abs(time_bpm_all - time_bpm) < 3]).mean() for time_bpm in np.unique(time_bpm_all) ])
-            time_bpm_all = np.unique(time_bpm_all)
+            time_bpm_all, hit_timings_all, _ = GroupStats.window_mean(time_bpm_all, hit_timings_all, 3)
 
         data_x = time_bpm_all
         data_y = hit_timings_all
 
-        self.__calc_data_event.emit(data_x, data_y)
+        return data_x, data_y
 
 
     def __display_data(self, data_x, data_y):
@@ -2,16 +2,16 @@ import PyQt6
 import pyqtgraph
 
 import numpy as np
-import threading
 
 from osu_analysis import StdScoreData
 from data_recording.data import ScoreNpyData
+from misc.group_stats import GroupStats
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
 
 
 class GraphTOffsetVelocity(PyQt6.QtWidgets.QWidget):
 
-    __calc_data_event = PyQt6.QtCore.pyqtSignal(object, object, object)
-
     def __init__(self, parent=None):
         PyQt6.QtWidgets.QWidget.__init__(self, parent)
 
@@ -43,9 +43,6 @@ class GraphTOffsetVelocity(PyQt6.QtWidgets.QWidget):
         self.__layout.setSpacing(2)
         self.__layout.addWidget(self.__graph)
 
-        # Connect signals
-        self.__calc_data_event.connect(self.__display_data)
-
 
     def plot_data(self, play_data):
         # Clear plots for redraw
@@ -55,8 +52,8 @@ class GraphTOffsetVelocity(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        thread = threading.Thread(target=self.__proc_data, args=(play_data, ))
-        thread.start()
+        cache_key = ResultCache.fingerprint(type(self).__name__, play_data)
+        ComputeScheduler.submit(self, self.__proc_data, (play_data, ), self.__display_data, cache_key)
 
 
     def __proc_data(self, play_data):
@@ -69,8 +66,7 @@ class GraphTOffsetVelocity(PyQt6.QtWidgets.QWidget):
         play_data = play_data[data_filter]
         if play_data.shape[0] == 0:
             data_stub = np.asarray([])
-            self.__calc_data_event.emit(data_stub, data_stub, data_stub)
-            return
+            return data_stub, data_stub, data_stub
 
         # Calculate data
         pos_x = play_data[:, ScoreNpyData.X_POS]
@@ -86,16 +82,10 @@ class GraphTOffsetVelocity(PyQt6.QtWidgets.QWidget):
 
         if self.__avg_data_points:
             # Average overlapping data points
-            data_x_unique = np.unique(data_x)
-
-            data_dev = np.asarray([
-                np.std(data_y[data_x == x]) if data_y[data_x == x].shape[0] > 1 else 200
-                for x in data_x_unique
-            ])
-            data_y = np.asarray([ np.mean(data_y[data_x == x]) for x in data_x_unique ])
-            data_x = data_x_unique
+            data_x, data_y, data_dev, counts = GroupStats.agg(data_x, data_y, 'mean', 'std', 'count')
+            data_dev = np.where(counts > 1, data_dev, 200)
 
-        self.__calc_data_event.emit(data_x, data_y, data_dev)
+        return data_x, data_y, data_dev
 
 
     def __display_data(self, data_x, data_y, data_dev):
@@ -1,15 +1,15 @@
-from PyQt6 import QtCore
 from PyQt6 import QtWidgets
 
 import pyqtgraph
 
 import numpy as np
-import threading
 
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
+from analysis import OffsetAnalysis
 
-class MapToffsetRhyGraph(QtWidgets.QWidget):
 
-    __calc_data_event = QtCore.pyqtSignal(object)
+class MapToffsetRhyGraph(QtWidgets.QWidget):
 
     def __init__(self, parent=None):
         QtWidgets.QWidget.__init__(self, parent)
@@ -39,11 +39,8 @@ class MapToffsetRhyGraph(QtWidgets.QWidget):
         self.__layout.setSpacing(2)
         self.__layout.addWidget(self.__graph)
 
-        # Connect signals
-        self.__calc_data_event.connect(self.__display_data)
-
 
-    def plot_data(self, score_data, diff_data):
+    def plot_data(self, score_data, diff_data, segments=None):
         # Clear plots for redraw
         self.__graph.clearPlots()
         self.__text.setText(f'')
@@ -51,41 +48,10 @@ class MapToffsetRhyGraph(QtWidgets.QWidget):
         if 0 in [ score_data.shape[0], diff_data.shape[0] ]:
             return
 
-        thread = threading.Thread(target=self.__proc_data, args=(score_data, diff_data))
-        thread.start()
-
-
-
-    def __proc_data(self, score_data, diff_data):
-        score_data = score_data.groupby(['MD5', 'TIMESTAMP'])
-        diff_data  = diff_data.groupby(['MD5', 'TIMESTAMP'])
-
-        '''
-        [     rhm  dev  avg_bpm
-            [ ..., ..., ... ],
-            ...
-        ]
-        '''
-        data = []
-
-        # For each map and timestamp
-        for i, ((idx_score, df_score), (idx_diff, df_diff)) in enumerate(zip(score_data, diff_data)):
-            nan_filter = ~np.isnan(df_diff['DIFF_T_PRESS_RHM'].values)
-            t_offsets = np.diff((df_score['T_HIT'].values - df_score['T_MAP']).values[nan_filter])
-            rhythms   = df_diff['DIFF_T_PRESS_RHM'].values[nan_filter][1:]
-
-            # Operate on overlapping data points (those that have same x-axis within +/- 5%)
-            rounded_rhythms = np.unique(rhythms // 5 * 5)
-
-            # Get average offsets for collected rhythms
-            t_avgs = 2 * np.asarray([ np.mean(t_offsets[(0 <= (rhythms - r)) & ((rhythms - r) < 5)]) for r in rounded_rhythms ])
-
-            for rhythm, t_dev in zip(rounded_rhythms, t_avgs):
-                data.append([ rhythm, t_dev ])
-
-        self.__calc_data_event.emit(np.asarray(data))
+        cache_key = ResultCache.fingerprint(type(self).__name__, score_data, diff_data)
+        ComputeScheduler.submit(self, OffsetAnalysis.toffset_rhythm, (score_data, diff_data, segments), self.__display_data, cache_key)
 
 
-    def __display_data(self, data):
+    def __display_data(self, data_x, data_y):
         colors = pyqtgraph.mkBrush(color=[ 255, 0, 0, 150 ])
-        self.__graph.plot(x=data[:, 0], y=data[:, 1], pen=None, symbol='o', symbolPen=None, symbolSize=5, symbolBrush=colors)
+        self.__graph.plot(x=data_x, y=data_y, pen=None, symbol='o', symbolPen=None, symbolSize=5, symbolBrush=colors)
@@ -2,16 +2,16 @@ import PyQt6
 import pyqtgraph
 
 import numpy as np
-import threading
 
 from osu_analysis import StdScoreData
 from data_recording.data import ScoreNpyData
+from misc.group_stats import GroupStats
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
 
 
 class MapToffsetRhydGraph(PyQt6.QtWidgets.QWidget):
 
-    __calc_data_event = PyQt6.QtCore.pyqtSignal(object, object)
-
     def __init__(self, parent=None):
         PyQt6.QtWidgets.QWidget.__init__(self, parent)
 
@@ -40,9 +40,6 @@ class MapToffsetRhydGraph(PyQt6.QtWidgets.QWidget):
         self.__layout.setSpacing(2)
         self.__layout.addWidget(self.__graph)
 
-        # Connect signals
-        self.__calc_data_event.connect(self.__display_data)
-
 
     def plot_data(self, play_data):
         # Clear plots for redraw
@@ -52,8 +49,8 @@ class MapToffsetRhydGraph(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        thread = threading.Thread(target=self.__proc_data, args=(play_data, ))
-        thread.start()
+        cache_key = ResultCache.fingerprint(type(self).__name__, play_data)
+        ComputeScheduler.submit(self, self.__proc_data, (play_data, ), self.__display_data, cache_key)
 
 
     def __proc_data(self, play_data):
@@ -63,13 +60,12 @@ class MapToffsetRhydGraph(PyQt6.QtWidgets.QWidget):
 
         if self.__avg_data_points:
             # Average overlapping data points (those that have same x-axis within +/- 0.01)
-            t_offsets = np.asarray([ np.mean(t_offsets[np.abs(rhytms_d - rhytm) < 0.01]) for rhytm in np.unique(rhytms_d) ])
-            rhytms_d = np.unique(rhytms_d)
+            rhytms_d, t_offsets, _ = GroupStats.window_mean(rhytms_d, t_offsets, 0.01)
 
         data_x = rhytms_d
         data_y = t_offsets
 
-        self.__calc_data_event.emit(data_x, data_y)
+        return data_x, data_y
 
 
     def __display_data(self, data_x, data_y):
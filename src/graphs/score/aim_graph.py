@@ -3,10 +3,8 @@ import numpy as np
 import PyQt6
 import pyqtgraph
 
-from osu_interfaces import Mod
-from osu_analysis import StdScoreData
-
 from misc.utils import Utils
+from analysis import HitAnalysis
 
 
 class AimGraph(PyQt6.QtWidgets.QWidget):
@@ -140,26 +138,9 @@ class AimGraph(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        cs = play_data['CS'].values[0]
-
-        mods = Mod(int(play_data.index.get_level_values(2)[0]))
-        if mods.has_mod(Mod.HardRock): cs *= 1.3
-        if mods.has_mod(Mod.Easy):     cs *= 0.5
-
-        cs = min(cs, 10)
+        cs, offsets_hits, offsets_misses = HitAnalysis.aim_offsets(play_data)
         self.set_cs(cs)
 
-        data_filter = (play_data['TYPE_HIT'] == StdScoreData.TYPE_HITP)
-        data_hits = play_data[data_filter]
-
-        data_filter = \
-            (play_data['TYPE_HIT'] == StdScoreData.TYPE_MISS) & \
-            (play_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-        data_misses = play_data[data_filter]
-
-        offsets_hits  = data_hits[[ 'X_HIT', 'Y_HIT' ]].values - data_hits[[ 'X_MAP', 'Y_MAP' ]].values
-        offsets_misses = data_misses[[ 'X_HIT', 'Y_HIT' ]].values - data_misses[[ 'X_MAP', 'Y_MAP' ]].values
-
         self.plot_xy_data(offsets_hits, offsets_misses)
 
 
@@ -3,8 +3,8 @@ import pyqtgraph
 
 import numpy as np
 
-from osu_analysis import StdScoreData
 from misc.utils import Utils
+from analysis import HitAnalysis
 
 
 class DoffsetsDistrGraph(PyQt6.QtWidgets.QWidget):
@@ -49,31 +49,12 @@ class DoffsetsDistrGraph(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        data_filter = (
-            (play_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS) &
-            (play_data['TYPE_HIT'] == StdScoreData.TYPE_HITP)
-        )
-
-        play_data = play_data[data_filter]
-        if play_data.shape[0] == 0:
-            return
-
-        hit_timings = play_data['T_MAP'].values
-        hit_offsets = play_data['T_HIT'].values - hit_timings
-
-        doffsets = hit_offsets[2:] - hit_offsets[1:-1]     # x[1] - x[0]
-
-        # Get a histogram for hit offsets
-        step = (150 - 0)/(0.5*doffsets.shape[0])
-        y, x = np.histogram(doffsets, bins=np.linspace(-150, 150, int(0.5*doffsets.shape[0])))
-
+        x, y, peak = HitAnalysis.doffset_distr(play_data)
         if y.shape[0] == 0:
             return
 
         self.__plot.setData(x, y, stepMode="center", fillLevel=0, fillOutline=True, brush=(0,0,255,150))
-
-        self.__min_err_line.setValue(x[:-1][y == np.max(y)][0] + step/2)
-        print(f'Avg distr peak: {x[:-1][y == np.max(y)][0] + step/2} ms')
+        self.__min_err_line.setValue(peak)
 
         y_max = np.max(y) * 1.1
         self.__graph.setLimits(yMin=-1, yMax=y_max)
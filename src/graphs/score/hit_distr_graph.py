@@ -2,8 +2,9 @@ import PyQt6
 import pyqtgraph
 
 import numpy as np
-from osu_analysis import StdScoreData
+
 from misc.utils import Utils
+from analysis import HitAnalysis
 
 
 class HitDistrGraph(PyQt6.QtWidgets.QWidget):
@@ -48,52 +49,12 @@ class HitDistrGraph(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        # Determine what was the latest play
-        #data_filter = \
-        #    (play_data[:, PlayNpyData.TIMESTAMP] == max(play_data[:, PlayNpyData.TIMESTAMP]))
-
-        #play_data = play_data[data_filter]
-
-        slider_select = np.zeros(play_data.shape[0], dtype=np.bool8)
-        slider_select[:-1] = \
-            (play_data['TYPE_MAP'].values[:-1] == StdScoreData.ACTION_PRESS) & (
-                (play_data['TYPE_MAP'].values[1:] == StdScoreData.ACTION_HOLD) | \
-                (play_data['TYPE_MAP'].values[1:] == StdScoreData.ACTION_RELEASE)
-            )
-
-        num_sliders = np.sum(slider_select)
-
-        data_filter = \
-            (play_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-
-        play_data = play_data[data_filter]
-        slider_select = slider_select[data_filter]
-
-        # Record total number of score presses
-        num_scores = play_data.shape[0]
-
-        data_filter = \
-            (play_data['TYPE_HIT'] == StdScoreData.TYPE_HITP)
-
-        play_data = play_data[data_filter]
-        slider_select = slider_select[data_filter]
-
-        if play_data.shape[0] == 0:
-            return
-
-        hit_offsets = play_data['T_HIT'].values - play_data['T_MAP'].values
-
-        # Get a histogram for hit offsets
-        step = (150 - 0)/(0.1*hit_offsets.shape[0])
-        y, x = np.histogram(hit_offsets, bins=np.linspace(-150, 150, int(0.3*hit_offsets.shape[0])))
-
+        x, y, peak = HitAnalysis.hit_distr(play_data)
         if y.shape[0] == 0:
             return
 
         self.__plot.setData(x, y, stepMode="center", fillLevel=0, fillOutline=True, brush=(0,0,255,150))
-
-        self.__min_err_line.setValue(x[:-1][y == np.max(y)][0] + step/2)
-        print(f'Avg distr peak: {x[:-1][y == np.max(y)][0] + step/2} ms')
+        self.__min_err_line.setValue(peak)
 
         y_max = np.max(y) * 1.1
         self.__graph.setLimits(yMin=-1, yMax=y_max)
@@ -1,12 +1,9 @@
-import numpy as np
-
 import PyQt6
 import pyqtgraph
 
-from osu_analysis import StdScoreData
-
-from misc.utils import Utils, MathUtils
+from misc.utils import Utils
 from widgets.miss_plot import MissPlotItem
+from analysis import HitAnalysis
 
 
 class HitOffsetGraph(PyQt6.QtWidgets.QWidget):
@@ -65,123 +62,46 @@ class HitOffsetGraph(PyQt6.QtWidgets.QWidget):
         if play_data.shape[0] == 0:
             return
 
-        # Determine what was the latest play
-        # This assumes new plays are added at the end of the array
-        #latest_timestamp = np.unique(play_data[0, PlayNpyData.TIMESTAMP])[-1]
-
-        #data_filter = \
-        #    (play_data[:, PlayNpyData.TIMESTAMP] == latest_timestamp)
-        #data = play_data[data_filter]
-
-        self.__plot_misses(play_data)
-        self.__plot_hit_offsets(play_data)
-        self.__plot_rel_offsets(play_data)
-        self.__plot_avg_global(play_data)
-        self.__update_hit_stats(play_data)
+        press_t, press_offsets, release_t, release_offsets, miss_t, mean_offset, std_offset, miss_counts, acc = \
+            HitAnalysis.hit_offsets(play_data)
 
+        self.__plot_misses(miss_t)
+        self.__plot_offsets(self.__plot_hits, press_t, press_offsets, (100, 100, 255, 200))
+        self.__plot_offsets(self.__plot_rels, release_t, release_offsets, (105, 217, 255, 200))
+        self.__plot_avg_global(mean_offset, std_offset)
+        self.__update_hit_stats(miss_counts, acc)
 
-    def __plot_hit_offsets(self, data):
-        # Extract timings and hit_offsets
-        prs_select  = data['TYPE_MAP'] == StdScoreData.ACTION_PRESS
-        data = data[prs_select]
 
-        if data.shape[0] == 0:
+    def __plot_offsets(self, plot, hit_timings, hit_offsets, color):
+        if hit_timings.shape[0] == 0:
             return
 
-        hit_timings = data['T_MAP'].values
-        hit_offsets = data['T_HIT'].values - hit_timings
-
         # Calculate view
         xMin = min(hit_timings) - 100
         xMax = max(hit_timings) + 100
 
         # Set plot data
-        self.__plot_hits.setData(hit_timings, hit_offsets, pen=None, symbol='o', symbolPen=None, symbolSize=2, symbolBrush=(100, 100, 255, 200))
+        plot.setData(hit_timings, hit_offsets, pen=None, symbol='o', symbolPen=None, symbolSize=2, symbolBrush=color)
         self.__graph.setLimits(xMin=xMin - 100, xMax=xMax + 100)
         self.__graph.setRange(xRange=[ xMin - 100, xMax + 100 ])
 
 
-    def __plot_rel_offsets(self, data):
-        # Extract timings and hit_offsets
-        rel_select = data['TYPE_MAP'] == StdScoreData.ACTION_RELEASE
-        data = data[rel_select]
-
-        if data.shape[0] == 0:
-            return
-
-        hit_timings = data['T_MAP'].values
-        hit_offsets = data['T_HIT'].values - hit_timings
-
-        # Calculate view
-        xMin = min(hit_timings) - 100
-        xMax = max(hit_timings) + 100
-
-        # Set plot data
-        self.__plot_rels.setData(hit_timings, hit_offsets, pen=None, symbol='o', symbolPen=None, symbolSize=2, symbolBrush=(105, 217, 255, 200))
-        self.__graph.setLimits(xMin=xMin - 100, xMax=xMax + 100)
-        self.__graph.setRange(xRange=[ xMin - 100, xMax + 100 ])
-
-
-    def __plot_misses(self, data):
-        # Extract data and plot
-        miss_select = \
-            (data['TYPE_HIT'] == StdScoreData.TYPE_MISS) & \
-            (data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-        data = data[miss_select]
-
-        if data.shape[0] == 0:
+    def __plot_misses(self, miss_t):
+        if miss_t.shape[0] == 0:
             self.__miss_plot.setData([])
             return
 
-        hit_timings = data['T_HIT'].values
-        self.__miss_plot.setData(hit_timings)
+        self.__miss_plot.setData(miss_t)
 
 
-    def __plot_avg_global(self, data):
-        # Extract timings and hit_offsets
-        hit_offsets = data['T_HIT'].values - data['T_MAP'].values
-
-        mean_offset = np.mean(hit_offsets)
-        std_offset = np.std(hit_offsets)
-
-        # Set plot data
+    def __plot_avg_global(self, mean_offset, std_offset):
         self.__offset_avg_line.setValue(mean_offset)
         self.__offset_std_line_pos.setValue(std_offset*2 + mean_offset)
         self.__offset_std_line_neg.setValue(-std_offset*2 + mean_offset)
 
-        print(f'mean = {mean_offset:.2f} ms    std = {std_offset:.2f} ms')
-
-
-    def __update_hit_stats(self, data):
-        free_misses = \
-            (data['TYPE_HIT'] == StdScoreData.TYPE_MISS) & \
-            (data['TYPE_MAP'] == StdScoreData.ACTION_FREE)
-        num_free_misses = np.count_nonzero(free_misses)
-
-        press_misses = \
-            (data['TYPE_HIT'] == StdScoreData.TYPE_MISS) & \
-            (data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-        num_press_misses = np.count_nonzero(press_misses)
-
-        release_misses = \
-            (data['TYPE_HIT'] == StdScoreData.TYPE_MISS) & \
-            (data['TYPE_MAP'] == StdScoreData.ACTION_RELEASE)
-        num_release_misses = np.count_nonzero(release_misses)
-
-        hold_misses = \
-            (data['TYPE_HIT'] == StdScoreData.TYPE_MISS) & \
-            (data['TYPE_MAP'] == StdScoreData.ACTION_HOLD)
-        num_hold_misses = np.count_nonzero(hold_misses)
-
-        hits = \
-            (data['TYPE_HIT'] == StdScoreData.TYPE_HITP)
-        data = data[hits]
-
-        t_offsets = data['T_HIT'].values - data['T_MAP'].values
 
-        acc_window = 200  # 95% dev (ms)
-        acc_score = MathUtils.normal_distr(t_offsets, 0, acc_window/2)/MathUtils.normal_distr(0, 0, acc_window/2)
-        acc = acc_score.sum() / (len(acc_score) + num_press_misses + num_release_misses + num_hold_misses)
+    def __update_hit_stats(self, miss_counts, acc):
+        num_free_misses, num_press_misses, num_release_misses, num_hold_misses = miss_counts
 
         self.hit_metrics.setText(
             f'''
@@ -1,4 +1,3 @@
-import scipy
 import numpy as np
 
 import PyQt6
@@ -7,18 +6,18 @@ from pyqtgraph.functions import mkPen
 
 from osu_analysis import StdScoreData
 
-from misc.poibin import PoiBin
 from misc.utils import Utils
+from misc.osu_utils import OsuUtils
+from misc.group_stats import GroupStats
+from misc.compute_scheduler import ComputeScheduler
+from misc.result_cache import ResultCache
+from analysis import ScoreAnalysis
 
 
 
 class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
 
-    __OFFSET_OD4 = 55.5  # +/-ms window
-    __OFFSET_OD5 = 49.5  # +/-ms window
-    __OFFSET_OD6 = 43.5  # +/-ms window
-    __OFFSET_OD7 = 37.5  # +/-ms window
-    __OFFSET_OD8 = 31.5  # +/-ms window
+    __OFFSET_OD8 = OsuUtils.od_to_ms(8)  # +/-ms window
 
     def __init__(self, parent=None):
         PyQt6.QtWidgets.QWidget.__init__(self, parent)
@@ -55,11 +54,32 @@ class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
         self.__graph.addItem(self.__hit_metrics)
         self.__hit_metrics.setText('Select a map to display data')
 
+        # Accuracy vs OD graph
+        self.__acc_graph = pyqtgraph.PlotWidget(title='Accuracy probability vs OD')
+        self.__acc_graph.getPlotItem().getAxis('left').enableAutoSIPrefix(False)
+        self.__acc_graph.getPlotItem().getAxis('bottom').enableAutoSIPrefix(False)
+        self.__acc_graph.enableAutoRange(axis='x', enable=False)
+        self.__acc_graph.enableAutoRange(axis='y', enable=False)
+        self.__acc_graph.setLimits(xMin=-1, xMax=12, yMin=-10, yMax=110)
+        self.__acc_graph.setRange(xRange=[ ScoreAnalysis.OD_SWEEP[0], ScoreAnalysis.OD_SWEEP[-1] ], yRange=[ 0, 100 ])
+        self.__acc_graph.setLabel('left', 'probability', units='%', unitPrefix='')
+        self.__acc_graph.setLabel('bottom', 'OD', units='', unitPrefix='')
+        self.__acc_graph.addLegend()
+
+        self.__exp_300_plot = self.__acc_graph.plot(pen=pyqtgraph.mkPen((150, 150, 150, 200), width=1, style=PyQt6.QtCore.Qt.PenStyle.DashLine), name='E[300] (% of notes)')
+
+        acc_colors = [ (255, 100, 100, 255), (255, 200, 100, 255), (100, 255, 100, 255), (100, 150, 255, 255) ]
+        self.__acc_plots = [
+            self.__acc_graph.plot(pen=pyqtgraph.mkPen(color, width=2), name=f'P(acc ≥ {acc}%)')
+            for (acc, _, _), color in zip(ScoreAnalysis.ACC_TARGETS, acc_colors)
+        ]
+
         # Put it all together
-        self.__layout = PyQt6.QtWidgets.QHBoxLayout(self)
+        self.__layout = PyQt6.QtWidgets.QVBoxLayout(self)
         self.__layout.setContentsMargins(0, 0, 0, 0)
         self.__layout.setSpacing(2)
-        self.__layout.addWidget(self.__graph)
+        self.__layout.addWidget(self.__graph, 2)
+        self.__layout.addWidget(self.__acc_graph, 1)
 
         self.__graph.sigRangeChanged.connect(self.__on_view_range_changed)
         self.__on_view_range_changed()
@@ -68,7 +88,9 @@ class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
     @Utils.benchmark(__name__)
     def plot_data(self, play_data):
         if play_data.shape[0] == 0:
+            ComputeScheduler.cancel(self)
             self.__hit_metrics.setText('No data to display')
+            self.__clear_acc_plots()
 
             data_blank = np.asarray([])
             self.__plot.setData(data_blank, data_blank, pen=None, symbol='o', symbolPen=None, symbolSize=2, symbolBrush=(100, 100, 255, 200))
@@ -78,7 +100,9 @@ class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
 
         unique_map_mods = np.unique(play_data.index.get_level_values(2))
         if unique_map_mods.shape[0] > 1:
+            ComputeScheduler.cancel(self)
             self.__hit_metrics.setText('Data is displayed only when one mod combination is selected')
+            self.__clear_acc_plots()
 
             data_blank = np.asarray([])
             self.__plot.setData(data_blank, data_blank, pen=None, symbol='o', symbolPen=None, symbolSize=2, symbolBrush=(100, 100, 255, 200))
@@ -88,7 +112,11 @@ class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
 
         self.__plot_misses(play_data)
         self.__plot_hit_offsets(play_data)
-        self.__update_hit_stats(play_data)
+
+        self.__hit_metrics.setText('Calculating hit stats...')
+
+        cache_key = ResultCache.fingerprint(type(self).__name__, play_data)
+        ComputeScheduler.submit(self, ScoreAnalysis.hit_stats, (play_data, ), self.__display_hit_stats, cache_key)
 
 
     @Utils.benchmark(f'    {__name__}')
@@ -108,28 +136,14 @@ class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
         hit_timings = data['T_MAP']
         hit_offsets = data['T_HIT'] - data['T_MAP']
 
-        unique_x_data  = np.unique(hit_timings)
+        unique_x_data, hit_offsets_avg, hit_offsets_std, counts = GroupStats.agg(hit_timings.values, hit_offsets.values, 'mean', 'std', 'count')
         if unique_x_data.shape[0] == hit_timings.shape[0]:
             hit_offsets_avg = hit_offsets
             hit_offsets_std = 1
         else:
-            # y_data_avg_out = np.zeros(unique_x_data.shape[0])
-            # y_data_dev_out = np.zeros(unique_x_data.shape[0])
-
-            print('unique_x_data len = ', unique_x_data.shape[0])
-
-            # MathUtils.avg_xy_data(hit_timings, hit_offsets, y_data_avg_out)
-            # MathUtils.dev_xy_data(hit_timings, hit_offsets, y_data_avg_out, y_data_dev_out)
-
             # Find avg and dev for same hit timing across x-axis
-            hit_offsets_avg = np.asarray([ np.mean(hit_offsets[hit_timings == hit_timing]) for hit_timing in unique_x_data ])
-            hit_offsets_std = np.asarray([
-                2*np.std(hit_offsets[hit_timings == hit_timing]) if hit_offsets[hit_timings == hit_timing].shape[0] > 1 else 1
-                for hit_timing in unique_x_data
-            ])
+            hit_offsets_std = np.where(counts > 1, 2*hit_offsets_std, 1)
             hit_timings     = unique_x_data
-            # hit_offsets_avg = y_data_avg_out
-            # hit_offsets_std = y_data_dev_out
 
         # Calculate view
         xMin = min(hit_timings) - 100
@@ -160,8 +174,7 @@ class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
         hit_timings = data['T_MAP']
 
         # Process overlapping data points along x-axis
-        miss_count = np.asarray([ hit_timings[hit_timings == hit_timing].shape[0] for hit_timing in np.unique(hit_timings) ])
-        hit_timings = np.unique(hit_timings)
+        hit_timings, miss_count = GroupStats.count(hit_timings.values)
 
         max_miss_count = np.max(miss_count)
 
@@ -173,175 +186,32 @@ class ScoreTOffsetMultimap(PyQt6.QtWidgets.QWidget):
         self.cache_miss_count = np.sum(miss_count)
 
 
-    @Utils.benchmark(f'    {__name__}')
-    def __update_hit_stats(self, play_data):
-        unique_map_timestamps = np.unique(play_data.index.get_level_values(1))
-        num_plays = unique_map_timestamps.shape[0]
-
-        # Extract hit press data
-        #
-        # NOTE: If only hitcircles are extracted for processing (no sliders), then
-        # results tend to display very low probability outcomes. This is because a lot
-        # of accuracy increasing hits come from sliders. The slider filtering portion of
-        # this filter has been commented out as a result.
-        all_select = \
-            (play_data['TYPE_MAP'].values == StdScoreData.ACTION_PRESS)
-
-        slider_select = np.zeros(play_data.shape[0], dtype=np.bool8)
-        slider_select[:-1] = \
-            (play_data['TYPE_MAP'].values[:-1] == StdScoreData.ACTION_PRESS) & (
-                (play_data['TYPE_MAP'].values[1:] == StdScoreData.ACTION_HOLD) | \
-                (play_data['TYPE_MAP'].values[1:] == StdScoreData.ACTION_RELEASE)
-            )
-
-        # circle_select = \
-        #     (play_data['TYPE_MAP'].values[:-1] == StdScoreData.ACTION_PRESS) & ~(
-        #         (play_data['TYPE_MAP'].values[1:] == StdScoreData.ACTION_HOLD) | \
-        #         (play_data['TYPE_MAP'].values[1:] == StdScoreData.ACTION_RELEASE)
-        #     )
-
-        # Reduce data to just contain hitobject press info
-        hitcircles_data = play_data[all_select]
-        hit_timings = hitcircles_data['T_MAP'].values
-        hit_offsets = hitcircles_data['T_HIT'].values - hitcircles_data['T_MAP'].values
-
-        # Determine number of circles and sliders in the map
-        unique_hit_timings, unique_idx = np.unique(hit_timings, return_index=True)
-        num_total = unique_idx.shape[0]
-
-        slider_mask = slider_select[all_select][unique_idx]
-        num_sliders = np.count_nonzero(slider_mask)
-        num_circles = num_total - num_sliders
-
-        # Determine number of misses per hitobject
-        miss_select = \
-            (play_data['TYPE_HIT'].values == StdScoreData.TYPE_MISS) & \
-            (play_data['TYPE_MAP'].values == StdScoreData.ACTION_PRESS)
-        miss_mask = miss_select[all_select]
-
-        miss_count = np.asarray([ hit_timings[(hit_timings == hit_timing) & miss_mask].shape[0] for hit_timing in unique_hit_timings ])
-
-        # Stacks hits for each timestamp and calculates average and deviation
-        avgs = np.asarray([ np.mean(hit_offsets[hit_timings == hit_timing]) for hit_timing in unique_hit_timings ])
-        devs = np.asarray([
-            np.std(hit_offsets[hit_timings == hit_timing]) if hit_offsets[hit_timings == hit_timing].shape[0] > 1 else 1
-            for hit_timing in unique_hit_timings
-        ])
-
-        devs[devs == 0] = 1
-
-        print('Avg info:')
-        print(f'  OD4 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD4 <= avgs) & (avgs <= ScoreTOffsetMultimap.__OFFSET_OD4))}')
-        print(f'  OD5 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD5 <= avgs) & (avgs <= ScoreTOffsetMultimap.__OFFSET_OD5))}')
-        print(f'  OD6 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD6 <= avgs) & (avgs <= ScoreTOffsetMultimap.__OFFSET_OD6))}')
-        print(f'  OD7 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD7 <= avgs) & (avgs <= ScoreTOffsetMultimap.__OFFSET_OD7))}')
-        print(f'  OD8 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD8 <= avgs) & (avgs <= ScoreTOffsetMultimap.__OFFSET_OD8))}')
-
-        print('Dev info:')
-        print(f'  OD4 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD4 <= (avgs - devs)) & ((avgs + devs) <= ScoreTOffsetMultimap.__OFFSET_OD4))}')
-        print(f'  OD5 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD5 <= (avgs - devs)) & ((avgs + devs) <= ScoreTOffsetMultimap.__OFFSET_OD5))}')
-        print(f'  OD6 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD6 <= (avgs - devs)) & ((avgs + devs) <= ScoreTOffsetMultimap.__OFFSET_OD6))}')
-        print(f'  OD7 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD7 <= (avgs - devs)) & ((avgs + devs) <= ScoreTOffsetMultimap.__OFFSET_OD7))}')
-        print(f'  OD8 Num = {np.count_nonzero((-ScoreTOffsetMultimap.__OFFSET_OD8 <= (avgs - devs)) & ((avgs + devs) <= ScoreTOffsetMultimap.__OFFSET_OD8))}')
-
-        # Calculate needed 300s for 99% accuracy
-        num_50s_99  = num_circles*0.0
-        num_100s_99 = num_circles*0.010  # 1.00% of score presses
-        needed_num_300s_99 = int((num_circles + num_sliders) - (num_100s_99 + num_50s_99))
-
-        # Calculate needed 300s for 98% accuracy
-        num_50s_98  = num_circles*0.0
-        num_100s_98 = num_circles*0.024  # 2.40% of score presses
-        needed_num_300s_98 = int((num_circles + num_sliders) - (num_100s_98 + num_50s_98))
-
-        # Calculate needed 300s for 97% accuracy
-        num_50s_97  = num_circles*0.0
-        num_100s_97 = num_circles*0.040  # 4.00% of score presses
-        needed_num_300s_97 = int((num_circles + num_sliders) - (num_100s_97 + num_50s_97))
-
-        # Calculate needed 300s for 95% accuracy
-        num_50s_95  = num_circles*0.003   # 0.30% of score presses
-        num_100s_95 = num_circles*0.0625  # 6.25% of score presses
-        needed_num_300s_95 = int((num_circles + num_sliders) - (num_100s_95 + num_50s_95))
-
-        # For each score point, calculate probability it would be within OD window for one of the plays
-        # Sliders are excluded from required 300s by marking them as 100% change of 300s because
-        # osu! slider hit window is so lenient it may as well be a free hit
-        # Misses are averaged into the probabilities
-        prob_greater_than_neg = scipy.stats.norm.cdf(-ScoreTOffsetMultimap.__OFFSET_OD4, loc=avgs, scale=devs)
-        prob_less_than_pos    = scipy.stats.norm.cdf(ScoreTOffsetMultimap.__OFFSET_OD4, loc=avgs, scale=devs)
-        prob_300_OD4s = prob_less_than_pos - prob_greater_than_neg
-        prob_300_OD4s[slider_mask] = 1.0
-        prob_300_OD4s *= 1 - miss_count/num_plays
-
-        prob_greater_than_neg = scipy.stats.norm.cdf(-ScoreTOffsetMultimap.__OFFSET_OD5, loc=avgs, scale=devs)
-        prob_less_than_pos    = scipy.stats.norm.cdf(ScoreTOffsetMultimap.__OFFSET_OD5, loc=avgs, scale=devs)
-        prob_300_OD5s = prob_less_than_pos - prob_greater_than_neg
-        prob_300_OD5s[slider_mask] = 1.0
-        prob_300_OD5s *= 1 - miss_count/num_plays
-
-        prob_greater_than_neg = scipy.stats.norm.cdf(-ScoreTOffsetMultimap.__OFFSET_OD6, loc=avgs, scale=devs)
-        prob_less_than_pos    = scipy.stats.norm.cdf(ScoreTOffsetMultimap.__OFFSET_OD6, loc=avgs, scale=devs)
-        prob_300_OD6s = prob_less_than_pos - prob_greater_than_neg
-        prob_300_OD6s[slider_mask] = 1.0
-        prob_300_OD6s *= 1 - miss_count/num_plays
-
-        prob_greater_than_neg = scipy.stats.norm.cdf(-ScoreTOffsetMultimap.__OFFSET_OD7, loc=avgs, scale=devs)
-        prob_less_than_pos    = scipy.stats.norm.cdf(ScoreTOffsetMultimap.__OFFSET_OD7, loc=avgs, scale=devs)
-        prob_300_OD7s = prob_less_than_pos - prob_greater_than_neg
-        prob_300_OD7s[slider_mask] = 1.0
-        prob_300_OD7s *= 1 - miss_count/num_plays
-
-        prob_greater_than_neg = scipy.stats.norm.cdf(-ScoreTOffsetMultimap.__OFFSET_OD8, loc=avgs, scale=devs)
-        prob_less_than_pos    = scipy.stats.norm.cdf(ScoreTOffsetMultimap.__OFFSET_OD8, loc=avgs, scale=devs)
-        prob_300_OD8s = prob_less_than_pos - prob_greater_than_neg
-        prob_300_OD8s[slider_mask] = 1.0
-        prob_300_OD8s *= 1 - miss_count/num_plays
-
-        poibin_300_OD4s = PoiBin(prob_300_OD4s)
-        poibin_300_OD5s = PoiBin(prob_300_OD5s)
-        poibin_300_OD6s = PoiBin(prob_300_OD6s)
-        poibin_300_OD7s = PoiBin(prob_300_OD7s)
-        poibin_300_OD8s = PoiBin(prob_300_OD8s)
-
-        prob_OD4_99 = np.sum(np.asarray([ poibin_300_OD4s.pmf(i) for i in range(needed_num_300s_99, num_total) ]))
-        prob_OD5_99 = np.sum(np.asarray([ poibin_300_OD5s.pmf(i) for i in range(needed_num_300s_99, num_total) ]))
-        prob_OD6_99 = np.sum(np.asarray([ poibin_300_OD6s.pmf(i) for i in range(needed_num_300s_99, num_total) ]))
-        prob_OD7_99 = np.sum(np.asarray([ poibin_300_OD7s.pmf(i) for i in range(needed_num_300s_99, num_total) ]))
-        prob_OD8_99 = np.sum(np.asarray([ poibin_300_OD8s.pmf(i) for i in range(needed_num_300s_99, num_total) ]))
-
-        prob_OD4_98 = np.sum(np.asarray([ poibin_300_OD4s.pmf(i) for i in range(needed_num_300s_98, num_total) ]))
-        prob_OD5_98 = np.sum(np.asarray([ poibin_300_OD5s.pmf(i) for i in range(needed_num_300s_98, num_total) ]))
-        prob_OD6_98 = np.sum(np.asarray([ poibin_300_OD6s.pmf(i) for i in range(needed_num_300s_98, num_total) ]))
-        prob_OD7_98 = np.sum(np.asarray([ poibin_300_OD7s.pmf(i) for i in range(needed_num_300s_98, num_total) ]))
-        prob_OD8_98 = np.sum(np.asarray([ poibin_300_OD8s.pmf(i) for i in range(needed_num_300s_99, num_total) ]))
-
-        prob_OD4_97 = np.sum(np.asarray([ poibin_300_OD4s.pmf(i) for i in range(needed_num_300s_97, num_total) ]))
-        prob_OD5_97 = np.sum(np.asarray([ poibin_300_OD5s.pmf(i) for i in range(needed_num_300s_97, num_total) ]))
-        prob_OD6_97 = np.sum(np.asarray([ poibin_300_OD6s.pmf(i) for i in range(needed_num_300s_97, num_total) ]))
-        prob_OD7_97 = np.sum(np.asarray([ poibin_300_OD7s.pmf(i) for i in range(needed_num_300s_97, num_total) ]))
-        prob_OD8_97 = np.sum(np.asarray([ poibin_300_OD8s.pmf(i) for i in range(needed_num_300s_97, num_total) ]))
-
-        prob_OD4_95 = np.sum(np.asarray([ poibin_300_OD4s.pmf(i) for i in range(needed_num_300s_95, num_total) ]))
-        prob_OD5_95 = np.sum(np.asarray([ poibin_300_OD5s.pmf(i) for i in range(needed_num_300s_95, num_total) ]))
-        prob_OD6_95 = np.sum(np.asarray([ poibin_300_OD6s.pmf(i) for i in range(needed_num_300s_95, num_total) ]))
-        prob_OD7_95 = np.sum(np.asarray([ poibin_300_OD7s.pmf(i) for i in range(needed_num_300s_95, num_total) ]))
-        prob_OD8_95 = np.sum(np.asarray([ poibin_300_OD8s.pmf(i) for i in range(needed_num_300s_95, num_total) ]))
+    def __display_hit_stats(self, ods, exp_300s, prob_accs, max_ods, needed_num_300s, counts):
+        num_plays, num_circles, num_sliders = counts
+        targets = [ acc for acc, _, _ in ScoreAnalysis.ACC_TARGETS ]
+        max_ods = [ '-' if np.isnan(od) else f'{od:.1f}' for od in max_ods ]
 
         self.__hit_metrics.setText(
             f'''
             Num scores: {num_plays}
             Num hitobjects: {num_circles} + {num_sliders} sliders
-            99% 300s: {needed_num_300s_99}   98% 300s: {needed_num_300s_98}   97% 300s: {needed_num_300s_97}   95% 300s: {needed_num_300s_95}
-
-            OD4 | E[300]: {np.sum(prob_300_OD4s):.0f}   P(99%): {100*prob_OD4_99:.4f}%   P(98%): {100*prob_OD4_98:.4f}%   P(97%): {100*prob_OD4_97:.4f}%   P(95%): {100*prob_OD4_95:.4f}%
-            OD5 | E[300]: {np.sum(prob_300_OD5s):.0f}   P(99%): {100*prob_OD5_99:.4f}%   P(98%): {100*prob_OD5_98:.4f}%   P(97%): {100*prob_OD5_97:.4f}%   P(95%): {100*prob_OD5_95:.4f}%
-            OD6 | E[300]: {np.sum(prob_300_OD6s):.0f}   P(99%): {100*prob_OD6_99:.4f}%   P(98%): {100*prob_OD6_98:.4f}%   P(97%): {100*prob_OD6_97:.4f}%   P(95%): {100*prob_OD6_95:.4f}%
-            OD7 | E[300]: {np.sum(prob_300_OD7s):.0f}   P(99%): {100*prob_OD7_99:.4f}%   P(98%): {100*prob_OD7_98:.4f}%   P(97%): {100*prob_OD7_97:.4f}%   P(95%): {100*prob_OD7_95:.4f}%
-            OD8 | E[300]: {np.sum(prob_300_OD8s):.0f}   P(99%): {100*prob_OD8_99:.4f}%   P(98%): {100*prob_OD8_98:.4f}%   P(97%): {100*prob_OD8_97:.4f}%   P(95%): {100*prob_OD8_95:.4f}%
+            {'   '.join([ f'{acc}% 300s: {needed}' for acc, needed in zip(targets, needed_num_300s) ])}
+            Max OD at P ≥ 50% | {'   '.join([ f'{acc}%: {od}' for acc, od in zip(targets, max_ods) ])}
             '''
         )
 
+        self.__exp_300_plot.setData(ods, exp_300s)
+        for i, plot in enumerate(self.__acc_plots):
+            plot.setData(ods, prob_accs[:, i])
+
+
+    def __clear_acc_plots(self):
+        data_blank = np.asarray([])
+
+        self.__exp_300_plot.setData(data_blank, data_blank)
+        for plot in self.__acc_plots:
+            plot.setData(data_blank, data_blank)
+
 
     def __on_view_range_changed(self, _=None):
         view = self.__graph.viewRect()
@@ -5,6 +5,7 @@ import numpy as np
 
 from widgets.bar_plot import BarGraphItem
 from misc.utils import Utils
+from analysis import TimingAnalysis
 
 
 class GraphTimingBPMInc(PyQt6.QtWidgets.QWidget):
@@ -56,20 +57,10 @@ class GraphTimingBPMInc(PyQt6.QtWidgets.QWidget):
 
     @Utils.benchmark(f'{__name__}')
     def plot_data(self, score_data, diff_data):
-        unique_md5s = np.unique(diff_data.index.get_level_values(0))
-        if unique_md5s.shape[0] == 0:
-            print('Error: No maps are selected')
+        x_data, y_data = TimingAnalysis.bpm_inc(score_data, diff_data)
+        if x_data.shape[0] == 0:
             return
 
-        if np.unique(diff_data.index.get_level_values(1)).shape[0] > 1:
-            print('Warning: multiple maps are selected. Taking just the first one...')
-
-        score_data = list(score_data.groupby(['MD5', 'TIMESTAMP', 'MODS']))[0][1]
-        diff_data  = list(diff_data.groupby(['MD5', 'TIMESTAMP', 'MODS']))[0][1]
-
-        x_data = np.asarray(score_data['T_MAP'])
-        y_data = np.asarray(diff_data['DIFF_T_PRESS_INC'])
-
         # Clear plots for redraw
         #self.__graph.clearPlots()
         self.__text.setText(f'')
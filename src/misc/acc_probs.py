@@ -0,0 +1,77 @@
+"""
+Probabilities of reaching accuracy targets given per-note hit statistics.
+
+Each note is hit within the 300 window with some probability, so the number of 300s in a play follows a
+Poisson-binomial distribution. The distribution is the product of the polynomials (1 - p) + p·z of every note.
+These are multiplied pairwise with FFTs in a divide-and-conquer fashion (PoiBin's dc-fft method), which is
+O(n log² n) per distribution, and many distributions (one per OD, for example) are evaluated together as a batch.
+
+Usage:
+
+    probs = AccProbs.get_300_probs(avgs, devs, hit_windows, slider_mask, miss_rates)
+    pmfs  = AccProbs.get_pmfs(probs)
+    tails = AccProbs.get_tail_probs(pmfs, needed_num_300s)
+"""
+import numpy as np
+import scipy.stats
+
+from misc.poibin import PoiBin
+
+
+
+class AccProbs():
+
+    @staticmethod
+    def get_300_probs(avgs, devs, hit_windows, slider_mask=None, miss_rates=None):
+        """
+        Probability of each note landing within each of the ``hit_windows`` (+/- ms),
+        assuming hit offsets of a note are normally distributed with ``avgs`` and ``devs``.
+
+        Sliders are counted as guaranteed 300s because the osu! slider hit window is so lenient it may
+        as well be a free hit. Misses scale down the probability of the note being a 300.
+
+        Returns an array of shape (num hit windows, num notes).
+        """
+        avgs = np.asarray(avgs, dtype=float)[np.newaxis, :]
+        devs = np.asarray(devs, dtype=float)[np.newaxis, :]
+        hit_windows = np.atleast_1d(np.asarray(hit_windows, dtype=float))[:, np.newaxis]
+
+        probs = \
+            scipy.stats.norm.cdf( hit_windows, loc=avgs, scale=devs) - \
+            scipy.stats.norm.cdf(-hit_windows, loc=avgs, scale=devs)
+
+        if slider_mask is not None:
+            probs[:, slider_mask] = 1.0
+
+        if miss_rates is not None:
+            probs *= 1 - np.asarray(miss_rates, dtype=float)[np.newaxis, :]
+
+        return probs
+
+
+    @staticmethod
+    def get_pmfs(probs):
+        """
+        Poisson-binomial distributions of the number of successes for each row of ``probs``.
+
+        ``probs`` is of shape (num distributions, num trials). Returns an array of shape
+        (num distributions, num trials + 1) where [ i, k ] is the probability of k successes.
+        """
+        return PoiBin.get_pmf_dc_fft(np.atleast_2d(probs))
+
+
+    @staticmethod
+    def get_tail_probs(pmfs, needed):
+        """
+        P(X >= needed) for every distribution in ``pmfs`` and every value in ``needed``.
+
+        Returns an array of shape (num distributions, num needed).
+        """
+        pmfs = np.atleast_2d(pmfs)
+
+        # tails[:, k] = P(X >= k), with a trailing 0 for k past the number of trials
+        tails = np.zeros((pmfs.shape[0], pmfs.shape[1] + 1))
+        tails[:, :-1] = np.cumsum(pmfs[:, ::-1], axis=1)[:, ::-1]
+
+        needed = np.clip(np.atleast_1d(np.asarray(needed, dtype=np.int64)), 0, pmfs.shape[1])
+        return np.minimum(tails[:, needed], 1.0)
@@ -0,0 +1,106 @@
+"""
+Statistics of values binned across multiple dimensions.
+
+Each data point is assigned a bin along every dimension, and the per-dimension bin indices are
+combined into a single flat index. Counts, means, and variances of all bins are then computed with
+np.bincount over that index, so the cost is O(n + number of bins) regardless of how many bins there are.
+
+Usage:
+
+    bins, counts, means, variances = BinnedStats.calc(
+        [ angles, velocities ], offsets,
+        [ np.arange(0, 181, 15), np.arange(0, 2001, 10) ],
+        min_count=30
+    )
+
+Bins follow np.histogram's convention: [ edge[i], edge[i + 1] ), with the last bin also including the upper edge.
+"""
+import numpy as np
+
+
+
+class BinnedStats():
+
+    @staticmethod
+    def get_bin_idxs(data, edges):
+        """
+        Returns (idxs, valid) where ``idxs`` is the bin each value of ``data`` falls in
+        and ``valid`` is False for values that are NaN or outside the edges.
+        """
+        data  = np.asarray(data)
+        edges = np.asarray(edges)
+        num_bins = edges.shape[0] - 1
+
+        if num_bins < 1:
+            raise ValueError(f'At least 2 bin edges are needed, got {edges.shape[0]}')
+
+        deltas = np.diff(edges)
+        if np.allclose(deltas, deltas[0]):
+            # Evenly spaced edges, bin can be calculated directly instead of searched for
+            with np.errstate(invalid='ignore'):
+                idxs = np.floor((data - edges[0])/deltas[0])
+                valid = (0 <= idxs) & (idxs <= num_bins)
+
+            idxs = np.where(valid, idxs, -1).astype(np.intp)
+        else:
+            # NaN sorts past the last edge so it ends up out of range as well
+            idxs = np.searchsorted(edges, data, side='right') - 1
+            valid = (0 <= idxs) & (idxs <= num_bins)
+
+        # Upper edge is part of the last bin
+        is_upper = (idxs == num_bins) & (data == edges[-1])
+        idxs[is_upper] = num_bins - 1
+        valid &= (idxs < num_bins)
+
+        return idxs, valid
+
+
+    @staticmethod
+    def calc(data, values, edges, min_count=1):
+        """
+        Bins ``values`` by the dimensions in ``data`` and computes statistics for each bin.
+
+        ``data`` is a sequence of arrays, one per dimension, each the same length as ``values``.
+        ``edges`` is a sequence of bin edges, one per dimension. Points that are NaN or fall outside
+        the edges in any dimension are ignored.
+
+        Returns (bins, counts, means, variances) for bins with at least ``min_count`` points, where
+        ``bins`` is of shape (num bins, num dimensions) and holds the lower edge of each bin.
+        Variances are population variances, same as np.var.
+        """
+        values = np.asarray(values, dtype=float)
+        edges  = [ np.asarray(edge) for edge in edges ]
+        shape  = tuple(edge.shape[0] - 1 for edge in edges)
+
+        valid = ~np.isnan(values)
+        bin_idxs = []
+
+        for dim_data, dim_edges in zip(data, edges):
+            idxs, dim_valid = BinnedStats.get_bin_idxs(dim_data, dim_edges)
+            bin_idxs.append(idxs)
+            valid &= dim_valid
+
+        values = values[valid]
+
+        # Row-major flat index of each point's bin
+        num_bins = int(np.prod(shape))
+        flat_idxs = np.zeros(values.shape[0], dtype=np.intp)
+
+        for idxs, dim_size in zip(bin_idxs, shape):
+            flat_idxs *= dim_size
+            flat_idxs += idxs[valid]
+
+        counts = np.bincount(flat_idxs, minlength=num_bins)
+        sums   = np.bincount(flat_idxs, weights=values, minlength=num_bins)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = sums/counts
+
+            # Two pass to avoid the cancellation error of E[x²] - E[x]²
+            deltas = values - means[flat_idxs]
+            variances = np.bincount(flat_idxs, weights=deltas*deltas, minlength=num_bins)/counts
+
+        select = np.flatnonzero(counts >= max(min_count, 1))
+        bins = np.column_stack([ dim_edges[idxs] for dim_edges, idxs in zip(edges, np.unravel_index(select, shape)) ])
+
+        return bins, counts[select], means[select], variances[select]
@@ -0,0 +1,142 @@
+"""
+Shared worker pool for graph computations.
+
+Graphs submit their data processing as a job under a key (usually the graph itself). Only the
+latest job of a key is of interest: submitting a new job cancels the previous one if it has not
+started yet, and results of jobs that were superseded while running are dropped. The result of the
+latest job is handed to its callback on the Qt thread.
+
+Usage:
+
+    ComputeScheduler.submit(self, self.__proc_data, (score_data, diff_data), self.__display_data)
+
+``__proc_data`` runs in the pool and returns a tuple of arguments that ``__display_data`` is called with.
+
+Jobs given a ``cache_key`` (see ResultCache.fingerprint) store their result in the ResultCache. If a
+result for the key is already there, the callback is called with it right away and nothing is computed.
+"""
+import threading
+import concurrent.futures
+
+from PyQt6 import QtCore
+
+from misc.Logger import Logger
+from misc.result_cache import ResultCache
+
+
+
+class ComputeScheduler(QtCore.QObject):
+
+    logger = Logger.get_logger(__name__)
+
+    MAX_WORKERS = 4
+
+    __job_done = QtCore.pyqtSignal(object, int, object, object)
+
+    __instance = None
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=ComputeScheduler.MAX_WORKERS, thread_name_prefix='compute')
+        self.__lock = threading.Lock()
+
+        # key -> (job id, future) of the latest job submitted under that key
+        self.__jobs = {}
+        self.__job_id = 0
+
+        self.__job_done.connect(self.__job_done_event)
+
+
+    @staticmethod
+    def submit(key, func, args, callback, cache_key=None):
+        """
+        Runs ``func(*args)`` in the worker pool, superseding any earlier job submitted under ``key``.
+        ``callback(*result)`` is then called on the Qt thread unless ``func`` returns None or a
+        newer job for ``key`` was submitted in the meantime.
+
+        Must be called from the Qt thread.
+        """
+        if ComputeScheduler.__instance is None:
+            ComputeScheduler.__instance = ComputeScheduler()
+
+        if cache_key is not None:
+            result = ResultCache.get(cache_key)
+            if result is not None:
+                ComputeScheduler.__instance.__cancel(key)
+                callback(*result)
+                return
+
+        ComputeScheduler.__instance.__submit(key, func, args, callback, cache_key)
+
+
+    @staticmethod
+    def cancel(key):
+        """
+        Cancels the job submitted under ``key``. Its result, if any, is dropped.
+        """
+        if ComputeScheduler.__instance is None:
+            return
+
+        ComputeScheduler.__instance.__cancel(key)
+
+
+    def __submit(self, key, func, args, callback, cache_key):
+        with self.__lock:
+            self.__cancel_job(key)
+
+            self.__job_id += 1
+            job_id = self.__job_id
+
+            future = self.__executor.submit(self.__run, key, job_id, func, args, callback, cache_key)
+            self.__jobs[key] = (job_id, future)
+
+
+    def __cancel(self, key):
+        with self.__lock:
+            self.__cancel_job(key)
+            self.__jobs.pop(key, None)
+
+
+    def __cancel_job(self, key):
+        if key not in self.__jobs:
+            return
+
+        # Only stops jobs that have not started yet. A running job finishes and its result is dropped.
+        _, future = self.__jobs[key]
+        future.cancel()
+
+
+    def __is_latest(self, key, job_id):
+        with self.__lock:
+            return (key in self.__jobs) and (self.__jobs[key][0] == job_id)
+
+
+    def __run(self, key, job_id, func, args, callback, cache_key):
+        # Jobs queued behind others may have been superseded by the time they get a worker
+        if not self.__is_latest(key, job_id):
+            return
+
+        try: result = func(*args)
+        except Exception:
+            self.logger.exception(f'Job for {type(key).__name__} failed')
+            return
+
+        if result is None:
+            return
+
+        # Still valid for its inputs even if superseded, so it's cached either way
+        if cache_key is not None:
+            ResultCache.put(cache_key, result)
+
+        self.__job_done.emit(key, job_id, callback, result)
+
+
+    def __job_done_event(self, key, job_id, callback, result):
+        if not self.__is_latest(key, job_id):
+            return
+
+        with self.__lock:
+            self.__jobs.pop(key, None)
+
+        callback(*result)
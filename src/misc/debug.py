@@ -15,5 +15,6 @@ log_debug = {
     'db_mgr'               : False,
     'npy_mgr'              : False,
     'score_npy'            : False,
+    'diff_recalc'          : False,
     'data_mgr'             : False,
 }
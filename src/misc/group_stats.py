@@ -0,0 +1,176 @@
+"""
+Grouped statistics over unsorted data.
+
+Graphs commonly need statistics of ``y`` for every unique value of ``x``. Doing this with
+a mask per unique value is O(n·k). Here the data is sorted by ``x`` once and each group becomes
+a contiguous run, so all statistics are computed with reductions over runs in O(n log n).
+
+Usage:
+
+    keys, avgs, devs, counts = GroupStats.agg(x, y, 'mean', 'std', 'count')
+
+Keys are returned in ascending order, same as np.unique. NaN keys are grouped together.
+"""
+import numpy as np
+
+
+
+class GroupStats():
+
+    STATS = [ 'mean', 'std', 'var', 'count', 'sum', 'min', 'max' ]
+
+    @staticmethod
+    def group(x):
+        """
+        Sorts ``x`` and splits it into runs of equal values.
+
+        Returns (keys, order, starts, counts) where ``order`` is the sort order of ``x``,
+        and ``starts``/``counts`` are the position and length of each run in sorted order.
+        """
+        x = np.asarray(x)
+        order = np.argsort(x, kind='stable')
+        x_sorted = x[order]
+
+        if x_sorted.shape[0] == 0:
+            blank = np.asarray([], dtype=np.int64)
+            return x_sorted, order, blank, blank
+
+        is_new = (x_sorted[1:] != x_sorted[:-1])
+        if np.issubdtype(x_sorted.dtype, np.floating):
+            # NaN != NaN, but np.unique treats NaNs as one value
+            is_new &= ~(np.isnan(x_sorted[1:]) & np.isnan(x_sorted[:-1]))
+
+        starts = np.concatenate(([ 0 ], np.flatnonzero(is_new) + 1))
+        counts = np.diff(np.append(starts, x_sorted.shape[0]))
+
+        return x_sorted[starts], order, starts, counts
+
+
+    @staticmethod
+    def agg(x, y, *stats, ddof=0):
+        """
+        Computes the requested ``stats`` of ``y`` for each unique value of ``x``.
+
+        Returns a tuple of (keys, stat_1, stat_2, ...) with statistics in the order they were requested.
+        Available stats are listed in ``GroupStats.STATS``. std and var of groups with
+        ``ddof`` or fewer values are NaN.
+        """
+        for stat in stats:
+            if stat not in GroupStats.STATS:
+                raise ValueError(f'Unknown stat: {stat}')
+
+        keys, order, starts, counts = GroupStats.group(x)
+        y_sorted = np.asarray(y)[order]
+
+        if keys.shape[0] == 0:
+            return (keys, ) + tuple(np.asarray([], dtype=float) for _ in stats)
+
+        results = {}
+
+        def get(stat):
+            if stat in results:
+                return results[stat]
+
+            if stat == 'count':
+                results[stat] = counts
+            elif stat == 'sum':
+                results[stat] = np.add.reduceat(y_sorted, starts)
+            elif stat == 'min':
+                results[stat] = np.minimum.reduceat(y_sorted, starts)
+            elif stat == 'max':
+                results[stat] = np.maximum.reduceat(y_sorted, starts)
+            elif stat == 'mean':
+                results[stat] = get('sum')/counts
+            elif stat == 'var':
+                # Two pass to avoid the cancellation error of E[y²] - E[y]²
+                deltas = y_sorted - np.repeat(get('mean'), counts)
+                sq_sum = np.add.reduceat(deltas*deltas, starts)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    results[stat] = np.where(counts > ddof, sq_sum/(counts - ddof), np.nan)
+            elif stat == 'std':
+                results[stat] = np.sqrt(get('var'))
+
+            return results[stat]
+
+        return (keys, ) + tuple(get(stat) for stat in stats)
+
+
+    @staticmethod
+    def mean(x, y):
+        return GroupStats.agg(x, y, 'mean')
+
+
+    @staticmethod
+    def count(x):
+        keys, _, _, counts = GroupStats.group(x)
+        return keys, counts
+
+
+    @staticmethod
+    def quantile(x, y, q):
+        """
+        Computes the ``q`` quantile(s) of ``y`` for each unique value of ``x``. Interpolation
+        is linear, same as np.quantile's default.
+
+        Returns (keys, quantiles). If ``q`` is a sequence, quantiles is of shape (len(q), num keys).
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+
+        keys, _, starts, counts = GroupStats.group(x)
+
+        # Sort by value within each group. Group runs are in the same place as when sorted by x alone.
+        order = np.lexsort((y, x))
+        y_sorted = y[order]
+
+        q_arr = np.atleast_1d(np.asarray(q, dtype=float))
+        pos = starts + q_arr[:, None]*(counts - 1)
+
+        idx_lo = np.floor(pos).astype(np.int64)
+        idx_hi = np.ceil(pos).astype(np.int64)
+        frac = pos - idx_lo
+
+        quantiles = y_sorted[idx_lo] + frac*(y_sorted[idx_hi] - y_sorted[idx_lo])
+
+        if np.ndim(q) == 0:
+            return keys, quantiles[0]
+
+        return keys, quantiles
+
+
+    @staticmethod
+    def window_mean(x, y, tol):
+        """
+        For each unique value v of ``x``, averages all ``y`` whose ``x`` is within ``tol``
+        of v, i.e. |x - v| < tol. Windows of neighbouring keys overlap.
+
+        Returns (keys, means, counts).
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+
+        valid = ~np.isnan(x) if np.issubdtype(x.dtype, np.floating) else np.ones(x.shape[0], dtype=bool)
+        x = x[valid]
+        y = y[valid]
+
+        order = np.argsort(x, kind='stable')
+        x_sorted = x[order]
+        y_sorted = y[order]
+
+        # NaN values of y would poison every cumulative sum after them, so they are counted separately
+        y_nan = np.isnan(y_sorted)
+        y_cumsum   = np.concatenate(([ 0 ], np.cumsum(np.where(y_nan, 0, y_sorted))))
+        nan_cumsum = np.concatenate(([ 0 ], np.cumsum(y_nan)))
+
+        keys = np.unique(x_sorted)
+
+        idx_lo = np.searchsorted(x_sorted, keys - tol, side='right')
+        idx_hi = np.searchsorted(x_sorted, keys + tol, side='left')
+
+        counts = idx_hi - idx_lo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = (y_cumsum[idx_hi] - y_cumsum[idx_lo])/counts
+
+        means[(nan_cumsum[idx_hi] - nan_cumsum[idx_lo]) > 0] = np.nan
+
+        return keys, means, counts
@@ -70,6 +70,12 @@ class OsuUtils():
         else:          return (1950 - ms)/150
 
     
+    @staticmethod
+    def od_to_ms(od: 'float') -> float:
+        # +/- ms window of a 300
+        return 79.5 - 6*od
+
+
     @staticmethod
     def cs_to_px(cs: 'float') -> float:
         # From https://github.com/ppy/osu/blob/master/osu.Game.Rulesets.Osu/Objects/OsuHitObject.cs#L137
@@ -0,0 +1,163 @@
+"""
+Index of where each play is in score data and the difficulty data expanded to it.
+
+Graphs that work per play used to zip together ``groupby(['MD5', 'TIMESTAMP'])`` of the score data
+and of the difficulty data. That rebuilds both groupings on every redraw and relies on them grouping
+in the same order. Here the plays are found once from the index codes, and each play becomes
+a contiguous run of rows, the same for score and difficulty columns.
+
+Usage:
+
+    segments = PlaySegments(score_data, diff_data)
+
+    t_map = segments.column(score_data, 'T_MAP')
+    bpms  = segments.column(diff_data, 'DIFF_T_PRESS_DIFF')
+
+    for play in segments.slices():
+        t_map[play], bpms[play]
+
+    first_t_map = segments.first(t_map)
+    num_misses  = segments.sum(segments.column(score_data, 'TYPE_HIT') == StdScoreData.TYPE_MISS)
+
+Plays are in the same order ``groupby(['MD5', 'TIMESTAMP'])`` would give them. If the data is already
+sorted by play (as it normally is), columns are returned as is without being copied.
+"""
+import numpy as np
+
+
+
+class PlaySegments():
+
+    def __init__(self, score_data, diff_data=None):
+        if (diff_data is not None) and (diff_data.shape[0] != score_data.shape[0]):
+            raise ValueError(f'Difficulty data is not row aligned with score data: {diff_data.shape[0]} != {score_data.shape[0]} rows')
+
+        index = score_data.index
+
+        # Play each row belongs to. Level codes are in sorted order of the level values,
+        # so plays come out in the same order as groupby would give them
+        md5_codes = index.codes[0].astype(np.int64)
+        ts_codes  = index.codes[1].astype(np.int64)
+        play_keys = md5_codes*len(index.levels[1]) + ts_codes
+
+        if np.all(play_keys[1:] >= play_keys[:-1]):
+            self.__order = None
+        else:
+            self.__order = np.argsort(play_keys, kind='stable')
+            play_keys = play_keys[self.__order]
+
+        num_rows = play_keys.shape[0]
+        self.__starts = np.flatnonzero(np.diff(play_keys, prepend=-1)) if num_rows > 0 else np.asarray([], dtype=np.int64)
+        self.__stops  = np.append(self.__starts[1:], num_rows).astype(np.int64)
+
+        # Which play each row (in segment order) belongs to
+        self.__play_ids = np.repeat(np.arange(self.__starts.shape[0]), self.__stops - self.__starts)
+
+        first_rows = self.__starts if self.__order is None else self.__order[self.__starts]
+        self.__md5s       = index.get_level_values(0).values[first_rows]
+        self.__timestamps = index.get_level_values(1).values[first_rows]
+
+
+    def __len__(self):
+        return self.__starts.shape[0]
+
+
+    def starts(self):
+        return self.__starts
+
+
+    def stops(self):
+        return self.__stops
+
+
+    def counts(self):
+        return self.__stops - self.__starts
+
+
+    def play_ids(self):
+        """
+        Play number of each row, in segment order
+        """
+        return self.__play_ids
+
+
+    def keys(self):
+        """
+        (md5, timestamp) of each play
+        """
+        return list(zip(self.__md5s, self.__timestamps))
+
+
+    def column(self, data, name):
+        """
+        Values of column ``name`` of ``data`` (score data or difficulty data) in segment order
+        """
+        return self.take(data[name].values)
+
+
+    def take(self, values):
+        """
+        Puts per row ``values`` given in the data's row order into segment order
+        """
+        values = np.asarray(values)
+        return values if self.__order is None else values[self.__order]
+
+
+    def slices(self):
+        """
+        Slice of each play's rows, to be used on arrays in segment order
+        """
+        return [ slice(start, stop) for start, stop in zip(self.__starts, self.__stops) ]
+
+
+    def first(self, values):
+        """
+        First value of each play
+        """
+        return values[self.__starts]
+
+
+    def sum(self, values):
+        """
+        Sum of ``values`` over each play. Plays with no rows can't exist, so reduceat is safe to use
+        """
+        if self.__starts.shape[0] == 0:
+            return np.asarray([], dtype=np.asarray(values).dtype)
+
+        return np.add.reduceat(values, self.__starts)
+
+
+    def mean(self, values, where=None):
+        """
+        Mean of ``values`` over each play, using only the values ``where`` is set, if given.
+        Plays with no values used are NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if where is None:
+            where = np.ones(values.shape[0], dtype=bool)
+
+        counts = self.sum(where.astype(np.int64))
+        sums   = self.sum(np.where(where, values, 0))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+
+
+    def std(self, values, where=None):
+        """
+        Standard deviation (ddof=0) of ``values`` over each play, using only the values ``where`` is set, if given.
+        Plays with no values used are NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if where is None:
+            where = np.ones(values.shape[0], dtype=bool)
+
+        means  = self.mean(values, where)
+        counts = self.sum(where.astype(np.int64))
+
+        # Two pass: square of differences from each play's own mean
+        diffs  = np.where(where, values - means[self.__play_ids], 0)
+        sq_sum = self.sum(diffs*diffs)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(sq_sum / counts)
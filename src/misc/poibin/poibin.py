@@ -19,6 +19,19 @@ Description:
         * ``cdf``: cumulative distribution function
         * ``pval``: p-value (1 - cdf)
 
+    The distribution can be computed with one of several methods, selected
+    with the ``method`` argument of the constructor:
+
+        * ``dft-cf``: discrete Fourier transform of the characteristic
+          function [Hong2013]_. Exact, O(n^2) time. Memory is bounded by
+          evaluating the characteristic function in chunks.
+        * ``dc-fft``: divide-and-conquer convolution of the single trial
+          distributions with FFTs. Exact, O(n log^2 n) time, O(n) memory.
+        * ``rna``: refined normal approximation [Volkova1996]_. O(n) time
+          and memory, accurate for large n when the variance is not small.
+        * ``auto``: ``dft-cf`` up to ``PoiBin.AUTO_THRESHOLD`` trials,
+          ``dc-fft`` above.
+
 Usage:
     Be ``p`` a list or  NumPy array of success probabilities for ``n``
     non-identically distributed Bernoulli random variables.
@@ -28,6 +41,10 @@ Usage:
         >>> from poibin import PoiBin
         >>> pb = PoiBin(p)
 
+    or, for a large number of trials::
+
+        >>> pb = PoiBin(p, method='dc-fft')
+
     Be ``x`` a list or NumPy array of different number of successes.
     To obtain the:
 
@@ -52,6 +69,11 @@ References:
     Computational Statistics & Data Analysis, Volume 59, March 2013,
     Pages 41-51, ISSN 0167-9473,
     http://dx.doi.org/10.1016/j.csda.2012.10.006.
+
+.. [Volkova1996] A. Yu. Volkova, A refinement of the central limit theorem
+    for sums of independent random indicators,
+    Theory of Probability and its Applications, Volume 40, 1996,
+    Pages 791-794.
 """
 
 import collections
@@ -70,19 +92,36 @@ class PoiBin(object):
     cumulative distribution function, and p-values for right-sided testing.
     """
 
-    def __init__(self, probabilities):
+    METHODS = ('dft-cf', 'dc-fft', 'rna', 'auto')
+
+    # Number of trials above which ``auto`` switches from ``dft-cf`` to ``dc-fft``
+    AUTO_THRESHOLD = 1000
+
+    # Max number of complex values ``get_chi`` evaluates at once
+    MAX_CHI_CHUNK_SIZE = 2**20
+
+    def __init__(self, probabilities, method='dft-cf'):
         """Initialize the class and calculate the ``pmf`` and ``cdf``.
 
         :param probabilities: sequence of success probabilities :math:`p_i \\in
             [0, 1] \\forall i \\in [0, N]` for :math:`N` independent but not
             identically distributed Bernoulli random variables
         :type probabilities: numpy.array
+        :param method: method used to compute the distribution, one of
+            ``PoiBin.METHODS``
+        :type method: str
         """
         self.success_probabilities = np.array(probabilities)
         self.number_trials = self.success_probabilities.size
         self.check_input_prob()
+        self.method = self.get_method(method)
         self.omega = 2 * np.pi / (self.number_trials + 1)
-        self.pmf_list = self.get_pmf_xi()
+        if self.method == 'dft-cf':
+            self.pmf_list = self.get_pmf_xi()
+        elif self.method == 'dc-fft':
+            self.pmf_list = self.get_pmf_dc_fft(self.success_probabilities)
+        elif self.method == 'rna':
+            self.pmf_list = self.get_pmf_rna()
         self.cdf_list = self.get_cdf(self.pmf_list)
 
 # ------------------------------------------------------------------------------
@@ -176,11 +215,8 @@ class PoiBin(object):
         :param event_probabilities: array of single event probabilities
         :type event_probabilities: numpy.array
         """
-        cdf = np.empty(self.number_trials + 1)
-        cdf[0] = event_probabilities[0]
-        for i in range(1, self.number_trials + 1):
-            cdf[i] = cdf[i - 1] + event_probabilities[i]
-        return cdf
+        event_probabilities = np.asarray(event_probabilities, dtype=float)
+        return np.cumsum(event_probabilities[:self.number_trials + 1])
 
     def get_pmf_xi(self):
         """Return the values of the variable ``xi``.
@@ -192,9 +228,12 @@ class PoiBin(object):
         chi[0] = 1
         half_number_trials = int(
             self.number_trials / 2 + self.number_trials % 2)
-        # set first half of chis:
-        chi[1:half_number_trials + 1] = self.get_chi(
-            np.arange(1, half_number_trials + 1))
+        # set first half of chis, a chunk at a time to bound the size of
+        # the (chunk size x number of trials) matrix ``get_chi`` builds:
+        chunk_size = max(1, self.MAX_CHI_CHUNK_SIZE // max(1, self.number_trials))
+        for start in range(1, half_number_trials + 1, chunk_size):
+            end = min(start + chunk_size, half_number_trials + 1)
+            chi[start:end] = self.get_chi(np.arange(start, end))
         # set second half of chis:
         chi[half_number_trials + 1:self.number_trials + 1] = np.conjugate(
             chi[1:self.number_trials - half_number_trials + 1] [::-1])
@@ -207,6 +246,85 @@ class PoiBin(object):
         xi += np.finfo(type(xi[0])).eps
         return xi
 
+    @staticmethod
+    def get_pmf_dc_fft(probabilities):
+        """Return the ``pmf`` by convolving the single trial distributions.
+
+        Every trial is the polynomial :math:`(1 - p_i) + p_i z` and the
+        ``pmf`` is the coefficients of their product. The polynomials are
+        multiplied pairwise with FFTs until one is left.
+
+        ``probabilities`` can also be two-dimensional, in which case each row is
+        a separate distribution and an array of shape (rows, trials + 1) is
+        returned.
+
+        :param probabilities: success probabilities
+        :type probabilities: numpy.array
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        is_batch = (probabilities.ndim == 2)
+        probabilities = np.atleast_2d(probabilities)
+        number_dists, number_trials = probabilities.shape
+
+        if number_trials == 0:
+            pmf = np.ones((number_dists, 1))
+            return pmf if is_batch else pmf[0]
+
+        # pad up to a power of 2 with trials that never succeed so that
+        # polynomials can always be paired up:
+        number_polys = 1 << int(np.ceil(np.log2(number_trials)))
+        polys = np.zeros((number_dists, number_polys, 2))
+        polys[:, :, 0] = 1.
+        polys[:, :number_trials, 0] = 1 - probabilities
+        polys[:, :number_trials, 1] = probabilities
+
+        while polys.shape[1] > 1:
+            out_len = 2 * polys.shape[2] - 1
+            fft_len = 1 << int(np.ceil(np.log2(out_len)))
+            coefs = np.fft.rfft(polys, n=fft_len, axis=2)
+            coefs = coefs[:, 0::2] * coefs[:, 1::2]
+            polys = np.fft.irfft(coefs, n=fft_len, axis=2)[:, :, :out_len]
+
+        # FFT round-off leaves tiny negative values where probabilities are ~0:
+        pmf = np.clip(polys[:, 0, :number_trials + 1], 0., 1.)
+        return pmf if is_batch else pmf[0]
+
+    def get_pmf_rna(self):
+        """Return the ``pmf`` using the refined normal approximation.
+
+        The ``cdf`` is approximated as in [Volkova1996]_ by
+
+        .. math::
+
+            cdf(k) \\approx G((k + 0.5 - \\mu) / \\sigma),
+
+            G(x) = \\Phi(x) + \\gamma (1 - x^2) \\phi(x) / 6
+
+        where :math:`\\gamma` is the skewness, and the ``pmf`` is its
+        difference.
+        """
+        from scipy.stats import norm
+
+        p = self.success_probabilities.astype(float)
+        mu = np.sum(p)
+        sigma = np.sqrt(np.sum(p * (1 - p)))
+
+        if sigma == 0:
+            # all trials are certain:
+            pmf = np.zeros(self.number_trials + 1)
+            pmf[int(round(mu))] = 1.
+            return pmf
+
+        gamma = np.sum(p * (1 - p) * (1 - 2 * p)) / sigma**3
+        x = (np.arange(self.number_trials + 1) + 0.5 - mu) / sigma
+        cdf = norm.cdf(x) + gamma * (1 - x**2) * norm.pdf(x) / 6
+
+        # the refinement term can make the approximation leave [0, 1] and
+        # decrease slightly in the tails:
+        cdf = np.maximum.accumulate(np.clip(cdf, 0., 1.))
+        cdf[-1] = 1.
+        return np.diff(cdf, prepend=0.)
+
     def get_chi(self, idx_array):
         """Return the values of ``chi`` for the specified indices.
 
@@ -270,6 +388,17 @@ class PoiBin(object):
         print(xi_values.imag[xi_values.imag > 4*np.finfo(float).eps])
         return np.all(xi_values.imag <= 4*np.finfo(float).eps)
 
+    def get_method(self, method):
+        """Check that ``method`` is known and resolve ``auto``."""
+        if method not in self.METHODS:
+            raise ValueError(
+                "Method must be one of " + ", ".join(self.METHODS) + ".")
+        if method == 'auto':
+            if self.number_trials <= self.AUTO_THRESHOLD:
+                return 'dft-cf'
+            return 'dc-fft'
+        return method
+
     def check_input_prob(self):
         """Check that all the input probabilities are in the interval [0, 1]."""
         if self.success_probabilities.shape != (self.number_trials,):
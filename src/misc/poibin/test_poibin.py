@@ -253,3 +253,123 @@ def test_check_input_prob():
                                + "than 1."):
         pb = PoiBin([1, 2])
 
+
+# PoiBin methods ---------------------------------------------------------------
+
+def test_pmf_methods():
+    """Test the probability mass function of the alternative methods.
+
+    The exact methods are compared with the poibin R package [Rpoibin]_ the
+    same way as in ``test_pmf``.
+    """
+    for method in ['dc-fft', 'auto']:
+        p = [0.4163448, 0.3340270, 0.9689613]
+        pb = PoiBin(p, method=method)
+        res = pb.pmf([0, 1, 2, 3])
+        res_ref = np.array([0.0120647, 0.39129134, 0.46189012, 0.13475384])
+        assert np.all(np.abs(res - res_ref) < 1e-8)
+
+        p = [0.9955901, 0.5696224, 0.8272597, 0.3818746, 0.4290036,
+             0.8707646, 0.8858267, 0.7557183]
+        pb = PoiBin(p, method=method)
+        res = pb.pmf([0, 2, 7, 8])
+        res_ref = np.array([4.17079659e-07, 2.46250608e-03, 2.02460933e-01,
+                            4.48023378e-02])
+        assert np.all(np.abs(res - res_ref) < 1e-8)
+
+def test_pmf_dc_fft():
+    """Compare the divide-and-conquer FFT method with ``dft-cf``."""
+    np.random.seed(0)
+    for n in [1, 2, 3, 5, 64, 100, 513]:
+        p = np.random.random_sample(size=n)
+        pmf_dft = PoiBin(p).pmf(list(range(n + 1)))
+        pmf_fft = PoiBin(p, method='dc-fft').pmf(list(range(n + 1)))
+        assert np.all(np.abs(pmf_dft - pmf_fft) < 1e-10)
+
+    # Certain outcomes:
+    pb = PoiBin([1, 1, 0], method='dc-fft')
+    assert np.all(np.abs(pb.pmf([0, 1, 2, 3]) - np.array([0, 0, 1, 0])) <
+                  1e-12)
+
+def test_pmf_dc_fft_binom():
+    """Compare the divide-and-conquer FFT method with the binomial limit case
+    for a large number of trials.
+    """
+    n = 5000
+    pb = PoiBin([0.98] * n, method='dc-fft')
+    bn = binom(n=n, p=0.98)
+    k = np.arange(n + 1)
+    assert np.all(np.abs(pb.pmf_list - bn.pmf(k)) < 1e-10)
+    assert np.all(np.abs(pb.cdf_list - bn.cdf(k)) < 1e-10)
+
+def test_get_pmf_dc_fft_batch():
+    """Test that rows of a two-dimensional input are separate distributions."""
+    np.random.seed(1)
+    p = np.random.random_sample(size=(4, 37))
+    pmfs = PoiBin.get_pmf_dc_fft(p)
+    assert pmfs.shape == (4, 38)
+    for i in range(p.shape[0]):
+        assert np.all(np.abs(pmfs[i] - PoiBin.get_pmf_dc_fft(p[i])) < 1e-12)
+
+def test_pmf_rna():
+    """Compare the refined normal approximation with the exact ``cdf``."""
+    np.random.seed(2)
+    p = np.random.uniform(0.2, 0.8, size=2000)
+    cdf_exact = PoiBin(p, method='dc-fft').cdf_list
+    cdf_rna = PoiBin(p, method='rna').cdf_list
+    assert np.max(np.abs(cdf_exact - cdf_rna)) < 1e-3
+    assert np.abs(cdf_rna[-1] - 1.) < 1e-12
+    assert np.all(np.diff(cdf_rna) >= 0)
+
+    # Certain outcomes:
+    pb = PoiBin([1, 1, 0], method='rna')
+    assert np.all(pb.pmf([0, 1, 2, 3]) == np.array([0, 0, 1, 0]))
+
+def test_get_pmf_xi_chunked():
+    """Test that evaluating ``chi`` in chunks does not change the result."""
+    np.random.seed(3)
+    p = np.random.random_sample(size=301)
+    pmf_ref = PoiBin(p).get_pmf_xi()
+
+    class PoiBinSmallChunks(PoiBin):
+        MAX_CHI_CHUNK_SIZE = 1000
+
+    pmf_chunked = PoiBinSmallChunks(p).get_pmf_xi()
+    assert np.all(np.abs(pmf_ref - pmf_chunked) < 1e-12)
+
+def test_get_method():
+    """Test that ``auto`` picks the method by the number of trials."""
+    assert PoiBin([0.5] * PoiBin.AUTO_THRESHOLD, method='auto').method == \
+        'dft-cf'
+    assert PoiBin([0.5] * (PoiBin.AUTO_THRESHOLD + 1),
+                  method='auto').method == 'dc-fft'
+    with pytest.raises(ValueError):
+        PoiBin([0.5], method='unknown')
+
+################################################################################
+# Benchmark
+################################################################################
+
+def benchmark_methods(numbers_trials=(100, 1000, 3000, 10000, 100000)):
+    """Print how long each method takes to build the distribution.
+
+    ``dft-cf`` is O(n^2) and is skipped above 10000 trials.
+    """
+    import time
+
+    np.random.seed(0)
+    for n in numbers_trials:
+        p = np.random.uniform(0.9, 1., size=n)
+        line = '{:>7d} trials |'.format(n)
+        for method in ['dft-cf', 'dc-fft', 'rna']:
+            if method == 'dft-cf' and n > 10000:
+                line += '  {}: {:>10s}'.format(method, '-')
+                continue
+            t_start = time.perf_counter()
+            PoiBin(p, method=method)
+            t_total = time.perf_counter() - t_start
+            line += '  {}: {:>7.1f} ms'.format(method, 1000 * t_total)
+        print(line)
+
+if __name__ == "__main__":
+    benchmark_methods()
@@ -0,0 +1,173 @@
+"""
+Memory bounded cache of computed graph results.
+
+Results are keyed by a fingerprint of whatever they were computed from: the name of the graph, the
+selected data, and any graph settings. Selected data is fingerprinted by its index (the plays and
+score points selected, which also reflects ROI filtering), shape, and columns rather than its values,
+so the cache must be cleared whenever loaded data is replaced or recalculated.
+
+Entries are evicted least recently used first once their total size goes over the
+'graph_cache_mb' config value.
+
+Usage:
+
+    key = ResultCache.fingerprint(type(self).__name__, score_data, diff_data, self.__setting)
+    result = ResultCache.get(key)
+    if result is None:
+        result = calc(score_data, diff_data)
+        ResultCache.put(key, result)
+"""
+import sys
+import hashlib
+import weakref
+import threading
+import collections
+
+import numpy as np
+import pandas as pd
+
+from file_managers.config_mgr import AppConfig
+
+
+
+class ResultCache():
+
+    __entries   = collections.OrderedDict()  # key -> (result, num bytes), least recently used first
+    __num_bytes = 0
+    __hits      = 0
+    __misses    = 0
+
+    __lock = threading.Lock()
+
+    # id(index) -> (weakref to index, digest). Every graph fingerprints the same selection,
+    # so the index of a selection only needs to be hashed once.
+    __index_digests = {}
+
+    @staticmethod
+    def fingerprint(*items):
+        """
+        Returns a key identifying ``items``. DataFrames and Index objects are identified by their index,
+        shape, and columns, numpy arrays by their contents, and anything else by its repr.
+        """
+        h = hashlib.blake2b(digest_size=16)
+
+        for item in items:
+            if isinstance(item, pd.DataFrame):
+                h.update(b'df')
+                h.update(ResultCache.__get_index_digest(item.index))
+                h.update(repr(item.shape).encode())
+                h.update(repr(list(item.columns)).encode())
+            elif isinstance(item, pd.Index):
+                h.update(b'idx')
+                h.update(ResultCache.__get_index_digest(item))
+            elif isinstance(item, np.ndarray):
+                h.update(b'np')
+                h.update(f'{item.dtype.str}{item.shape}'.encode())
+                h.update(np.ascontiguousarray(item).tobytes())
+            else:
+                h.update(b'obj')
+                h.update(repr(item).encode())
+
+        return h.hexdigest()
+
+
+    @staticmethod
+    def get(key):
+        """
+        Returns the result stored under ``key``, or None if there is none.
+        """
+        with ResultCache.__lock:
+            if key not in ResultCache.__entries:
+                ResultCache.__misses += 1
+                return None
+
+            ResultCache.__hits += 1
+            ResultCache.__entries.move_to_end(key)
+            return ResultCache.__entries[key][0]
+
+
+    @staticmethod
+    def put(key, result):
+        num_bytes = ResultCache.__get_num_bytes(result)
+        max_bytes = ResultCache.get_max_bytes()
+
+        if num_bytes > max_bytes:
+            return
+
+        with ResultCache.__lock:
+            if key in ResultCache.__entries:
+                ResultCache.__num_bytes -= ResultCache.__entries.pop(key)[1]
+
+            ResultCache.__entries[key] = (result, num_bytes)
+            ResultCache.__num_bytes += num_bytes
+
+            while ResultCache.__num_bytes > max_bytes:
+                _, (_, evicted_bytes) = ResultCache.__entries.popitem(last=False)
+                ResultCache.__num_bytes -= evicted_bytes
+
+
+    @staticmethod
+    def clear():
+        with ResultCache.__lock:
+            ResultCache.__entries.clear()
+            ResultCache.__num_bytes = 0
+
+
+    @staticmethod
+    def get_stats():
+        with ResultCache.__lock:
+            return {
+                'hits'      : ResultCache.__hits,
+                'misses'    : ResultCache.__misses,
+                'entries'   : len(ResultCache.__entries),
+                'bytes'     : ResultCache.__num_bytes,
+                'max_bytes' : ResultCache.get_max_bytes(),
+            }
+
+
+    @staticmethod
+    def get_max_bytes():
+        return int(AppConfig.cfg.get('graph_cache_mb', 256)*2**20)
+
+
+    @staticmethod
+    def __get_index_digest(index):
+        with ResultCache.__lock:
+            if id(index) in ResultCache.__index_digests:
+                index_ref, digest = ResultCache.__index_digests[id(index)]
+                if index_ref() is index:
+                    return digest
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr(list(index.names)).encode())
+
+        if isinstance(index, pd.MultiIndex):
+            for codes, level in zip(index.codes, index.levels):
+                h.update(np.ascontiguousarray(codes).tobytes())
+                h.update(pd.util.hash_array(level.values).tobytes())
+        else:
+            h.update(pd.util.hash_array(index.values).tobytes())
+
+        digest = h.digest()
+
+        index_id = id(index)
+        on_gone  = lambda _: ResultCache.__index_digests.pop(index_id, None)
+
+        with ResultCache.__lock:
+            ResultCache.__index_digests[index_id] = (weakref.ref(index, on_gone), digest)
+
+        return digest
+
+
+    @staticmethod
+    def __get_num_bytes(result):
+        if isinstance(result, np.ndarray):
+            return result.nbytes
+
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            return int(np.sum(result.memory_usage(index=True, deep=False)))
+
+        if isinstance(result, (tuple, list)):
+            return sys.getsizeof(result) + sum(ResultCache.__get_num_bytes(item) for item in result)
+
+        return sys.getsizeof(result)
@@ -0,0 +1,104 @@
+"""
+Coalesces selection changes before they are propagated.
+
+Dragging a region or clicking through a list changes the selection many times in quick succession, and each
+change would otherwise re-query the data stores and redraw every graph. Selection changes are posted to the bus
+under a key (usually the widget or event they come from). Each post restarts the key's timer and replaces the
+state posted before it, so the callback is called once, with the latest state, after the selection stops changing
+for the configured latency (``selection_latency_ms`` in config.json).
+
+Usage:
+
+    self.__play_graph.region_changed.connect(lambda data: SelectionBus.post(self.__play_graph, self.__timestamp_region_changed_event, data))
+
+Must be used from the Qt thread.
+"""
+from PyQt6 import QtCore
+
+from misc.Logger import Logger
+from file_managers.config_mgr import AppConfig
+
+
+
+class SelectionBus(QtCore.QObject):
+
+    logger = Logger.get_logger(__name__)
+
+    __instance = None
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+
+        # key -> [ timer, callback, args ] of the latest state posted under that key
+        self.__pending = {}
+
+
+    @staticmethod
+    def post(key, callback, *args):
+        """
+        Schedules ``callback(*args)`` to be called once no other state is posted under ``key``
+        for the latency budget. Earlier states posted under ``key`` that were not delivered yet are dropped.
+        """
+        if SelectionBus.__instance is None:
+            SelectionBus.__instance = SelectionBus()
+
+        SelectionBus.__instance.__post(key, callback, args)
+
+
+    @staticmethod
+    def flush(key):
+        """
+        Delivers the state pending under ``key`` right away, if there is one
+        """
+        if SelectionBus.__instance is None:
+            return
+
+        SelectionBus.__instance.__deliver(key)
+
+
+    @staticmethod
+    def cancel(key):
+        """
+        Drops the state pending under ``key``
+        """
+        if SelectionBus.__instance is None:
+            return
+
+        pending = SelectionBus.__instance.__pending.pop(key, None)
+        if pending is not None:
+            pending[0].stop()
+
+
+    @staticmethod
+    def get_latency():
+        return max(0, int(AppConfig.cfg.get('selection_latency_ms', 150)))
+
+
+    def __post(self, key, callback, args):
+        if key in self.__pending:
+            pending = self.__pending[key]
+            pending[1] = callback
+            pending[2] = args
+
+            self.logger.debug(f'Coalesced selection for {type(key).__name__}')
+        else:
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self.__deliver(key))
+
+            pending = [ timer, callback, args ]
+            self.__pending[key] = pending
+
+        pending[0].start(SelectionBus.get_latency())
+
+
+    def __deliver(self, key):
+        pending = self.__pending.pop(key, None)
+        if pending is None:
+            return
+
+        timer, callback, args = pending
+        timer.stop()
+        timer.deleteLater()
+
+        callback(*args)
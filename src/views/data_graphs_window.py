@@ -6,6 +6,7 @@ import time
 import PyQt6
 
 from misc.Logger import Logger
+from misc.play_segments import PlaySegments
 
 from graphs.score.hit_offset_graph import HitOffsetGraph
 from graphs.score.score_hit_doffset_graph import ScoreHitDOffsetGraph
@@ -125,6 +126,34 @@ class DataGraphsWindow(PyQt6.QtWidgets.QMainWindow):
         self.main_widget.addTab(self.play_data_tabs, 'Deviation data graphs')
         self.setCentralWidget(self.main_widget)
 
+        # Graphs that take just score data in `plot_data`
+        self.__score_only_graphs = [
+            self.hit_offset_graph,
+            self.score_offset_multimap_graph,
+            self.score_hit_doffset_graph,
+            self.hit_distr_graph,
+            self.doffset_distr_graph,
+            self.aim_display,
+        ]
+
+        # Graphs that work per play. These also take the selection's PlaySegments in `plot_data`
+        self.__segmented_graphs = [
+            self.toffset_rhy_graph,
+
+            self.dev_graph_rhythm,
+            self.dev_doffsets,
+            self.dev_offsets,
+            self.dev_t_ar,
+            self.dev_xy_ar,
+            self.dev_visible_ar,
+        ]
+
+        # Graph -> data to plot once it becomes visible
+        self.__dirty_graphs = {}
+
+        for tabs in [ self.main_widget, self.score_tabs, self.time_tabs, self.difficulty_tabs, self.map_tabs, self.play_data_tabs ]:
+            tabs.currentChanged.connect(self.__update_visible_graphs)
+
         self.timing_bpm_dec.time_changed_event.connect(self.time_changed_event)
         self.timing_bpm_inc.time_changed_event.connect(self.time_changed_event)
         self.timing_aim_diff.time_changed_event.connect(self.time_changed_event)
@@ -143,32 +172,34 @@ class DataGraphsWindow(PyQt6.QtWidgets.QMainWindow):
         '''
         self.logger.debug('new_replay_event')
 
-        self.hit_offset_graph.plot_data(score_data)
-        self.score_hit_doffset_graph.plot_data(score_data)
-        self.hit_distr_graph.plot_data(score_data)
-        self.doffset_distr_graph.plot_data(score_data)
-        self.aim_display.plot_data(score_data)
+        self.__set_dirty(score_data, diff_data, [
+            self.hit_offset_graph,
+            self.score_hit_doffset_graph,
+            self.hit_distr_graph,
+            self.doffset_distr_graph,
+            self.aim_display,
 
-        self.aim_difficulty.plot_data(score_data, diff_data)
-        self.tap_difficulty.plot_data(score_data, diff_data)
+            self.aim_difficulty,
+            self.tap_difficulty,
 
-        self.timing_bpm_dec.plot_data(score_data, diff_data)
-        self.timing_bpm_inc.plot_data(score_data, diff_data)
-        self.timing_aim_diff.plot_data(score_data, diff_data)
-        self.timing_reading_diff.plot_data(score_data, diff_data)
+            self.timing_bpm_dec,
+            self.timing_bpm_inc,
+            self.timing_aim_diff,
+            self.timing_reading_diff,
 
-        #self.toffset_bpm_inc.plot_data(score_data, diff_data)
-        ##self.toffset_bpm.plot_data(score_data, diff_data)
-        self.toffset_rhy_graph.plot_data(score_data, diff_data)
-        #self.toffset_rhyd_graph.plot_data(score_data, diff_data)
-        #self.toffset_velocity.plot_data(score_data, diff_data)
+            #self.toffset_bpm_inc,
+            ##self.toffset_bpm,
+            self.toffset_rhy_graph,
+            #self.toffset_rhyd_graph,
+            #self.toffset_velocity,
 
-        #self.dev_graph_rhythm.plot_data(score_data, diff_data)
-        self.dev_doffsets.plot_data(score_data, diff_data)
-        self.dev_offsets.plot_data(score_data, diff_data)
-        self.dev_t_ar.plot_data(score_data, diff_data)
-        self.dev_xy_ar.plot_data(score_data, diff_data)
-        self.dev_visible_ar.plot_data(score_data, diff_data)
+            #self.dev_graph_rhythm,
+            self.dev_doffsets,
+            self.dev_offsets,
+            self.dev_t_ar,
+            self.dev_xy_ar,
+            self.dev_visible_ar,
+        ])
 
 
     def overview_single_map_selection_event(self, score_data, diff_data):
@@ -177,29 +208,31 @@ class DataGraphsWindow(PyQt6.QtWidgets.QMainWindow):
         """
         self.logger.debug('overview_single_map_selection_event')
 
-        self.hit_offset_graph.plot_data(score_data)
-        self.score_offset_multimap_graph.plot_data(score_data)
-        self.score_hit_doffset_graph.plot_data(score_data)
-        self.hit_distr_graph.plot_data(score_data)
-        self.doffset_distr_graph.plot_data(score_data)
-        self.aim_display.plot_data(score_data)
+        self.__set_dirty(score_data, diff_data, [
+            self.hit_offset_graph,
+            self.score_offset_multimap_graph,
+            self.score_hit_doffset_graph,
+            self.hit_distr_graph,
+            self.doffset_distr_graph,
+            self.aim_display,
 
-        self.toffset_rhy_graph.plot_data(score_data, diff_data)
+            self.toffset_rhy_graph,
 
-        self.timing_bpm_dec.plot_data(score_data, diff_data)
-        self.timing_bpm_inc.plot_data(score_data, diff_data)
-        self.timing_aim_diff.plot_data(score_data, diff_data)
-        self.timing_reading_diff.plot_data(score_data, diff_data)
+            self.timing_bpm_dec,
+            self.timing_bpm_inc,
+            self.timing_aim_diff,
+            self.timing_reading_diff,
 
-        self.aim_difficulty.plot_data(score_data, diff_data)
-        self.tap_difficulty.plot_data(score_data, diff_data)
+            self.aim_difficulty,
+            self.tap_difficulty,
 
-        self.toffset_bpm.plot_data(score_data, diff_data)
+            self.toffset_bpm,
 
-        #self.dev_graph_rhythm.plot_data(score_data, diff_data)
-        self.dev_t_ar.plot_data(score_data, diff_data)
-        self.dev_xy_ar.plot_data(score_data, diff_data)
-        self.dev_visible_ar.plot_data(score_data, diff_data)
+            #self.dev_graph_rhythm,
+            self.dev_t_ar,
+            self.dev_xy_ar,
+            self.dev_visible_ar,
+        ])
 
     def set_from_play_data(self, score_data, diff_data):
         '''
@@ -211,21 +244,72 @@ class DataGraphsWindow(PyQt6.QtWidgets.QMainWindow):
             # TODO: Clear plots
             return
 
-        self.timing_bpm_dec.plot_data(score_data, diff_data)
-        self.timing_bpm_inc.plot_data(score_data, diff_data)
-        self.timing_aim_diff.plot_data(score_data, diff_data)
-
-        #self.toffset_bpm_inc.plot_data(score_data, diff_data)
-        #self.toffset_bpm.plot_data(score_data, diff_data)
-        self.toffset_rhy_graph.plot_data(score_data, diff_data)
-        #self.toffset_rhyd_graph.plot_data(score_data, diff_data)
-        #self.toffset_velocity.plot_data(score_data, diff_data)
-
-        #self.dev_graph_angle.plot_data(score_data, diff_data)
-        #self.dev_graph_vel.plot_data(score_data, diff_data)
-        #self.dev_graph_rhythm.plot_data(score_data, diff_data)
-        self.dev_doffsets.plot_data(score_data, diff_data)
-        self.dev_offsets.plot_data(score_data, diff_data)
-        self.dev_t_ar.plot_data(score_data, diff_data)
-        self.dev_xy_ar.plot_data(score_data, diff_data)
-        self.dev_visible_ar.plot_data(score_data, diff_data)
+        self.__set_dirty(score_data, diff_data, [
+            self.timing_bpm_dec,
+            self.timing_bpm_inc,
+            self.timing_aim_diff,
+
+            #self.toffset_bpm_inc,
+            #self.toffset_bpm,
+            self.toffset_rhy_graph,
+            #self.toffset_rhyd_graph,
+            #self.toffset_velocity,
+
+            self.dev_graph_angle,
+            self.dev_graph_vel,
+            #self.dev_graph_rhythm,
+            self.dev_doffsets,
+            self.dev_offsets,
+            self.dev_t_ar,
+            self.dev_xy_ar,
+            self.dev_visible_ar,
+        ])
+
+
+    def showEvent(self, event):
+        PyQt6.QtWidgets.QMainWindow.showEvent(self, event)
+
+        # Children are made visible after the window's show event, so check once they are
+        PyQt6.QtCore.QTimer.singleShot(0, self.__update_visible_graphs)
+
+
+    def __set_dirty(self, score_data, diff_data, graphs):
+        '''
+        Graphs are not plotted right away. They are marked as needing to be plotted with
+        the new data and are plotted once visible. Data a graph was last plotted with is kept
+        displayed until the selection changes again.
+
+        Plays of the selection are indexed the first time a graph that works per play gets plotted
+        with it, and shared by all such graphs. Selections no such graph is shown for are never indexed.
+        '''
+        segments = []
+
+        def get_segments():
+            if len(segments) == 0:
+                is_empty = (0 in [ score_data.shape[0], diff_data.shape[0] ])
+                segments.append(None if is_empty else PlaySegments(score_data, diff_data))
+
+            return segments[0]
+
+        for graph in graphs:
+            if graph in self.__score_only_graphs:
+                self.__dirty_graphs[graph] = ((score_data, ), None)
+            elif graph in self.__segmented_graphs:
+                self.__dirty_graphs[graph] = ((score_data, diff_data), get_segments)
+            else:
+                self.__dirty_graphs[graph] = ((score_data, diff_data), None)
+
+        self.__update_visible_graphs()
+
+
+    def __update_visible_graphs(self, _=None):
+        for graph in list(self.__dirty_graphs.keys()):
+            # Only true if the window is open and the graph is in the currently selected tabs
+            if not graph.isVisible():
+                continue
+
+            data, get_segments = self.__dirty_graphs.pop(graph)
+            if get_segments is not None:
+                data = data + (get_segments(), )
+
+            graph.plot_data(*data)
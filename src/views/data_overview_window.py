@@ -12,6 +12,8 @@ The data overview window manages and displays loaded data. The are 3 data displa
         respect to other skills.
 """
 import os
+import time
+import threading
 
 from PyQt6 import QtCore
 from PyQt6 import QtGui
@@ -22,14 +24,19 @@ import pandas as pd
 
 from misc.Logger import Logger
 from misc.utils import Utils
+from misc.result_cache import ResultCache
+from misc.selection_bus import SelectionBus
 from widgets.play_list import PlayList
 from widgets.plays_graph import PlaysGraph
 from widgets.composition_viewer import CompositionViewer
 
 from data_recording.score_npy import ScoreNpy
 from data_recording.diff_npy import DiffNpy
+from data_recording.diff_recalc import DiffRecalc
+from data_recording.map_summary import MapSummary
 
 from file_managers import AppConfig, NpyManager
+from file_managers.map_name_cache import MapNameCache
 
 
 class DataOverviewWindow(QtWidgets.QWidget):
@@ -40,6 +47,8 @@ class DataOverviewWindow(QtWidgets.QWidget):
     show_map_event = QtCore.pyqtSignal(object, object)
     region_changed = QtCore.pyqtSignal(object, object)
 
+    __precision_report_ready = QtCore.pyqtSignal(object)
+
     __SCORE_TEMP_FILE = './data/temp_score.h5'
     __DIFF_TEMP_FILE  = './data/temp_diff.h5'
 
@@ -57,6 +66,24 @@ class DataOverviewWindow(QtWidgets.QWidget):
         self.__show_map_btn = QtWidgets.QPushButton('Show map')
         self.__status_label = QtWidgets.QLabel('')
         self.__progress_bar = QtWidgets.QProgressBar()
+        self.__cancel_recalc_btn = QtWidgets.QPushButton('Cancel')
+
+        self.__diff_recalc = DiffRecalc(self)
+        self.__recalc_resume = False
+        self.__recalc_features = None
+        self.__recalc_columns = []
+
+        # Plays were added while a recalc was running and still need their diff data filled in
+        self.__recalc_fill_pending = False
+
+        # Maps that were selected while their diff data was being calculated, displayed once it's done
+        self.__pending_map_select = None
+
+        self.__progress = QtWidgets.QWidget()
+        self.__progress_layout = QtWidgets.QHBoxLayout(self.__progress)
+        self.__progress_layout.setContentsMargins(0, 0, 0, 0)
+        self.__progress_layout.addWidget(self.__progress_bar)
+        self.__progress_layout.addWidget(self.__cancel_recalc_btn)
 
         self.__overview = QtWidgets.QWidget()
         self.__overview_layout = QtWidgets.QVBoxLayout(self.__overview)
@@ -65,7 +92,7 @@ class DataOverviewWindow(QtWidgets.QWidget):
         self.__overview_layout.addWidget(self.__play_graph)
         self.__overview_layout.addWidget(self.__show_map_btn)
         self.__overview_layout.addWidget(self.__status_label)
-        self.__overview_layout.addWidget(self.__progress_bar)
+        self.__overview_layout.addWidget(self.__progress)
 
         self.__splitter = QtWidgets.QSplitter()
         self.__splitter.addWidget(self.__overview)
@@ -89,6 +116,10 @@ class DataOverviewWindow(QtWidgets.QWidget):
         self.__recalc_difficulties_action.triggered.connect(self.__recalc_difficulties)
         self.__file_menu.addAction(self.__recalc_difficulties_action)
 
+        self.__precision_report_action = QtGui.QAction('Difficulty &precision report (float32)')
+        self.__precision_report_action.triggered.connect(self.__precision_report)
+        self.__file_menu.addAction(self.__precision_report_action)
+
         self.__menu_bar = QtWidgets.QMenuBar()
         self.__menu_bar.addMenu(self.__file_menu)
 
@@ -98,6 +129,7 @@ class DataOverviewWindow(QtWidgets.QWidget):
         self.__main_layout.setMenuBar(self.__menu_bar)
 
         self.__progress_bar.hide()
+        self.__cancel_recalc_btn.hide()
 
         self.__connect_signals()
 
@@ -111,43 +143,159 @@ class DataOverviewWindow(QtWidgets.QWidget):
 
         # Load temporary difficulty file
         try:
-            self.__loaded_diff_data = NpyManager(DataOverviewWindow.__DIFF_TEMP_FILE)
+            self.__loaded_diff_data = NpyManager(DataOverviewWindow.__DIFF_TEMP_FILE, DiffNpy.INDEX_NAMES)
             self.__loaded_diff_data.drop()
         except NpyManager.CorruptionError:
             os.remove(DataOverviewWindow.__DIFF_TEMP_FILE)
-            self.__loaded_diff_data = NpyManager(DataOverviewWindow.__DIFF_TEMP_FILE)
+            self.__loaded_diff_data = NpyManager(DataOverviewWindow.__DIFF_TEMP_FILE, DiffNpy.INDEX_NAMES)
 
         self.logger.debug('__init__ exit')
 
 
     def __connect_signals(self):
-        self.__map_list.map_selected.connect(self.__map_select_event)
+        # Selections are propagated once they settle. Only the latest one is acted on
+        self.__map_list.map_selected.connect(lambda map_md5_strs: SelectionBus.post(self.__map_list, self.__map_select_event, map_md5_strs))
+        self.__play_graph.region_changed.connect(lambda data: SelectionBus.post(self.__play_graph, self.__timestamp_region_changed_event, data))
 
-        self.__play_graph.region_changed.connect(self.__timestamp_region_changed_event)
         self.__composition_viewer.region_changed.connect(self.region_changed)
         self.__show_map_btn.clicked.connect(self.show_map)
 
+        self.__cancel_recalc_btn.clicked.connect(self.__diff_recalc.cancel)
+        self.__diff_recalc.batch_ready.connect(self.__recalc_batch_ready_event)
+        self.__diff_recalc.progress.connect(self.__recalc_progress_event)
+        self.__diff_recalc.finished.connect(self.__recalc_finished_event)
+        self.__precision_report_ready.connect(self.__precision_report_ready_event)
+
 
     def append_to_data(self, beatmap, replay):
         # Append to existing data
         map_data, replay_data, score_data = ScoreNpy.compile_data(beatmap, replay)
+        score_data = pd.concat([ score_data, DiffNpy.get_performance_data(score_data) ], axis=1)
+
+        # Summary of the data before the play is added to it
+        summary = self.__get_map_summary()
         self.__loaded_score_data.append(score_data)
 
-        diff_data = DiffNpy.get_data(score_data)
-        self.__loaded_diff_data.append(diff_data)
+        # Difficulty data is shared by all plays of the same map and mods that have the same
+        # score point rows, so it only needs to be computed if this play's rows are new. A running
+        # recalc may be about to commit the same rows, so it's left to a fill once the recalc is done.
+        diff_data = self.__get_map_diff_data(score_data)
+        if self.__diff_recalc.is_running():
+            self.__recalc_fill_pending = True
+        elif DiffNpy.get_missing_maps(score_data, diff_data):
+            diff_data = DiffNpy.get_data(score_data)
+            self.__loaded_diff_data.append(diff_data)
+            self.__clear_result_cache()
+
+        # Keep the per map summary in the data file up to date with the new play. Averages
+        # are taken over the difficulty data of all of the map's mods, same as a rebuild does
+        md5s = np.unique(score_data.index.get_level_values(0))
+        new_summary = MapSummary.get_data(score_data, self.__get_map_diff_data(score_data), MapNameCache.get_names(md5s))
+        summary = MapSummary.merge(summary, new_summary)
+        self.__loaded_score_data.write_summary(summary)
+        MapNameCache.resolve(md5s, self.__map_names_resolved_event)
 
         # Load new data into play listings, and get selected item(s) back
-        self.__map_list.load_play(diff_data)
+        self.__map_list.load_play(summary.loc[new_summary.index])
         selected_md5s = self.__map_list.get_selected()
 
         score_data = self.__get_score_data(selected_md5s).sort_index(level=0)
-        diff_data  = self.__get_diff_data(selected_md5s).sort_index(level=0)
+        diff_data  = self.__get_diff_data(score_data)
 
         # Update timeline and composition viewer
         self.__play_graph.plot_plays(np.unique(score_data.index.get_level_values(1)))
         self.__composition_viewer.set_composition_from_score_data(score_data, diff_data)
 
 
+    def __update_perf_data(self):
+        """
+        Adds performance data columns to loaded score data that doesn't have them yet
+        """
+        score_data = self.__loaded_score_data.data()
+        if score_data is None:
+            return
+
+        missing_columns = [ column for column in DiffNpy.PERF_COLUMNS if column not in score_data.columns ]
+        if not missing_columns:
+            return
+
+        self.logger.info(f'Adding performance data columns: {missing_columns}')
+
+        perf_data = DiffNpy.get_performance_data(score_data)
+        for column in missing_columns:
+            self.__loaded_score_data.append_column(column, perf_data[column])
+
+
+    def __get_map_summary(self):
+        """
+        Gets the per map summary stored in the data file. Data files that don't have
+        one (or have one that doesn't match the data) get it computed and stored.
+        """
+        score_data = self.__loaded_score_data.data()
+        summary    = self.__loaded_score_data.summary()
+
+        if not MapSummary.is_outdated(summary, score_data):
+            return summary
+
+        self.logger.info('Map summary is missing or outdated. Rebuilding...')
+
+        diff_data = self.__loaded_diff_data.data()
+        md5s = np.unique(score_data.index.get_level_values(0))
+
+        summary = MapSummary.get_data(score_data, diff_data, MapNameCache.get_names(md5s))
+        self.__loaded_score_data.write_summary(summary)
+
+        return summary
+
+
+    def __reload_map_list(self):
+        summary = self.__get_map_summary()
+        self.__map_list.reload_map_list(summary)
+
+        if summary is None:
+            return
+
+        # Names may have been looked up since the summary was written, or may be found now if they weren't before
+        md5s = list(summary.index)
+        self.__map_names_resolved_event(MapNameCache.get_names(md5s))
+        MapNameCache.resolve(md5s, self.__map_names_resolved_event)
+
+
+    def __map_names_resolved_event(self, names):
+        """
+        Puts names of maps looked up in the background into the per map summary and the play list
+        """
+        summary = self.__loaded_score_data.summary()
+        if summary is None:
+            return
+
+        # Data file may have been switched since the lookup was requested. Maps that weren't
+        # found (named by their md5) keep the name they have
+        names = { md5 : name for md5, name in names.items() if (name != md5) and (md5 in summary.index) and (summary.at[md5, 'NAME'] != name) }
+        if len(names) == 0:
+            return
+
+        md5s = list(names.keys())
+
+        summary = summary.copy()
+        summary.loc[md5s, 'NAME'] = [ names[md5] for md5 in md5s ]
+        self.__loaded_score_data.write_summary(summary)
+
+        self.__map_list.update_maps(summary.loc[md5s])
+
+
+    def __update_map_summary_avgs(self):
+        """
+        Recomputes the difficulty averages in the per map summary from the current diff data
+        """
+        summary = self.__get_map_summary()
+        if summary is None:
+            return
+
+        summary = MapSummary.set_avgs(summary, self.__loaded_diff_data.data())
+        self.__loaded_score_data.write_summary(summary)
+
+
     def is_exist(self, md5, timestamps=None, mods=None):
         return self.__loaded_score_data.is_entry_exist(md5, timestamps, mods)
 
@@ -172,43 +320,62 @@ class DataOverviewWindow(QtWidgets.QWidget):
 
 
     @Utils.benchmark(f'{__name__}')
-    def __get_diff_data(self, md5s, timestamps=[], mods=[]):
+    def __get_map_diff_data(self, score_data):
+        """
+        Gets the map level difficulty data of the maps present in `score_data`
+        """
+        if self.__loaded_diff_data.is_empty():
+            return DiffNpy.get_blank_data()
+
+        md5s = np.unique(score_data.index.get_level_values(0))
+
         # Note: Empty query returns all data
         query = [ ]
 
-        if md5s:
+        if len(md5s) > 0:
             md5s  = [ f'"{md5}"' for md5 in md5s ]
             query.append(f'MD5=({", ".join(md5s)})')
         else:
             query.append('MD5=""')
 
-        if timestamps:
-            query.append(f'TIMESTAMP=({", ".join([ f"{timestamp}" for timestamp in timestamps ])})')
-
         # TODO: MODS
 
         return self.__loaded_diff_data.query_data(query)
 
 
+    def __get_diff_data(self, score_data):
+        """
+        Gets difficulty data row aligned with `score_data`
+        """
+        return DiffNpy.expand(score_data, self.__get_map_diff_data(score_data))
+
+
     def __map_select_event(self, map_md5_strs):
         self.logger.debug('__map_select_event')
 
-        score_data = self.__get_score_data(map_md5_strs)
-        diff_data  = self.__get_diff_data(map_md5_strs)
+        # A timeline region still waiting to settle was for the previously selected maps
+        SelectionBus.cancel(self.__play_graph)
+        self.__pending_map_select = None
 
-        # If sizes doesn't match, the diff data is stale - force recalc
-        # and try again. This may happen if user manually copy-pastes
-        # score data as a new file without doing same to diff data.
-        if score_data.shape[0] != diff_data.shape[0]:
-            self.__recalc_difficulties()
-
-            score_data = self.__get_score_data(map_md5_strs)
-            diff_data  = self.__get_diff_data(map_md5_strs)
+        score_data = self.__get_score_data(map_md5_strs)
+        diff_data  = self.__get_map_diff_data(score_data)
+
+        # If there are maps without diff data, the diff data is stale - calculate
+        # the missing maps. This may happen if user manually copy-pastes score
+        # data as a new file without doing same to diff data. The selection is
+        # displayed once the recalc finishes.
+        if DiffNpy.get_missing_maps(score_data, diff_data):
+            if not self.__diff_recalc.is_running():
+                self.__fill_missing_difficulties()
+
+            self.__pending_map_select = map_md5_strs
+            self.__status_label.setText('Difficulty data is being calculated. Please wait...')
+            return
 
         timestamps = np.unique(score_data.index.get_level_values(1))
 
         score_data = score_data.sort_index(level=0)
-        diff_data = diff_data.sort_index(level=0)
+        diff_data  = DiffNpy.expand(score_data, diff_data)
 
         self.__play_graph.plot_plays(timestamps)
         self.__composition_viewer.set_composition_from_score_data(score_data, diff_data)
@@ -220,10 +387,8 @@ class DataOverviewWindow(QtWidgets.QWidget):
         selected_maps = self.__map_list.get_selected()
 
         score_data = self.__get_score_data(selected_maps, timestamps=data['timestamps'])
-        diff_data = self.__get_diff_data(selected_maps, timestamps=data['timestamps'])
-
         score_data = score_data.sort_index(level=0)
-        diff_data = diff_data.sort_index(level=0)
+        diff_data  = self.__get_diff_data(score_data)
 
         self.__composition_viewer.set_composition_from_score_data(score_data, diff_data)
         self.__composition_viewer.emit_master_selection()
@@ -271,8 +436,14 @@ class DataOverviewWindow(QtWidgets.QWidget):
 
         old_filename = self.__loaded_score_data.get_file_pathname()
 
+        self.__diff_recalc.cancel()
+        self.__recalc_resume = False
+        self.__recalc_fill_pending = False
+        self.__pending_map_select = None
+
         self.__loaded_score_data.close()
         self.__loaded_diff_data.close()
+        self.__clear_result_cache()
 
         try: self.__loaded_score_data = NpyManager(file_pathname)
         except NpyManager.CorruptionError:
@@ -283,8 +454,10 @@ class DataOverviewWindow(QtWidgets.QWidget):
             self.__loaded_score_data = NpyManager(old_filename)
             return
 
-        self.__loaded_diff_data = NpyManager(f'{file_pathname.split(".")[0]}_diff.h5')
-        self.__map_list.reload_map_list(self.__loaded_diff_data.data())
+        self.__update_perf_data()
+
+        self.__loaded_diff_data = NpyManager(f'{file_pathname.split(".")[0]}_diff.h5', DiffNpy.INDEX_NAMES)
+        self.__reload_map_list()
 
 
     def __open_data_dialog(self):
@@ -295,22 +468,48 @@ class DataOverviewWindow(QtWidgets.QWidget):
         if len(file_pathname) == 0:
             return
 
+        self.__diff_recalc.cancel()
+        self.__recalc_resume = False
+        self.__recalc_fill_pending = False
+        self.__pending_map_select = None
+
         self.__loaded_score_data.close()
         self.__loaded_diff_data.close()
+        self.__clear_result_cache()
 
         try: self.__loaded_score_data = NpyManager(file_pathname)
         except NpyManager.CorruptionError:
             self.logger.error(f'Error reading {file_pathname}')
             return
 
-        self.__loaded_diff_data = NpyManager(f'{file_pathname.split(".")[0]}_diff.h5')
+        self.__update_perf_data()
+
+        self.__loaded_diff_data = NpyManager(f'{file_pathname.split(".")[0]}_diff.h5', DiffNpy.INDEX_NAMES)
+
+        score_data = self.__loaded_score_data.data()
+        diff_data  = self.__loaded_diff_data.data()
+
+        if score_data is None:
+            self.__map_list.reload_map_list(None)
+            return
 
-        # TODO: Implement difficulty algo outdate detection
-        outdated = False
-        if outdated:
+        if DiffNpy.is_outdated(diff_data):
+            self.logger.info('Difficulty data is outdated. Recalculating...')
             self.__recalc_difficulties()
-        else:
-            self.__map_list.reload_map_list(self.__loaded_diff_data.data())
+            return
+
+        missing_features = DiffNpy.get_missing_features(diff_data)
+        if missing_features and not self.__loaded_diff_data.is_empty():
+            self.logger.info(f'Adding new difficulty features: {missing_features}')
+            self.__add_missing_features(missing_features)
+            return
+
+        if DiffNpy.get_missing_maps(score_data, diff_data):
+            self.logger.info('Calculating difficulty data for maps that have none...')
+            self.__fill_missing_difficulties()
+            return
+
+        self.__reload_map_list()
 
 
     def __open_replay_dialog(self):
@@ -338,33 +537,194 @@ class DataOverviewWindow(QtWidgets.QWidget):
 
 
     def __recalc_difficulties(self):
+        """
+        Recalculates diff data for all maps. If a previous recalculation was
+        cancelled, maps it already committed are kept and skipped.
+        """
         self.logger.debug('__recalc_difficulties')
+        self.__start_diff_recalc(skip_existing=self.__recalc_resume)
+
+
+    def __fill_missing_difficulties(self):
+        """
+        Calculates diff data only for the maps that have none
+        """
+        self.logger.debug('__fill_missing_difficulties')
+        self.__start_diff_recalc(skip_existing=True)
+
+
+    def __add_missing_features(self, features):
+        """
+        Calculates newly registered features for all maps. Each gets added to
+        the diff data as a new column without rewriting the existing ones.
+        """
+        self.logger.debug('__add_missing_features')
+        self.__start_diff_recalc(skip_existing=False, features=features)
+
+
+    def __start_diff_recalc(self, skip_existing, features=None):
+        if self.__diff_recalc.is_running():
+            return
 
+        score_data = self.__loaded_score_data.data()
+        if score_data is None:
+            return
+
+        skip_keys = None
+        diff_data = self.__loaded_diff_data.data()
+
+        if features is not None:
+            # New columns are computed for the maps that have diff data and
+            # added once the job completes. Other maps get all columns whenever
+            # their missing diff data is filled in.
+            skip_keys = DiffNpy.get_missing_maps(score_data, diff_data)
+        elif skip_existing and (diff_data is not None):
+            skip_keys = DiffNpy.get_maps(diff_data)
+        else:
+            self.__loaded_diff_data.drop()
+
+        self.__recalc_features = features
+        self.__recalc_columns  = []
+
+        if features is None:
+            # Covers all of the plays loaded so far
+            self.__recalc_fill_pending = False
+
+        self.__recalc_difficulties_action.setEnabled(False)
         self.__status_label.hide()
+        self.__progress_bar.setValue(0)
+        self.__progress_bar.setFormat('Recalculating difficulties...')
         self.__progress_bar.show()
+        self.__cancel_recalc_btn.show()
 
-        # Go through the list of maps
-        self.__loaded_diff_data.drop()
+        self.__diff_recalc.start(score_data, skip_keys, features)
 
-        map_list = self.__loaded_score_data.data().groupby([ 'MD5', 'TIMESTAMP', 'MODS' ])
-        num_maps = len(map_list)
 
-        data = DiffNpy.get_blank_data()
+    def cancel_recalc(self):
+        self.__diff_recalc.cancel()
 
-        for i, (idx, df) in enumerate(map_list):
-            data = pd.concat([ data, DiffNpy.get_data(df) ])
 
-            if (i % 500 == 0) or (i == (len(map_list) - 1)):
+    def __recalc_batch_ready_event(self, data):
+        if self.__recalc_features is None:
+            # Maps already in the file must not be added again, or the diff data ends up with duplicate index labels
+            diff_data = self.__loaded_diff_data.data()
+            if diff_data is not None:
+                data = data[~data.index.droplevel(3).isin(list(DiffNpy.get_maps(diff_data)))]
+
+            if data.shape[0] > 0:
                 self.__loaded_diff_data.append(data, index=False)
-                data = DiffNpy.get_blank_data()
+        else:
+            self.__recalc_columns.append(data)
 
-            self.__progress_bar.setValue(int(100 * i / num_maps))
-            QtWidgets.QApplication.processEvents()
 
-        self.__loaded_diff_data.reindex()
+    def __recalc_progress_event(self, num_rows_done, num_rows_total, rate, eta):
+        self.__progress_bar.setValue(int(100 * num_rows_done / max(1, num_rows_total)))
+
+        eta_str = time.strftime('%H:%M:%S', time.gmtime(eta)) if eta >= 0 else '--:--:--'
+        self.__progress_bar.setFormat(f'%p%  |  {num_rows_done}/{num_rows_total} rows  |  {rate:.0f} rows/s  |  ETA {eta_str}')
+
+
+    def __recalc_finished_event(self, completed):
+        self.logger.debug(f'__recalc_finished_event - completed: {completed}')
+
+        features, columns = self.__recalc_features, self.__recalc_columns
+        self.__recalc_features = None
+        self.__recalc_columns  = []
 
+        # An incomplete job leaves its committed batches in the diff file to resume from
+        self.__recalc_resume = (not completed) and (features is None)
+        self.__clear_result_cache()
+
+        self.__progress_bar.setFormat('%p%')
         self.__progress_bar.hide()
+        self.__cancel_recalc_btn.hide()
         self.__status_label.show()
+        self.__recalc_difficulties_action.setEnabled(True)
+
+        if not completed:
+            self.__status_label.setText('Difficulty recalculation cancelled. Recalculating again will resume it.')
+            return
+
+        self.__status_label.setText('')
+
+        if (features is not None) and (len(columns) > 0):
+            data = pd.concat(columns)
+            data = data[~data.index.duplicated()]
+
+            for name in features:
+                self.__loaded_diff_data.append_column(name, data[name])
+
+        if not self.__loaded_diff_data.is_empty():
+            self.__loaded_diff_data.reindex()
 
-        self.__map_list.reload_map_list(self.__loaded_diff_data.data())
+        self.__update_map_summary_avgs()
+        self.__reload_map_list()
         self.__composition_viewer.update_diff_data()
+
+        if self.__recalc_fill_pending:
+            self.__fill_missing_difficulties()
+
+        # Reloading the map list clears the selection, so the maps that were waiting on the recalc are selected again
+        if self.__pending_map_select is not None:
+            md5s = self.__pending_map_select
+            self.__pending_map_select = None
+
+            self.__map_list.set_selected(md5s)
+            md5s = self.__map_list.get_selected()
+            if len(md5s) > 0:
+                self.__map_select_event(md5s)
+
+
+    def __clear_result_cache(self):
+        """
+        Cached graph results are keyed by which data is selected, not by its values,
+        so they need to be dropped whenever the loaded data changes
+        """
+        self.logger.debug(f'Clearing graph result cache - {ResultCache.get_stats()}')
+        ResultCache.clear()
+
+
+    def __precision_report(self):
+        """
+        Reports how much each difficulty feature deviates from float64 when computed
+        in float32 across all loaded maps. Useful to decide whether the 'diff_precision'
+        config value can be set to 'float32'.
+        """
+        self.logger.debug('__precision_report')
+
+        score_data = self.__loaded_score_data.data()
+        if score_data is None:
+            self.__status_label.setText('No data loaded')
+            return
+
+        self.__precision_report_action.setEnabled(False)
+        self.__status_label.setText('Computing difficulty precision report...')
+
+        thread = threading.Thread(target=self.__precision_report_thread, args=(score_data, ))
+        thread.start()
+
+
+    def __precision_report_thread(self, score_data):
+        try: report = DiffNpy.get_precision_report(score_data, np.float32)
+        except Exception as e:
+            self.logger.error(Utils.get_traceback(e, 'Error computing precision report'))
+            report = None
+
+        self.__precision_report_ready.emit(report)
+
+
+    def __precision_report_ready_event(self, report):
+        self.__precision_report_action.setEnabled(True)
+        self.__status_label.setText('')
+
+        if report is None:
+            self.__status_label.setText('Failed to compute precision report')
+            return
+
+        self.logger.info(f'Difficulty precision report (float32 vs float64):\n{report.to_string()}')
+
+        report_box = QtWidgets.QMessageBox(self)
+        report_box.setWindowTitle('Difficulty precision report')
+        report_box.setText('Deviation of difficulty features computed in float32 from float64')
+        report_box.setDetailedText(report.to_string())
+        report_box.show()
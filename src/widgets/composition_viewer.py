@@ -12,6 +12,10 @@ selecting which of the two attributes should be displayed in a dropdown on the s
 The is a selection menu on the side that allows the user to select which player's data to view and which timestamped play.
 
 Design note: Maybe have a scatter plot instead. Really depends on how much data there is and how laggy it will get.
+
+When more points are displayed than LOD_MAX_POINTS, the scatter plot is replaced by a density image (a 2D histogram of
+the points within view) that is rebuilt as the view is panned and zoomed. Individual points are displayed again once
+the view is zoomed in enough to contain few enough of them.
 """
 from PyQt6 import QtCore
 from PyQt6 import QtWidgets
@@ -25,9 +29,11 @@ from osu_analysis import StdScoreData
 
 from misc.Logger import Logger
 from misc.utils import MathUtils
+from misc.selection_bus import SelectionBus
 
 from data_recording.score_npy import ScoreNpy
 from data_recording.diff_npy import DiffNpy
+from data_recording.diff_features import DiffFeatures
 
 
 __ROI_SELECTIONS_EN__ = False
@@ -39,12 +45,20 @@ class CompositionViewer(QtWidgets.QWidget):
     logger = Logger.get_logger(__name__)
     region_changed = QtCore.pyqtSignal(object, object)
 
+    # Max number of points displayed individually. Above this a density image is displayed instead
+    LOD_MAX_POINTS = 50000
+
+    # Density image resolution is a bin per this many screen pixels, within [ LOD_MIN_BINS, LOD_MAX_BINS ] bins per axis
+    LOD_BIN_PX   = 2
+    LOD_MIN_BINS = 32
+    LOD_MAX_BINS = 512
+
+    # Time to wait for panning and zooming to settle before rebuilding the density image
+    LOD_UPDATE_DELAY = 50  # ms
+
     def __init__(self, parent=None):
         QtWidgets.QWidget.__init__(self, parent)
 
-        # Displayed xy scatter plot data
-        self.xy_data = np.zeros((0, 2))
-
         # Stored data is already filtered by map, mod, and time of play
         # It is used to select the data to display in the scatter plot
         self.score_data = ScoreNpy.get_blank_data()
@@ -67,10 +81,28 @@ class CompositionViewer(QtWidgets.QWidget):
             hoverBrush  = pyqtgraph.mkBrush(255, 0, 0, 150),
         )
 
+        # Displayed in place of the scatter plot when there are too many points to draw. Spans the view
+        # it was built for, so it's left out of auto ranging
+        self.density_plot = pyqtgraph.ImageItem()
+        self.density_plot.setLookupTable(np.column_stack([
+            np.full(256, 255), np.zeros(256), np.zeros(256), np.linspace(0, 255, 256)
+        ]).astype(np.uint8))
+        self.density_plot.hide()
+
+        # Displayed points sorted by x, so the points within view can be found with a binary search
+        self.__points = np.zeros((0, 2), dtype=DiffNpy.get_dtype())
+
+        self.__lod_timer = QtCore.QTimer()
+        self.__lod_timer.setSingleShot(True)
+        self.__lod_timer.setInterval(CompositionViewer.LOD_UPDATE_DELAY)
+        self.__lod_timer.timeout.connect(self.__update_lod)
+
         self.plot_widget.hideAxis('left')
         self.plot_widget.hideAxis('bottom')
         self.plot_widget.addItem(self.grid_plot_item)
+        self.plot_widget.addItem(self.density_plot, ignoreBounds=True)
         self.plot_widget.addItem(self.data_plot)
+        self.plot_widget.getViewBox().sigRangeChanged.connect(lambda *_: self.__lod_timer.start())
 
         self.data_type_selection = QtWidgets.QListWidget()
         self.data_type_selection.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
@@ -87,46 +119,41 @@ class CompositionViewer(QtWidgets.QWidget):
         self.y_axis_selection = QtWidgets.QButtonGroup()
         self.y_axis_selection.setExclusive(True)
 
-        # MUST BE CONTIGUOUS
-        self.__ID_CS           = 0   # CS of map
-        self.__ID_AR           = 1   # AR of map
-        self.__ID_T_PRESS_DIFF = 2   # Time of press difference
-        self.__ID_T_PRESS_RATE = 3   # Time of press difference across 3 notes
-        self.__ID_T_BPM        = 4   # BPM of map
-        self.__ID_T_PRESS_INC  = 5   # Time since last increase between scorepoint press timing
-        self.__ID_T_PRESS_DEC  = 6   # Time since last decrease between scorepoint press timing
-        self.__ID_T_PRESS_RHM  = 7   # Scorepoint press's relative spacing compared to other scorepoint presses
-        self.__ID_T_HOLD_DUR   = 8   # Time duration of hold
-        self.__ID_T_OFFSET_SCR = 9   # (score) Tap offset
-        self.__ID_XY_DIST      = 10  # Distance between every scorepoint
-        self.__ID_XY_ANGLE     = 11  # Angle between every scorepoint
-        self.__ID_XY_LIN_VEL   = 12  # Linear velocity between every scorepoint
-        self.__ID_XY_ANG_VEL   = 13  # Angular velocity between every scorepoint
-        self.__ID_XY_DIST_SCR  = 15  # (score) Distance from center of note
-        self.__ID_VIS_VISIBLE  = 14  # Number of notes visible
-        self.__NUM_IDS         = 15
+        # Axes that can be displayed. The id of an axis is its index in this list.
+        # Difficulty axes are taken from the DIFF_* feature registry, the rest are
+        # derived from score and difficulty data by the viewer.
+        self.__axes = [
+            { 'text' : 'CS', 'label' : 'Beatmap CS', 'data' : lambda: self.score_data['CS'].values },
+            { 'text' : 'AR', 'label' : 'Beatmap AR', 'data' : lambda: self.score_data['AR'].values },
+        ]
+
+        for name in DiffFeatures.get_names():
+            info = DiffFeatures.get_info(name)
+            self.__axes.append({
+                'text'  : name.replace('DIFF_', '', 1),
+                'label' : info['label'],
+                'data'  : lambda name=name, scale=info['scale']: scale*self.diff_data[name].values,
+            })
+
+        self.__axes += [
+            # Convert 1/ms -> BPM then put it in terms of 1/4 snap
+            { 'text' : 'T_PRESS_BPM',  'label' : 'BPM @ 1/4 meter (60/s)',            'data' : lambda: 15000/self.diff_data['DIFF_T_PRESS_DIFF'].values },
+            { 'text' : 'T_OFFSET_SCR', 'label' : 'Tap offset (ms)',                   'data' : self.__get_t_offset_scr },
+            { 'text' : 'XY_DIST_SCR',  'label' : 'Hit distance from center (osu!px)', 'data' : self.__get_xy_dist_scr },
+        ]
 
         self.__id_x = None
         self.__id_y = None
 
-        selections = {
-            'CS':           self.__ID_CS,
-            'AR':           self.__ID_AR,
-            'T_PRESS_DIFF': self.__ID_T_PRESS_DIFF,
-            'T_PRESS_RATE': self.__ID_T_PRESS_RATE,
-            'T_PRESS_BPM':  self.__ID_T_BPM,
-            'T_PRESS_INC':  self.__ID_T_PRESS_INC,
-            'T_PRESS_DEC':  self.__ID_T_PRESS_DEC,
-            'T_PRESS_RHM':  self.__ID_T_PRESS_RHM,
-            'T_HOLD_DUR':   self.__ID_T_HOLD_DUR,
-            'T_OFFSET_SCR': self.__ID_T_OFFSET_SCR,
-            'XY_DIST':      self.__ID_XY_DIST,
-            'XY_ANGLE':     self.__ID_XY_ANGLE,
-            'XY_LIN_VEL':   self.__ID_XY_LIN_VEL,
-            'XY_ANG_VEL':   self.__ID_XY_ANG_VEL,
-            'XY_DIST_SCR':  self.__ID_XY_DIST_SCR,
-            'VIS_VISIBLE':  self.__ID_VIS_VISIBLE,
-        }
+        # Values of each axis for the selection, a column per axis. Held in the same precision as difficulty data.
+        # Columns are computed the first time their axis is displayed and kept until the selection changes.
+        # Column-major, so each axis is a contiguous view of the matrix
+        self.__features = None
+        self.__features_finite = None
+        self.__features_ready = None
+        self.__reset_features()
+
+        selections = { axis['text'] : id_ for id_, axis in enumerate(self.__axes) }
         self.num_selections = len(selections)
 
         if __ROI_SELECTIONS_EN__:
@@ -144,6 +171,8 @@ class CompositionViewer(QtWidgets.QWidget):
                             closed=True
                         ),
                         'select' : np.empty(0, dtype=np.bool8),
+                        'index'  : None,
+                        'ids'    : (id_x, id_y),
                     }
 
                     self.roi_selections[roi_id]['roi'].sigRegionChanged.connect(lambda _: self.__roi_selection_event(emit_data=False))
@@ -188,9 +217,9 @@ class CompositionViewer(QtWidgets.QWidget):
         self.x_axis_selection.idPressed.connect(self.__x_axis_selection_event)
         self.y_axis_selection.idPressed.connect(self.__y_axis_selection_event)
 
-        self.x_axis_selection.button(self.__ID_CS).setChecked(True)
-        self.y_axis_selection.button(self.__ID_AR).setChecked(True)
-        self.__set_composition_data(id_x=self.__ID_CS, id_y=self.__ID_AR)
+        self.x_axis_selection.button(0).setChecked(True)  # CS
+        self.y_axis_selection.button(1).setChecked(True)  # AR
+        self.__set_composition_data(id_x=0, id_y=1)
 
 
     def set_composition_from_score_data(self, score_data, diff_data):
@@ -219,27 +248,17 @@ class CompositionViewer(QtWidgets.QWidget):
         '''
         self.logger.debug('update_diff_data')
 
-        if self.diff_data.shape[0] == 0:
-            self.xy_data = np.zeros((0, 2))
-        else:
-            self.xy_data = np.zeros((self.diff_data.shape[0], 2))
-
+        self.__reset_features()
         self.__set_composition_data(id_x=self.__id_x, id_y=self.__id_y, force_update=True)
 
         # Update all selection masks
         if __ROI_SELECTIONS_EN__:
-            xy_data = np.zeros(self.xy_data.shape)
-
-            for id_y in range(self.num_selections):
-                for id_x in range(self.num_selections):
-                    if id_y == id_x:
-                        continue
-
-                    xy_data[:, 0] = self.__id_to_data(id_x)
-                    xy_data[:, 1] = self.__id_to_data(id_y)
+            # Data changed, so spatial indices need to be rebuilt
+            for roi_selection in self.roi_selections.values():
+                roi_selection['index'] = None
 
-                    roi_id = self.__get_roi_id(id_x, id_y)
-                    self.__update_roi_selection(roi_id, xy_data)
+            for roi_id in self.roi_selections.keys():
+                self.__update_roi_selection(roi_id)
 
 
     if __ROI_SELECTIONS_EN__:
@@ -346,10 +365,7 @@ class CompositionViewer(QtWidgets.QWidget):
                 #if not is_already_displayed:
                 #    self.plot_widget.removeItem(roi_plot)
 
-                data[:, 0] = roi_data['data_x']
-                data[:, 1] = roi_data['data_y']
-
-                self.__update_roi_selection(roi_id, data)
+                self.__update_roi_selection(roi_id)
                 roi_selection['roi'].blockSignals(False)
 
             self.logger.debug(f'reset_roi_selections - 3')
@@ -389,23 +405,40 @@ class CompositionViewer(QtWidgets.QWidget):
             return id_y*self.num_selections + id_x
 
 
-        def __update_roi_selection(self, roi_id, xy_data):
+        def __update_roi_selection(self, roi_id):
             '''
-            Updates the cached selection mask
+            Updates the cached selection mask. The plane's spatial index is built
+            the first time the plane is updated after the data changes.
             '''
-            if xy_data.shape[0] == 0:
+            if self.__features.shape[0] == 0:
                 self.roi_selections[roi_id]['select'] = np.asarray([])
                 self.roi_selections[roi_id]['roi']    = np.asarray([])
                 return
 
-            roi_plot = self.roi_selections[roi_id]['roi']
-            inv_filter = ~(np.isnan(xy_data).any(axis=1))
+            roi_selection = self.roi_selections[roi_id]
+            if roi_selection['index'] is None:
+                roi_selection['index'] = self.__get_roi_index(*roi_selection['ids'])
+
+            idxs, points = roi_selection['index']
+
+            # Invalid values are always selected
+            filtered_xy_data = np.ones((self.__features.shape[0]), dtype=np.bool8)
+            filtered_xy_data[idxs] = self.__select_data_in_roi(roi_selection['roi'], points)
 
-            filtered_xy_data = np.zeros((xy_data.shape[0]), dtype=np.bool8)
-            filtered_xy_data[~inv_filter] = True
-            filtered_xy_data[ inv_filter] = self.__select_data_in_roi(roi_plot, xy_data[inv_filter])
+            roi_selection['select'] = filtered_xy_data
 
-            self.roi_selections[roi_id]['select'] = filtered_xy_data
+
+        def __get_roi_index(self, id_x, id_y):
+            '''
+            Spatial index of a plane's data: the valid points sorted by x, along with
+            their row indices. Points within an x range are then found with a binary search.
+            '''
+            data_x, data_y, is_valid = self.__get_xy_data(id_x, id_y)
+
+            idxs = np.flatnonzero(is_valid)
+            idxs = idxs[np.argsort(data_x[idxs], kind='stable')]
+
+            return idxs, np.column_stack((data_x[idxs], data_y[idxs]))
 
 
         def __roi_selection_event(self, emit_data):
@@ -417,13 +450,15 @@ class CompositionViewer(QtWidgets.QWidget):
             '''
             self.logger.debug('__roi_selection_event')
 
-            # Update selection mask for the current plane
+            # Update selection mask for the current plane. Masks of other planes are cached
             roi_id_xy = self.__get_roi_id(self.__id_x, self.__id_y)
             roi_plot_xy = self.roi_selections[roi_id_xy]['roi']
-            self.__update_roi_selection(roi_id_xy, self.xy_data)
+            self.__update_roi_selection(roi_id_xy)
 
+            # The mirrored plane selects the same points
             roi_id_yx = self.__get_roi_id(self.__id_y, self.__id_x)
             roi_plot_yx = self.roi_selections[roi_id_yx]['roi']
+            self.roi_selections[roi_id_yx]['select'] = self.roi_selections[roi_id_xy]['select']
 
             # Flip points for the counterpart (x,y) -> (y,x) ROI along xy-axis diagonal
             state = roi_plot_xy.getState()
@@ -445,7 +480,10 @@ class CompositionViewer(QtWidgets.QWidget):
             roi_plot_yx.blockSignals(False)
             self.plot_widget.removeItem(roi_plot_yx)
 
-            self.emit_master_selection()
+            # Composing all planes and updating the listeners is only done once dragging is finished
+            # and the selection settles
+            if emit_data:
+                SelectionBus.post(self, self.emit_master_selection)
 
 
         def __select_data_in_roi(self, roi_plot, data):
@@ -454,28 +492,45 @@ class CompositionViewer(QtWidgets.QWidget):
             located within the given ROI.
 
             Invalid values (NaN and Inf) must not be passed to this function.
+            ``data`` must be sorted by x (see `__get_roi_index`). Only the points within
+            the ROI's bounding box are tested against its edges.
 
             # Thanks https://stackoverflow.com/a/2922778
             '''
-            handles = [ pyqtgraph.Point(h.pos()) + roi_plot.pos() for h in roi_plot.getHandles() ]
+            handles = np.asarray([ [ h.pos().x(), h.pos().y() ] for h in roi_plot.getHandles() ]) + [ roi_plot.pos().x(), roi_plot.pos().y() ]
 
             is_in_roi = np.zeros((data.shape[0]), dtype=np.bool8)
-            iters = list(range(len(handles)))
+            if handles.shape[0] < 3:
+                return is_in_roi
+
+            # Bounding box prefilter
+            idx_start = np.searchsorted(data[:, 0], np.min(handles[:, 0]), side='left')
+            idx_end   = np.searchsorted(data[:, 0], np.max(handles[:, 0]), side='right')
 
-            for i in iters:
-                _i = iters[i]
-                _j = iters[i - 1]
+            in_box = idx_start + np.flatnonzero(
+                (np.min(handles[:, 1]) <= data[idx_start:idx_end, 1]) & (data[idx_start:idx_end, 1] <= np.max(handles[:, 1]))
+            )
 
-                test1 = ((handles[_i].y() > data[:, 1]) != (handles[_j].y() > data[:, 1]))
+            x = data[in_box, 0]
+            y = data[in_box, 1]
 
-                if handles[_j].y() == handles[_i].y():
-                    test2 = False
-                else:
-                    test2 = (data[:, 0] < (handles[_j].x() - handles[_i].x()) * (data[:, 1] - handles[_i].y()) / (handles[_j].y() - handles[_i].y()) + handles[_i].x())
+            # Even-odd rule: count crossings of a ray going right from each point, edge by edge
+            x_i, y_i = handles[:, 0], handles[:, 1]
+            x_j, y_j = np.roll(x_i, 1), np.roll(y_i, 1)
 
-                select = test1 & test2
-                is_in_roi[select] = ~is_in_roi[select]
+            is_inside = np.zeros(in_box.shape[0], dtype=np.bool8)
 
+            for i in range(handles.shape[0]):
+                if y_j[i] == y_i[i]:
+                    continue
+
+                is_crossing = \
+                    ((y_i[i] > y) != (y_j[i] > y)) & \
+                    (x < (x_j[i] - x_i[i]) * (y - y_i[i]) / (y_j[i] - y_i[i]) + x_i[i])
+
+                is_inside ^= is_crossing
+
+            is_in_roi[in_box] = is_inside
             return is_in_roi
 
 
@@ -542,11 +597,9 @@ class CompositionViewer(QtWidgets.QWidget):
             self.__id_y = id_y
 
         if update_x:
-            self.xy_data[:, 0] = self.__id_to_data(self.__id_x)
             self.plot_widget.setLabel('bottom', self.__get_selection_string(self.__id_x))
 
         if update_y:
-            self.xy_data[:, 1] = self.__id_to_data(self.__id_y)
             self.plot_widget.setLabel('left', self.__get_selection_string(self.__id_y))
 
         ''''
@@ -586,105 +639,139 @@ class CompositionViewer(QtWidgets.QWidget):
 
             # Make sure no invalid values are passed to display or it will won't
             # display points due to inability to compute bounds
-            inv_filter = ~(np.isnan(self.xy_data).any(axis=1))
+            data_x, data_y, inv_filter = self.__get_xy_data(self.__id_x, self.__id_y)
 
-            #self.data_plot.setData(self.xy_data[inv_filter, 0], self.xy_data[inv_filter, 1], data=i_data[inv_filter])
-            self.data_plot.setData(self.xy_data[inv_filter, 0], self.xy_data[inv_filter, 1])
+            #self.data_plot.setData(data_x[inv_filter], data_y[inv_filter], data=i_data[inv_filter])
+            self.__set_points(np.column_stack((data_x[inv_filter], data_y[inv_filter])))
 
 
-    def __id_to_data(self, id_):
-        if id_ == self.__ID_CS:
-            return self.score_data['CS'].values
+    def __set_points(self, points):
+        '''
+        Sets the points to display. Few enough points are displayed all at once as before. Otherwise
+        the view is fit to the points and what is displayed is determined by the view (see `__update_lod`).
+        '''
+        self.__points = points[np.argsort(points[:, 0], kind='stable')]
+        view_box = self.plot_widget.getViewBox()
+
+        if self.__points.shape[0] <= CompositionViewer.LOD_MAX_POINTS:
+            self.__lod_timer.stop()
+            self.density_plot.hide()
+            self.data_plot.setData(self.__points[:, 0], self.__points[:, 1])
+            self.data_plot.show()
+            view_box.enableAutoRange()
+            return
 
-        if id_ == self.__ID_AR:
-            return self.score_data['AR'].values
+        # The scatter plot only has the points within view, so auto ranging to it would
+        # zoom in on them. Fit the view to all of the points instead
+        x0, x1 = float(self.__points[0, 0]), float(self.__points[-1, 0])
+        y0, y1 = float(np.min(self.__points[:, 1])), float(np.max(self.__points[:, 1]))
 
-        if id_ == self.__ID_T_PRESS_DIFF:
-            return self.diff_data['DIFF_T_PRESS_DIFF'].values
+        view_box.disableAutoRange()
+        view_box.setRange(xRange=[ x0, x1 ], yRange=[ y0, y1 ])
 
-        if id_ == self.__ID_T_PRESS_RATE:
-            return self.diff_data['DIFF_T_PRESS_RATE'].values
+        self.__update_lod()
 
-        if id_ == self.__ID_T_BPM:
-            # Convert 1/ms -> BPM then put it in terms of 1/4 snap
-            return 15000/self.diff_data['DIFF_T_PRESS_DIFF'].values
 
-        if id_ == self.__ID_T_PRESS_INC:
-            return self.diff_data['DIFF_T_PRESS_INC'].values
+    def __update_lod(self):
+        '''
+        Displays the points within view individually if there are few enough of them,
+        otherwise displays their density.
+        '''
+        if self.__points.shape[0] <= CompositionViewer.LOD_MAX_POINTS:
+            return
+
+        view_box = self.plot_widget.getViewBox()
+        (x0, x1), (y0, y1) = view_box.viewRange()
+
+        idx_start = np.searchsorted(self.__points[:, 0], x0, side='left')
+        idx_end   = np.searchsorted(self.__points[:, 0], x1, side='right')
+
+        points = self.__points[idx_start:idx_end]
+        points = points[(y0 <= points[:, 1]) & (points[:, 1] <= y1)]
 
-        if id_ == self.__ID_T_PRESS_DEC:
-            return self.diff_data['DIFF_T_PRESS_DEC'].values
+        if points.shape[0] <= CompositionViewer.LOD_MAX_POINTS:
+            self.density_plot.hide()
+            self.data_plot.setData(points[:, 0], points[:, 1])
+            self.data_plot.show()
+            return
+
+        self.logger.debug(f'__update_lod - Displaying density of {points.shape[0]} points')
+
+        num_bins_x = int(np.clip(view_box.width()/CompositionViewer.LOD_BIN_PX,  CompositionViewer.LOD_MIN_BINS, CompositionViewer.LOD_MAX_BINS))
+        num_bins_y = int(np.clip(view_box.height()/CompositionViewer.LOD_BIN_PX, CompositionViewer.LOD_MIN_BINS, CompositionViewer.LOD_MAX_BINS))
+
+        counts, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=[ num_bins_x, num_bins_y ], range=[ [ x0, x1 ], [ y0, y1 ] ])
 
-        if id_ == self.__ID_T_HOLD_DUR:
-            return self.diff_data['DIFF_T_HOLD_DUR'].values
+        # Log scale so that sparse regions are still visible next to dense ones
+        density = np.log1p(counts)
 
-        if id_ == self.__ID_T_PRESS_RHM:
-            return self.diff_data['DIFF_T_PRESS_RHM'].values
+        self.data_plot.hide()
+        self.data_plot.clear()
+        self.density_plot.setImage(density, levels=(0, max(density.max(), 1)))
+        self.density_plot.setRect(QtCore.QRectF(x0, y0, x1 - x0, y1 - y0))
+        self.density_plot.show()
+
+
+    def __reset_features(self):
+        '''
+        Called when the selection changes. Columns are computed again once their axis is displayed.
+        '''
+        num_rows = self.diff_data.shape[0]
 
-        if id_ == self.__ID_T_OFFSET_SCR:
-            # TODO: Commented out because filtering produces different size than data
-            # being compared to on the other axis
-            #press_select = (self.score_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-            #hit_select   = (self.score_data['TYPE_HIT'] == StdScoreData.TYPE_HITP)
+        self.__features        = np.empty((num_rows, len(self.__axes)), dtype=DiffNpy.get_dtype(), order='F')
+        self.__features_finite = np.empty((num_rows, len(self.__axes)), dtype=np.bool8, order='F')
+        self.__features_ready  = np.zeros(len(self.__axes), dtype=np.bool8)
 
-            t_map = self.score_data['T_MAP'].values#[press_select & hit_select]
-            t_hit = self.score_data['T_HIT'].values#[press_select & hit_select]
-            return t_hit - t_map
 
-        #if id_ == self.__ID_DT_RHYTM_D:
-        #    return [ 0 ] #self.diff_data['DIFF_DT_RHYM_D'].values
+    def __id_to_data(self, id_):
+        '''
+        Values of the axis for the selection, as a view of the feature matrix
+        '''
+        if not (0 <= id_ < len(self.__axes)):
+            raise Exception(f'Unknown id: {id_}')
 
-        if id_ == self.__ID_XY_DIST:
-            return self.diff_data['DIFF_XY_DIST'].values
+        if not self.__features_ready[id_]:
+            self.__features[:, id_] = self.__axes[id_]['data']()
+            self.__features_finite[:, id_] = np.isfinite(self.__features[:, id_])
+            self.__features_ready[id_] = True
 
-        if id_ == self.__ID_XY_ANGLE:
-            return self.diff_data['DIFF_XY_ANGLE'].values
+        return self.__features[:, id_]
 
-        if id_ == self.__ID_XY_LIN_VEL:
-            return 1000*self.diff_data['DIFF_XY_LIN_VEL'].values
 
-        if id_ == self.__ID_XY_ANG_VEL:
-            return self.diff_data['DIFF_XY_ANG_VEL'].values
+    def __get_xy_data(self, id_x, id_y):
+        '''
+        Returns (x, y, is_valid) for the plane of the given axes, where `is_valid` selects the rows
+        that have finite values on both axes
+        '''
+        data_x = self.__id_to_data(id_x)
+        data_y = self.__id_to_data(id_y)
 
-        if id_ == self.__ID_XY_DIST_SCR:
-            # TODO: Commented out because filtering produces different size than data
-            # being compared to on the other axis
-            #press_select = (self.score_data['TYPE_MAP'] == StdScoreData.ACTION_PRESS)
-            #hit_select   = (self.score_data['TYPE_HIT'] == StdScoreData.TYPE_HITP)
+        return data_x, data_y, (self.__features_finite[:, id_x] & self.__features_finite[:, id_y])
 
-            x_map = self.score_data['X_MAP'].values#[press_select & hit_select]
-            y_map = self.score_data['Y_MAP'].values#[press_select & hit_select]
-            x_hit = self.score_data['X_HIT'].values#[press_select & hit_select]
-            y_hit = self.score_data['Y_HIT'].values#[press_select & hit_select]
-            return ((x_hit - x_map)**2 + (y_hit - y_map)**2)**0.5
 
+    def __get_t_offset_scr(self):
+        # TODO: Not filtered by press & hit type because filtering produces
+        # different size than data being compared to on the other axis
+        t_map = self.score_data['T_MAP'].values
+        t_hit = self.score_data['T_HIT'].values
+        return t_hit - t_map
 
-        if id_ == self.__ID_VIS_VISIBLE:
-            return self.diff_data['DIFF_VIS_VISIBLE'].values
 
-        raise Exception(f'Unknown id: {id_}')
+    def __get_xy_dist_scr(self):
+        # TODO: Not filtered by press & hit type because filtering produces
+        # different size than data being compared to on the other axis
+        x_map = self.score_data['X_MAP'].values
+        y_map = self.score_data['Y_MAP'].values
+        x_hit = self.score_data['X_HIT'].values
+        y_hit = self.score_data['Y_HIT'].values
+        return ((x_hit - x_map)**2 + (y_hit - y_map)**2)**0.5
 
 
     def __get_selection_string(self, id_):
-        if id_ == self.__ID_CS:            return 'Beatmap CS'
-        if id_ == self.__ID_AR:            return 'Beatmap AR'
-        if id_ == self.__ID_T_PRESS_DIFF:  return 'Time interval between presses (ms)'
-        if id_ == self.__ID_T_PRESS_RATE:  return 'Time interval across 3 presses (ms)'
-        if id_ == self.__ID_T_BPM:         return 'BPM @ 1/4 meter (60/s)'
-        if id_ == self.__ID_T_PRESS_INC:   return 'BPM Increase Time (ms)'
-        if id_ == self.__ID_T_PRESS_DEC:   return 'BPM Decrease Time (ms)'
-        if id_ == self.__ID_T_PRESS_RHM:   return '% the note is from previous note to next note (% of tn[2] - tn[0])'
-        #if id_ == self.__ID_DT_RHYTM_D:   return 'Normalized rate (%)'
-        if id_ == self.__ID_T_HOLD_DUR:    return 'Hold duration (ms)'
-        if id_ == self.__ID_T_OFFSET_SCR:  return 'Tap offset (ms)'
-        if id_ == self.__ID_XY_DIST:       return 'Distance (osu!px)'
-        if id_ == self.__ID_XY_ANGLE:      return 'Angle (deg)'
-        if id_ == self.__ID_XY_LIN_VEL:    return 'Linear Velocity (osu!px/s)'
-        if id_ == self.__ID_XY_ANG_VEL:    return 'Angular Velocity (RPM)'
-        if id_ == self.__ID_XY_DIST_SCR:   return 'Hit distance from center (osu!px)'
-        if id_ == self.__ID_VIS_VISIBLE:   return 'Number of notes visible (#)'
-
-        raise Exception(f'Unknown id: {id_}')
+        if not (0 <= id_ < len(self.__axes)):
+            raise Exception(f'Unknown id: {id_}')
+
+        return self.__axes[id_]['label']
 
 
     def __x_axis_selection_event(self, id_x):
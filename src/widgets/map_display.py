@@ -11,7 +11,6 @@ from PyQt6 import QtWidgets
 from PyQt6 import QtCore
 import pyqtgraph
 
-from osu_db import MapsDB
 from osu_interfaces import Gamemode, Mod
 from beatmap_reader import BeatmapIO
 from replay_reader import ReplayIO
@@ -24,7 +23,7 @@ from misc.osu_utils import OsuUtils
 from widgets.hitobject_plot import HitobjectPlot
 from widgets.timing_plot import TimingPlot
 
-from file_managers import AppConfig
+from file_managers.map_name_cache import MapNameCache
 
 
 class MapDisplay(QtWidgets.QWidget):
@@ -51,12 +50,13 @@ class MapDisplay(QtWidgets.QWidget):
 
         MapDisplay.__logger.debug('MapDisplay.__init__ enter')
 
-        self.__maps_db = MapsDB(AppConfig.cfg['osu_dir'])
-
         self.timing_data = np.asarray([])
         self.map_data    = {}
         self.replay_data = np.empty(shape=(0, 7))
 
+        # Time, x, y of the map's presses, sorted by time
+        self.__press_data = np.empty(shape=(0, 3))
+
         self.map_md5 = None
         self.ar_ms = None
         self.cs_px = None
@@ -167,6 +167,7 @@ class MapDisplay(QtWidgets.QWidget):
         self.ar_ms = OsuUtils.ar_to_ms(ar)#/1000
         self.map_md5 = md5
 
+        self.__set_press_data()
         self.__draw_map_data()
 
         # Draw note in timeline
@@ -184,6 +185,7 @@ class MapDisplay(QtWidgets.QWidget):
         self.ar_ms = OsuUtils.ar_to_ms(ar)#/1000
         self.map_md5 = md5
 
+        self.__set_press_data()
         self.__draw_map_data()
 
         # Draw note in timeline
@@ -204,6 +206,7 @@ class MapDisplay(QtWidgets.QWidget):
         self.replay_data[:, self.REPLAY_M1] = np.asarray(replay_data['m1'])
         self.replay_data[:, self.REPLAY_M2] = np.asarray(replay_data['m2'])
 
+        self.__set_replay_timelines()
         self.__draw_replay_data()
 
 
@@ -231,6 +234,7 @@ class MapDisplay(QtWidgets.QWidget):
         self.replay_data[1::2, self.REPLAY_Y]  = -score_data['Y_HIT']
         self.replay_data[1::2, self.REPLAY_K1] = StdReplayData.RELEASE
 
+        self.__set_replay_timelines()
         self.__draw_replay_data()
 
 
@@ -278,7 +282,7 @@ class MapDisplay(QtWidgets.QWidget):
         self.set_replay_from_play_data(score_data)
 
         # In the event multiple md5 strings were passed, take just the first one
-        map_file_name = self.__maps_db.get_map_file_name(md5)
+        map_file_name = MapNameCache.get_file_path(md5)
         if map_file_name:
             try:
                 self.open_map_from_file_name(map_file_name, score_data.index.get_level_values(2)[0])
@@ -302,6 +306,21 @@ class MapDisplay(QtWidgets.QWidget):
         self.status_label.setText('Warning: viewing play data, which contains only the basic scoring information.')
 
 
+    def __set_press_data(self):
+        """
+        Sorts out the map's presses by time once, so approach circles to draw can be found with a binary search
+        """
+        presses = StdMapData.get_presses(self.map_data)
+
+        self.__press_data = np.empty(shape=(presses.shape[0], 3))
+        self.__press_data[:, self.MAP_T] = presses['time'].values
+        self.__press_data[:, self.MAP_X] = presses['x'].values
+        self.__press_data[:, self.MAP_Y] = presses['y'].values
+
+        sort_idx = np.argsort(self.__press_data[:, self.MAP_T], kind='stable')
+        self.__press_data = self.__press_data[sort_idx]
+
+
     def __draw_map_data(self):
         if isinstance(self.map_data, type(None)):
             return
@@ -309,17 +328,18 @@ class MapDisplay(QtWidgets.QWidget):
         if isinstance(self.ar_ms, type(None)): return
         if isinstance(self.cs_px, type(None)): return
 
-        # Draw approach circles
-        presses = StdMapData.get_presses(self.map_data)
-        ar_select = (self.t <= presses['time']) & (presses['time'] <= (self.t + self.ar_ms))
+        # Draw approach circles of presses within [ t, t + ar ]
+        press_t = self.__press_data[:, self.MAP_T]
+        idx_start = np.searchsorted(press_t, self.t, side='left')
+        idx_end   = np.searchsorted(press_t, self.t + self.ar_ms, side='right')
 
-        if ar_select.sum() == 0:
+        if idx_start >= idx_end:
             # Nothing to draw
             self.plot_approach.setData([], [], symbolSize=[])
         else:
-            approach_x =  presses['x'][ar_select].values
-            approach_y =  presses['y'][ar_select].values
-            press_times = presses['time'][ar_select].values
+            approach_x  = self.__press_data[idx_start:idx_end, self.MAP_X]
+            approach_y  = self.__press_data[idx_start:idx_end, self.MAP_Y]
+            press_times = self.__press_data[idx_start:idx_end, self.MAP_T]
 
             sizes = OsuUtils.approach_circle_to_radius(self.cs_px, self.ar_ms, press_times - self.t)
             self.plot_approach.setData(approach_x, approach_y, symbolSize=sizes)
@@ -328,66 +348,46 @@ class MapDisplay(QtWidgets.QWidget):
         self.plot_notes.set_map_display(self.t, self.map_data, self.ar_ms, self.cs_px)
 
 
-    def __draw_replay_data(self):
-        if isinstance(self.replay_data, type(None)):
-            return
+    def __set_replay_timelines(self):
+        """
+        Sorts replay frames by time and draws the key press timelines. Both only
+        change when a replay is loaded, not when the timeline marker is moved.
+        """
+        sort_idx = np.argsort(self.replay_data[:, self.REPLAY_T], kind='stable')
+        self.replay_data = self.replay_data[sort_idx]
+
+        timelines = [
+            ( self.k1_timing_plot, self.REPLAY_K1, -4, (255, 100, 100, 150) ),
+            ( self.m1_timing_plot, self.REPLAY_M1, -2, (255, 100, 255, 150) ),
+            ( self.k2_timing_plot, self.REPLAY_K2,  2, (71,  185, 255, 150) ),
+            ( self.m2_timing_plot, self.REPLAY_M2,  4, (100, 255, 100, 150) ),
+        ]
 
         replay_data_t = self.replay_data[:, self.REPLAY_T]
 
-        select_time = (replay_data_t >= self.t - 50) & (replay_data_t <= self.t)
-        replay_data_x = self.replay_data[select_time, self.REPLAY_X]
-        replay_data_y = self.replay_data[select_time, self.REPLAY_Y]
+        for timing_plot, key, y_pos, color in timelines:
+            press_select   = (self.replay_data[:, key] == StdReplayData.PRESS)
+            release_select = (self.replay_data[:, key] == StdReplayData.RELEASE)
 
-        self.plot_cursor.setData(replay_data_x, replay_data_y)
-        self.visual.update()
-
-        k1_press_select = self.replay_data[:, self.REPLAY_K1] == StdReplayData.PRESS
-        k2_press_select = self.replay_data[:, self.REPLAY_K2] == StdReplayData.PRESS
-        m1_press_select = self.replay_data[:, self.REPLAY_M1] == StdReplayData.PRESS
-        m2_press_select = self.replay_data[:, self.REPLAY_M2] == StdReplayData.PRESS
+            timing_plot.setTimings(replay_data_t[press_select], replay_data_t[release_select], y_pos=y_pos, color=color)
 
-        k1_release_select = self.replay_data[:, self.REPLAY_K1] == StdReplayData.RELEASE
-        k2_release_select = self.replay_data[:, self.REPLAY_K2] == StdReplayData.RELEASE
-        m1_release_select = self.replay_data[:, self.REPLAY_M1] == StdReplayData.RELEASE
-        m2_release_select = self.replay_data[:, self.REPLAY_M2] == StdReplayData.RELEASE
+        self.timeline.update()
 
-        self.timeline.removeItem(self.k1_timing_plot)
-        self.k1_timing_plot = TimingPlot()
-        self.k1_timing_plot.setTimings(
-            self.replay_data[k1_press_select, self.REPLAY_T],
-            self.replay_data[k1_release_select, self.REPLAY_T],
-            y_pos=-4, color=(255, 100, 100, 150)
-        )
-        self.timeline.addItem(self.k1_timing_plot)
 
-        self.timeline.removeItem(self.m1_timing_plot)
-        self.m1_timing_plot = TimingPlot()
-        self.m1_timing_plot.setTimings(
-            self.replay_data[m1_press_select, self.REPLAY_T],
-            self.replay_data[m1_release_select, self.REPLAY_T],
-            y_pos=-2, color=(255, 100, 255, 150)
-        )
-        self.timeline.addItem(self.m1_timing_plot)
+    def __draw_replay_data(self):
+        if isinstance(self.replay_data, type(None)):
+            return
 
-        self.timeline.removeItem(self.k2_timing_plot)
-        self.k2_timing_plot = TimingPlot()
-        self.k2_timing_plot.setTimings(
-            self.replay_data[k2_press_select, self.REPLAY_T],
-            self.replay_data[k2_release_select, self.REPLAY_T],
-            y_pos=2, color=(71, 185, 255, 150)
-        )
-        self.timeline.addItem(self.k2_timing_plot)
+        # Cursor positions of the last 50 ms. Frames are sorted by time (see `__set_replay_timelines`)
+        replay_data_t = self.replay_data[:, self.REPLAY_T]
+        idx_start = np.searchsorted(replay_data_t, self.t - 50, side='left')
+        idx_end   = np.searchsorted(replay_data_t, self.t, side='right')
 
-        self.timeline.removeItem(self.m2_timing_plot)
-        self.m2_timing_plot = TimingPlot()
-        self.m2_timing_plot.setTimings(
-            self.replay_data[m2_press_select, self.REPLAY_T],
-            self.replay_data[m2_release_select, self.REPLAY_T],
-            y_pos=4, color=(100, 255, 100, 150)
-        )
-        self.timeline.addItem(self.m2_timing_plot)
+        replay_data_x = self.replay_data[idx_start:idx_end, self.REPLAY_X]
+        replay_data_y = self.replay_data[idx_start:idx_end, self.REPLAY_Y]
 
-        self.timeline.update()
+        self.plot_cursor.setData(replay_data_x, replay_data_y)
+        self.visual.update()
 
 
     def __time_changed_event(self):
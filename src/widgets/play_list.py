@@ -14,18 +14,13 @@ The is a selection menu on the side that allows the user to select which player'
 Design note: Maybe have a scatter plot instead. Really depends on how much data there is and how laggy it will get.
 """
 import time
-import threading
-import pyqtgraph
 
 from PyQt6 import QtCore
 from PyQt6 import QtWidgets
 
 import numpy as np
-import pandas as pd
-from file_managers.config_mgr import AppConfig
 
 from osu_interfaces import Mod
-from osu_db import MapsDB
 
 from misc.Logger import Logger
 
@@ -34,26 +29,15 @@ from misc.Logger import Logger
 class PlayListHelper():
 
     @staticmethod
-    def map_name_str(maps_db, md5_str):
-        result = maps_db.get_map_file_name(md5_str)
-        if result is None:
-            return md5_str
-
-        return result.replace('\\', '/').split('/')[-1]
-
-
-    @staticmethod
-    def map_mods_str(score_data):
-        mods = score_data.index.get_level_values(2)[0]
+    def map_mods_str(mods):
         mods_text = Mod(int(mods)).get_mods_txt()
         mods_text = f' +{mods_text}' if len(mods_text) != 0 else ''
 
+        return mods_text
 
-    @staticmethod
-    def map_timestamp_str(score_data):
-        timestamp_start = min(score_data.index.get_level_values(1))
-        timestamp_end   = max(score_data.index.get_level_values(1))
 
+    @staticmethod
+    def map_timestamp_str(timestamp_start, timestamp_end):
         try:
             if timestamp_start == timestamp_end:
                 play_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp_start))
@@ -64,105 +48,338 @@ class PlayListHelper():
                 play_end   = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp_end))
 
                 time_str = f'{play_start} - {play_end}'
-        except IndexError:
-            play_start = 'N/A'
-            play_end   = 'N/A'
+        except (OverflowError, OSError, ValueError):
+            time_str = 'N/A'
 
         return time_str
 
 
     @staticmethod
-    def map_avg_bpm(score_data):
-        # TODO: This needs to be select by single timestamp
-        data = 15000/score_data['DIFF_T_PRESS_DIFF'].values
-        data = data[~np.isnan(data)]
-
-        return f'{np.mean(data):.2f}'
+    def summary_rows(summary):
+        """
+        Play list rows, as a dict of column name -> values, of the maps in ``summary`` (see ``MapSummary``)
+        """
+        return {
+            'md5'         : list(summary.index),
+            'Name'        : list(summary['NAME']),
+            'Mods'        : [ PlayListHelper.map_mods_str(mods) for mods in summary['MODS'].values ],
+            'Time'        : [ PlayListHelper.map_timestamp_str(t_first, t_last) for t_first, t_last in zip(summary['T_FIRST'].values, summary['T_LAST'].values) ],
+            'Data'        : summary['NUM_ROWS'].values,
+            'Avg BPM'     : summary['AVG_BPM'].values,
+            'Avg Lin Vel' : summary['AVG_LIN_VEL'].values,
+            'Avg Ang Vel' : summary['AVG_ANG_VEL'].values,
+        }
 
 
     @staticmethod
-    def map_avg_lin_vel(score_data):
-        # TODO: This needs to be select by single timestamp
-        data = score_data['DIFF_XY_LIN_VEL'].values
-        data = data[~np.isnan(data)]
+    def do_get_timestamps(score_data):
+        return np.unique(score_data.index.get_level_values(1))
 
-        return f'{np.mean(data):.2f}'
 
 
-    @staticmethod
-    def map_avg_ang_vel(score_data):
-        # TODO: This needs to be select by single timestamp
-        data = score_data['DIFF_XY_ANG_VEL'].values
-        data = data[~np.isnan(data)]
+class PlayListModel(QtCore.QAbstractTableModel):
+    """
+    Table model of the loaded maps, a row per map. Column values are held in numpy arrays, and
+    rows are displayed through a view (an array of indices into them) that sorting and filtering
+    rearrange without touching the stored data. Appended rows are copied into arrays that grow
+    geometrically, so appending does not rebuild the table.
+    """
 
-        return f'{np.mean(data):.2f}'
+    COLUMNS = [ 'md5', 'Name', 'Mods', 'Time', 'Data', 'Avg BPM', 'Avg Lin Vel', 'Avg Ang Vel' ]
 
+    __DTYPES = {
+        'md5'         : object,
+        'Name'        : object,
+        'Mods'        : object,
+        'Time'        : object,
+        'Data'        : np.int64,
+        'Avg BPM'     : np.float64,
+        'Avg Lin Vel' : np.float64,
+        'Avg Ang Vel' : np.float64,
+    }
 
-    @staticmethod
-    def do_get_timestamps(score_data):
-        return np.unique(score_data.index.get_level_values(1))
+    def __init__(self, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent)
+
+        self.__sort_column = None
+        self.__sort_order  = QtCore.Qt.SortOrder.AscendingOrder
+
+        # Column name -> (min, max). Either bound can be None
+        self.__filters = {}
+
+        self.__reset_data()
+
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.__view.shape[0]
+
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(PlayListModel.COLUMNS)
+
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        column = PlayListModel.COLUMNS[index.column()]
+
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            value = self.__data[column][self.__view[index.row()]]
+
+            if PlayListModel.__DTYPES[column] == np.float64:
+                return 'N/A' if np.isnan(value) else f'{value:.2f}'
+
+            return str(value)
+
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole:
+            if PlayListModel.__DTYPES[column] != object:
+                return QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter
+
+        return None
+
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if (orientation == QtCore.Qt.Orientation.Horizontal) and (role == QtCore.Qt.ItemDataRole.DisplayRole):
+            return PlayListModel.COLUMNS[section]
+
+        return QtCore.QAbstractTableModel.headerData(self, section, orientation, role)
+
+
+    def sort(self, column, order=QtCore.Qt.SortOrder.AscendingOrder):
+        """
+        Sorts rows by ``column``. Rows are displayed in the order they were added if ``column`` is -1
+        """
+        self.__sort_column = None if (column < 0) else PlayListModel.COLUMNS[column]
+        self.__sort_order  = order
+
+        self.__update_view()
+
+
+    def set_filter(self, column, min_value=None, max_value=None):
+        """
+        Displays only the rows whose value in ``column`` is within [ ``min_value``, ``max_value`` ].
+        Rows with no value (NaN) are left out. Setting both bounds to None removes the filter.
+        """
+        if column not in PlayListModel.COLUMNS:
+            raise ValueError(f'Unknown column: {column}')
+
+        if (min_value is None) and (max_value is None):
+            self.__filters.pop(column, None)
+        else:
+            self.__filters[column] = (min_value, max_value)
+
+        self.__update_view()
+
+
+    def clear(self):
+        self.beginResetModel()
+        self.__reset_data()
+        self.endResetModel()
+
+
+    def append(self, rows):
+        """
+        Appends rows given as a dict of column name -> values
+        """
+        num_new = len(rows['md5'])
+        if num_new == 0:
+            return
+
+        idx_start = self.__num_rows
+        idx_end   = self.__num_rows + num_new
+
+        self.__reserve(idx_end)
+        for column in PlayListModel.COLUMNS:
+            self.__data[column][idx_start:idx_end] = rows[column]
+
+        self.__md5_to_idx.update({ md5 : idx_start + i for i, md5 in enumerate(rows['md5']) })
+        self.__num_rows = idx_end
+
+        new_idxs = np.arange(idx_start, idx_end)
+        new_idxs = new_idxs[self.__get_filter_mask(new_idxs)]
+
+        if self.__sort_column is not None:
+            # New rows need to be placed among the existing ones
+            self.__set_view(self.__sort_idxs(np.concatenate((self.__view, new_idxs))))
+            return
+
+        if new_idxs.shape[0] == 0:
+            return
+
+        num_view_rows = self.__view.shape[0]
+        self.beginInsertRows(QtCore.QModelIndex(), num_view_rows, num_view_rows + new_idxs.shape[0] - 1)
+        self.__view = np.concatenate((self.__view, new_idxs))
+        self.__rows[new_idxs] = np.arange(num_view_rows, self.__view.shape[0])
+        self.endInsertRows()
+
+
+    def update(self, rows):
+        """
+        Replaces the values of already loaded rows, given as a dict of column name -> values
+        """
+        idxs = np.asarray([ self.__md5_to_idx[md5] for md5 in rows['md5'] ], dtype=np.int64)
+        if idxs.shape[0] == 0:
+            return
+
+        for column in PlayListModel.COLUMNS:
+            self.__data[column][idxs] = rows[column]
+
+        if (self.__sort_column is not None) or (len(self.__filters) > 0):
+            # Updated rows may need to move or be filtered in or out
+            self.__update_view()
+            return
 
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
 
 
-class PlayList(pyqtgraph.TableWidget):
+    def has_md5(self, md5):
+        return md5 in self.__md5_to_idx
+
+
+    def get_row(self, md5):
+        """
+        Row the map is displayed at. -1 if the map is not loaded or is filtered out
+        """
+        idx = self.__md5_to_idx.get(md5, None)
+        if idx is None:
+            return -1
+
+        return int(self.__rows[idx])
+
+
+    def get_md5(self, row):
+        return self.__data['md5'][self.__view[row]]
+
+
+    def __reset_data(self):
+        self.__data = { column : np.empty(16, dtype=dtype) for column, dtype in PlayListModel.__DTYPES.items() }
+        self.__num_rows = 0
+        self.__md5_to_idx = {}
+
+        # Row -> index into the stored data
+        self.__view = np.zeros(0, dtype=np.int64)
+
+        # Index into the stored data -> row it's displayed at, -1 if it's filtered out
+        self.__rows = np.full(16, -1, dtype=np.int64)
+
+
+    def __reserve(self, num_rows):
+        capacity = self.__data['md5'].shape[0]
+        if num_rows <= capacity:
+            return
+
+        while capacity < num_rows:
+            capacity *= 2
+
+        for column, values in self.__data.items():
+            self.__data[column] = np.empty(capacity, dtype=values.dtype)
+            self.__data[column][:self.__num_rows] = values[:self.__num_rows]
+
+        rows = np.full(capacity, -1, dtype=np.int64)
+        rows[:self.__num_rows] = self.__rows[:self.__num_rows]
+        self.__rows = rows
+
+
+    def __get_filter_mask(self, idxs):
+        mask = np.ones(idxs.shape[0], dtype=np.bool8)
+
+        for column, (min_value, max_value) in self.__filters.items():
+            values = self.__data[column][idxs]
+            if min_value is not None:
+                mask &= (values >= min_value)
+            if max_value is not None:
+                mask &= (values <= max_value)
+
+        return mask
+
+
+    def __sort_idxs(self, idxs):
+        if self.__sort_column is None:
+            return np.sort(idxs)
+
+        idxs = idxs[np.argsort(self.__data[self.__sort_column][idxs], kind='stable')]
+        if self.__sort_order == QtCore.Qt.SortOrder.DescendingOrder:
+            idxs = idxs[::-1]
+
+        return idxs
+
+
+    def __update_view(self):
+        idxs = np.arange(self.__num_rows)
+        idxs = idxs[self.__get_filter_mask(idxs)]
+
+        self.__set_view(self.__sort_idxs(idxs))
+
+
+    def __set_view(self, view):
+        """
+        Rearranges displayed rows, keeping selections on the rows they were on
+        """
+        self.layoutAboutToBeChanged.emit()
+
+        old_view = self.__view
+        self.__view = view
+
+        self.__rows[:] = -1
+        self.__rows[view] = np.arange(view.shape[0])
+
+        old_indices = self.persistentIndexList()
+        new_indices = []
+        for old_index in old_indices:
+            row = self.__rows[old_view[old_index.row()]]
+            new_indices.append(self.index(int(row), old_index.column()) if row >= 0 else QtCore.QModelIndex())
+
+        self.changePersistentIndexList(old_indices, new_indices)
+        self.layoutChanged.emit()
+
+
+
+class PlayList(QtWidgets.QTableView):
 
     logger = Logger.get_logger(__name__)
 
     map_selected = QtCore.pyqtSignal(object)
     new_map_loaded = QtCore.pyqtSignal()
 
-    __batch_processed = QtCore.pyqtSignal(object)
-
     def __init__(self):
         self.logger.debug(f'__init__ - enter')
 
-        pyqtgraph.TableWidget.__init__(self)
+        QtWidgets.QTableView.__init__(self)
+
+        self.__model = PlayListModel(self)
+        self.setModel(self.__model)
 
         self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
         self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
         self.verticalHeader().setDefaultSectionSize(10)
 
-        self.__maps_db = MapsDB(AppConfig.cfg['osu_dir'])
+        # Rows are listed in the order they were loaded until a column header is clicked
+        self.horizontalHeader().setSortIndicator(-1, QtCore.Qt.SortOrder.AscendingOrder)
+        self.setSortingEnabled(True)
 
-        self.__batch_processed.connect(self.__add_data)
-        self.__table_is_configured = False
+        # Hide displayed columns
+        self.setColumnHidden(0, True)
 
         self.selectionModel().selectionChanged.connect(self.__list_select_event)
 
         self.logger.debug(f'__init__ - exit')
 
 
-    def load_play(self, diff_data):
-        # Get list of hashes for loaded maps
-        map_hashes = [ self.model().data(self.model().index(i, 0), role=QtCore.Qt.ItemDataRole.DisplayRole) for i in range(self.rowCount()) ]
-        diff_data_md5 = diff_data.index.get_level_values(0)[0]
+    def load_play(self, summary):
+        """
+        `summary` is the updated summary of the map a play was loaded for (see `MapSummary`)
+        """
+        diff_data_md5 = summary.index[0]
+        rows = PlayListHelper.summary_rows(summary)
 
         # FIXME: Plays from same map but different mods do not load
         # TODO: Check against md5 AND mods
-        if diff_data_md5 not in map_hashes:
+        if not self.__model.has_md5(diff_data_md5):
             self.logger.debug('load_play_md5 - Map hash not found in table data. Creating new item entry...')
-
-            # Build data structure and add to table
-            self.appendData(
-                pd.DataFrame([
-                    [
-                        diff_data_md5,
-                        PlayListHelper.map_name_str(self.__maps_db, diff_data_md5),
-                        PlayListHelper.map_mods_str(diff_data),
-                        PlayListHelper.map_timestamp_str(diff_data),
-                        diff_data.shape[0],
-                        PlayListHelper.map_avg_bpm(diff_data),
-                        PlayListHelper.map_avg_lin_vel(diff_data),
-                        PlayListHelper.map_avg_ang_vel(diff_data),
-                    ]
-                ],
-                columns=['md5', 'Name', 'Mods', 'Time', 'Data', 'Avg BPM', 'Avg Lin Vel', 'Avg Ang Vel']
-            ).values)
-
-            self.__check_table_config()
+            self.__model.append(rows)
         else:
-            # TODO: Update timestamp column
-            pass
+            self.__model.update(rows)
 
         # Check if one or no map is selected. If multiple maps
         # are selected, it is likely undesirable to switch to
@@ -171,8 +388,8 @@ class PlayList(pyqtgraph.TableWidget):
 
         if is_not_multiple_selected:
             # If map already exists in listings, select it
-            matching_items = self.findItems(str(diff_data_md5), QtCore.Qt.MatchFlag.MatchContains)
-            if not matching_items:
+            row = self.__model.get_row(diff_data_md5)
+            if row < 0:
                 self.logger.warning('Failed to find map item in table data')
                 return
 
@@ -180,7 +397,10 @@ class PlayList(pyqtgraph.TableWidget):
 
             # Blocks the `selectionChanged` signal
             self.selectionModel().blockSignals(True)
-            self.setCurrentItem(matching_items[0])
+            self.selectionModel().setCurrentIndex(
+                self.__model.index(row, 1),
+                QtCore.QItemSelectionModel.SelectionFlag.ClearAndSelect | QtCore.QItemSelectionModel.SelectionFlag.Rows
+            )
             self.selectionModel().blockSignals(False)
 
             # Select first row
@@ -188,58 +408,34 @@ class PlayList(pyqtgraph.TableWidget):
             #    self.selectRow(0)
 
 
-    def reload_map_list(self, score_data):
+    def reload_map_list(self, summary):
+        """
+        `summary` is the per map summary of the loaded data (see `MapSummary`)
+        """
         self.logger.debug('reload_map_list - enter')
 
         # Deselect selection before changes to play list
         # Block the `selectionChanged` signal
         self.selectionModel().blockSignals(True)
-        self.setCurrentItem(None)
+        self.selectionModel().clear()
         self.selectionModel().blockSignals(False)
 
-        self.clear()
+        self.__model.clear()
 
-        if score_data is None:
+        if summary is None:
             self.logger.debug('reload_map_list - nothing to reload')
             return
 
-        # Clearing table resets table config
-        self.__table_is_configured = False
-
-        thread = threading.Thread(target=self.__reload_map_list_thread, args=(score_data, ))
-        thread.start()
-
-
-    def __reload_map_list_thread(self, score_data):
-        data = []
+        self.logger.debug(f'reload_map_list - num entries to load: {summary.shape[0]}')
+        self.__model.append(PlayListHelper.summary_rows(summary))
 
-        entries = score_data.groupby(level=0)
-        num_entries = len(entries)
 
-        self.logger.debug(f'reload_map_list - num entries to load: {num_entries}')
-
-        for i, entry in enumerate(entries):
-            data.append([
-                entry[0],
-                PlayListHelper.map_name_str(self.__maps_db, entry[0]),
-                PlayListHelper.map_mods_str(entry[1]),
-                PlayListHelper.map_timestamp_str(entry[1]),
-                entry[1].shape[0],
-                PlayListHelper.map_avg_bpm(entry[1]),
-                PlayListHelper.map_avg_lin_vel(entry[1]),
-                PlayListHelper.map_avg_ang_vel(entry[1]),
-            ])
-
-            # Send data for GUI update every 100 entries
-            if ((i % 100) == 0) or (i == (num_entries - 1)):
-                self.__batch_processed.emit(
-                    pd.DataFrame(
-                        data[:],
-                        columns=['md5', 'Name', 'Mods', 'Time', 'Data', 'Avg BPM', 'Avg Lin Vel', 'Avg Ang Vel']
-                    )
-                )
-
-                data = []
+    def update_maps(self, summary):
+        """
+        Updates the listed maps that are in `summary` (see `MapSummary`). Ones that are not listed are ignored.
+        """
+        summary = summary[[ self.__model.has_md5(md5) for md5 in summary.index ]]
+        self.__model.update(PlayListHelper.summary_rows(summary))
 
 
     def get_num_selected(self):
@@ -247,43 +443,41 @@ class PlayList(pyqtgraph.TableWidget):
 
 
     def get_selected(self):
-        #print([ row.data() for row in self.selectionModel().selectedRows() ])
-        #print([ row.row() for row in self.selectionModel().selectedRows() ])
-
-        return [
-            (
-                self.model().data(self.model().index(selection.row(), 0), role=QtCore.Qt.ItemDataRole.DisplayRole)#,  # MD5
-                #self.model().data(self.model().index(selection.row(), 2), role=QtCore.Qt.ItemDataRole.DisplayRole)   # MOD
-            )
-            for selection in self.selectionModel().selectedRows()
-        ]
-
-
-    def __add_data(self, data):
-        self.appendData(data.values)
-        self.__check_table_config()
+        return [ self.__model.get_md5(selection.row()) for selection in self.selectionModel().selectedRows() ]
 
 
-    def __check_table_config(self):
+    def set_selected(self, md5s):
         """
-        Configures table if it's not already configured
+        Selects the maps of ``md5s`` that are listed, without emitting ``map_selected``
         """
-        if self.__table_is_configured:
-            return
+        selection = QtCore.QItemSelection()
+        for md5 in md5s:
+            row = self.__model.get_row(md5)
+            if row < 0:
+                continue
 
-        # Set header labels
-        header_labels = [ 'md5', 'Name', 'Mods', 'Time', 'Data', 'Avg BPM', 'Avg Lin Vel', 'Avg Ang Vel' ]
-        self.setHorizontalHeaderLabels(header_labels)
+            selection.select(self.__model.index(row, 0), self.__model.index(row, self.__model.columnCount() - 1))
+
+        # Blocks the `selectionChanged` signal
+        self.selectionModel().blockSignals(True)
+        self.selectionModel().select(
+            selection,
+            QtCore.QItemSelectionModel.SelectionFlag.ClearAndSelect | QtCore.QItemSelectionModel.SelectionFlag.Rows
+        )
+        self.selectionModel().blockSignals(False)
+        self.viewport().update()
 
-        # Hide displayed columns
-        self.setColumnHidden(0, True)
 
-        self.__table_is_configured = True
+    def set_filter(self, column, min_value=None, max_value=None):
+        """
+        Lists only maps whose value in ``column`` (ex: 'Avg BPM') is within [ ``min_value``, ``max_value`` ].
+        Setting both bounds to None removes the filter.
+        """
+        self.__model.set_filter(column, min_value, max_value)
 
 
     def __list_select_event(self, _):
-        selected_rows = self.selectionModel().selectedRows(column=0)
-        md5_strs = [ selected_row.data(role=QtCore.Qt.ItemDataRole.DisplayRole) for selected_row in selected_rows ]
+        md5_strs = self.get_selected()
 
         self.logger.debug('__list_select_event - map_selected.emit ->')
         self.map_selected.emit(md5_strs)
@@ -20,8 +20,12 @@ class TimingPlot(pyqtgraph.GraphItem):
     def setTimings(self, start_times=[], end_times=[], y_pos=0, color=(255, 255, 255, 255), width=3):
         try:
             if len(start_times) == 0 or len(end_times) == 0:
+                # Clears the lines of timings set before as well, so the plot can be reused
                 self.scatter.clear()
                 self.pos = None
+                self.adjacency = None
+                self.picture = None
+                self.update()
                 return
         except ValueError:
             return